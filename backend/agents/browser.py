@@ -11,6 +11,7 @@ from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import sys
 from core.config import load_settings
+from core.payloads import payload_content
 
 # Initialize MCP Server
 app = Server("browser-mcp-server")
@@ -226,7 +227,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent | type
                 chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
                 clean_text = '\n'.join(chunk for chunk in chunks if chunk)
                 
-                return [types.TextContent(type="text", text=clean_text[:50000])] # Limit return size
+                return payload_content(clean_text[:50000]) # Limit return size
                 
             except Exception as e:
                 return [types.TextContent(type="text", text=f"Error visiting page: {e}")]
@@ -9,6 +9,8 @@ import pdfplumber
 import io
 from typing import List
 
+from core.payloads import payload_content
+
 # Initialize MCP Server
 app = Server("pdf-parser-mcp-server")
 
@@ -84,7 +86,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent | type
                             output_text.append("\n".join(md_table))
                             output_text.append("\n")
 
-            return [types.TextContent(type="text", text="".join(output_text))]
+            return payload_content("".join(output_text))
 
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error parsing PDF: {str(e)}")]
@@ -8,6 +8,8 @@ import requests
 import pandas as pd
 import io
 
+from core.payloads import payload_content
+
 # Initialize MCP Server
 app = Server("xlsx-parser-mcp-server")
 
@@ -60,7 +62,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent | type
                 output_text.append(markdown)
                 output_text.append("\n")
 
-            return [types.TextContent(type="text", text="".join(output_text))]
+            return payload_content("".join(output_text))
 
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error parsing XLSX: {str(e)}")]
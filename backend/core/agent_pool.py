@@ -0,0 +1,108 @@
+"""
+Worker pools for MCP agents that serve concurrent users.
+
+One ClientSession per agent means two users calling visit_page or
+parse_pdf at the same time queue behind a single process. AgentPool holds
+N workers (one process each) for an agent and sends every call to the
+least-loaded one: fewest calls in flight, then a worker that is already
+running (so a lazy worker is only spawned when the running ones are busy),
+then the one used least.
+
+Worker counts come from AGENT_WORKERS in core.server (overridable per
+agent with settings.agent_workers) and from "workers" in an
+mcp_servers.json entry. AgentPool has the ClientSession methods the routes
+use, so it sits in core.server.agent_sessions like a single session.
+"""
+import time
+from typing import Any, Optional
+
+from mcp import types
+
+
+class AgentPool:
+    """ClientSession stand-in that spreads call_tool over several worker sessions."""
+
+    def __init__(self, name: str, workers: list):
+        if not workers:
+            raise ValueError(f"Agent pool '{name}' needs at least one worker")
+        self.name = name
+        self.workers = workers
+        self.in_flight = [0] * len(workers)
+        self.calls = [0] * len(workers)
+        self.stats = {"calls": 0, "queued_calls": 0, "peak_in_flight": 0, "last_used": None}
+
+    # --- Aggregate worker state (LazyAgentSession or MCPServerConnection) ---
+
+    @property
+    def tools(self) -> list[types.Tool]:
+        for worker in self.workers:
+            if worker.tools:
+                return worker.tools
+        return []
+
+    @property
+    def error(self) -> Optional[str]:
+        return next((w.error for w in self.workers if w.error), None)
+
+    @property
+    def running(self) -> bool:
+        return any(w.running for w in self.workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls in flight beyond one per worker, i.e. waiting behind another call."""
+        return max(0, sum(self.in_flight) - len(self.workers))
+
+    async def prepare(self) -> bool:
+        """Prepare the first worker only; the others take its tool list and spawn when a call is routed to them."""
+        ready = await self.workers[0].prepare()
+        for worker in self.workers[1:]:
+            worker.defer(self.workers[0].tools)
+        return ready
+
+    def _pick(self) -> int:
+        return min(
+            range(len(self.workers)),
+            key=lambda i: (self.in_flight[i], not self.workers[i].running, self.calls[i]),
+        )
+
+    # --- ClientSession surface ---
+
+    async def initialize(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs) -> types.ListToolsResult:
+        return types.ListToolsResult(tools=list(self.tools))
+
+    async def call_tool(self, name: str, arguments: Optional[dict[str, Any]] = None, *args, **kwargs):
+        index = self._pick()
+        worker = self.workers[index]
+        if self.in_flight[index]:
+            self.stats["queued_calls"] += 1
+        self.in_flight[index] += 1
+        self.calls[index] += 1
+        self.stats["calls"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], sum(self.in_flight))
+        try:
+            return await worker.call_tool(name, arguments, *args, **kwargs)
+        finally:
+            self.in_flight[index] -= 1
+            self.stats["last_used"] = time.time()
+
+    async def stop(self):
+        for worker in self.workers:
+            await worker.stop()
+
+    def status(self) -> dict:
+        workers = []
+        for i, worker in enumerate(self.workers):
+            workers.append({**worker.status(), "in_flight": self.in_flight[i], "routed_calls": self.calls[i]})
+        return {
+            "running": self.running,
+            "tools": len(self.tools),
+            "error": self.error,
+            "workers": workers,
+            "in_flight": sum(self.in_flight),
+            "queue_depth": self.queue_depth,
+            **self.stats,
+        }
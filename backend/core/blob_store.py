@@ -0,0 +1,125 @@
+"""
+Content-addressed blob storage for large payloads kept out of the vector store.
+
+Blobs live under <root>/<first 2 hex chars>/<sha256>.<ext>, compressed with
+zstd when the `zstandard` package is installed (zlib otherwise). Identical
+payloads are stored once. Each MemoryStore keeps its blobs next to its vector
+store (<storage_path>/blobs); data/blobs is where they used to be shared.
+"""
+import os
+import hashlib
+import zlib
+
+from core.config import DATA_DIR
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOBS_DIR = os.path.join(DATA_DIR, "blobs")
+ZSTD_LEVEL = 3
+
+
+class BlobStore:
+    def __init__(self, root: str = BLOBS_DIR, fallback_root: str | None = None):
+        self.root = root
+        # Read-only: blobs written before stores had their own directory
+        self.fallback_root = fallback_root if fallback_root and fallback_root != root else None
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def _ext() -> str:
+        return "zst" if zstandard else "zz"
+
+    def _path(self, digest: str, ext: str, root: str | None = None) -> str:
+        return os.path.join(root or self.root, digest[:2], f"{digest}.{ext}")
+
+    @staticmethod
+    def _digest(ref: str) -> str | None:
+        if not ref or not ref.startswith("sha256:"):
+            return None
+        digest = ref.split(":", 1)[1]
+        # Refs come from record metadata; never let one name a path outside the store
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            return None
+        return digest
+
+    def put(self, text: str) -> str | None:
+        """Store text and return its reference ("sha256:<hex>"), or None on failure."""
+        raw = text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._path(digest, self._ext())
+        if os.path.exists(path):
+            return f"sha256:{digest}"
+
+        try:
+            if zstandard:
+                payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+            else:
+                payload = zlib.compress(raw)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so readers never see a partial blob
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            print(f"DEBUG: Stored blob {digest[:12]} ({len(raw)} -> {len(payload)} bytes)")
+            return f"sha256:{digest}"
+        except Exception as e:
+            print(f"Error storing blob: {e}")
+            return None
+
+    def get(self, ref: str) -> str | None:
+        """Return the text for a reference, or None if it is missing/unreadable."""
+        digest = self._digest(ref)
+        if digest is None:
+            return None
+        roots = [self.root] + ([self.fallback_root] if self.fallback_root else [])
+        for root, ext in ((root, ext) for root in roots for ext in ("zst", "zz")):
+            path = self._path(digest, ext, root)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    payload = f.read()
+                if ext == "zst":
+                    if not zstandard:
+                        print(f"WARNING: Blob {digest[:12]} is zstd-compressed but zstandard is not installed")
+                        return None
+                    raw = zstandard.ZstdDecompressor().decompress(payload)
+                else:
+                    raw = zlib.decompress(payload)
+                return raw.decode("utf-8")
+            except Exception as e:
+                print(f"Error reading blob {digest[:12]}: {e}")
+                return None
+        return None
+
+    def delete(self, ref: str) -> bool:
+        """Delete the blob for a reference (never in fallback_root). Returns True if a file was removed."""
+        digest = self._digest(ref)
+        if digest is None:
+            return False
+        removed = False
+        for ext in ("zst", "zz"):
+            try:
+                os.remove(self._path(digest, ext))
+                removed = True
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error deleting blob {digest[:12]}: {e}")
+        return removed
+
+    def clear(self) -> int:
+        """Delete every blob. Returns the number of files removed."""
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                try:
+                    os.remove(os.path.join(dirpath, name))
+                    removed += 1
+                except OSError as e:
+                    print(f"Error deleting blob {name}: {e}")
+        return removed
@@ -29,7 +29,12 @@ def load_settings():
         "sql_connection_string": "",
         "n8n_url": "http://localhost:5678",
         "n8n_api_key": "",
-        "show_browser": False
+        "show_browser": False,
+        "memory_ingestion_policy": {},
+        "vector_backend": "chroma",
+        "vector_compression": {},
+        "memory_service_url": "",
+        "session_store": "memory"
     }
     
     if not os.path.exists(SETTINGS_FILE):
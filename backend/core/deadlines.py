@@ -0,0 +1,136 @@
+"""
+Time limits for chat requests and the MCP tool calls they make.
+
+Every chat request gets a Deadline (settings.chat_deadline_s). Each MCP
+tool call is bounded by the smaller of its own timeout and what is left
+of that deadline, so one hung visit_page, SQL query or external server
+can no longer hold a request open indefinitely.
+
+Tool timeouts, most specific first:
+    settings.tool_timeouts[tool_name]
+    settings.tool_timeouts[agent_name]
+    TOOL_TIMEOUTS_S[tool_name]
+    AGENT_TIMEOUTS_S[agent_name]
+    DEFAULT_TOOL_TIMEOUT_S
+
+The timeout is passed down as the ClientSession read_timeout_seconds
+argument. MCPServerConnection turns it (and task cancellation) into an MCP
+notifications/cancelled for the server. Sessions that ignore the argument
+are still bounded here.
+
+stream_until_disconnect cancels an SSE generator's in-flight LLM and tool
+work as soon as the client goes away, instead of when the next event is
+written.
+"""
+import time
+import asyncio
+from datetime import timedelta
+from typing import Any, AsyncIterator, Optional
+
+DEFAULT_TOOL_TIMEOUT_S = 120.0
+CHAT_DEADLINE_S = 600.0
+DISCONNECT_POLL_S = 0.5
+# Extra time before the backstop fires, so the session reports its own timeout first
+TIMEOUT_GRACE_S = 1.0
+
+AGENT_TIMEOUTS_S = {
+    "time": 10,
+    "personal_details": 10,
+    "collect_data": 10,
+    "maps": 30,
+    "sql": 60,
+    "browser": 60,
+    "local_file_agent": 120,
+    "pdf_parser": 300,
+    "xlsx_parser": 300,
+}
+
+TOOL_TIMEOUTS_S = {
+    "search_web": 30,
+    "visit_page": 45,
+    "run_sql_query": 60,
+}
+
+
+class ToolTimeoutError(TimeoutError):
+    pass
+
+
+class Deadline:
+    """Absolute deadline for one request."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def request_deadline(settings: dict) -> Deadline:
+    return Deadline(float(settings.get("chat_deadline_s") or CHAT_DEADLINE_S))
+
+
+def tool_timeout_s(tool_name: str, agent_name: str, settings: Optional[dict] = None) -> float:
+    overrides = (settings or {}).get("tool_timeouts") or {}
+    for value in (overrides.get(tool_name), overrides.get(agent_name),
+                  TOOL_TIMEOUTS_S.get(tool_name), AGENT_TIMEOUTS_S.get(agent_name)):
+        if value:
+            return float(value)
+    return DEFAULT_TOOL_TIMEOUT_S
+
+
+async def call_tool_with_deadline(session, agent_name: str, tool_name: str, tool_args: dict,
+                                  deadline: Optional[Deadline] = None, settings: Optional[dict] = None):
+    """session.call_tool bounded by the tool's timeout and the request deadline; raises ToolTimeoutError."""
+    timeout_s = tool_timeout_s(tool_name, agent_name, settings)
+    limited_by_deadline = deadline is not None and deadline.remaining() < timeout_s
+    if limited_by_deadline:
+        timeout_s = deadline.remaining()
+    reason = "request deadline" if limited_by_deadline else "tool timeout"
+    if timeout_s <= 0:
+        raise ToolTimeoutError(f"Tool '{tool_name}' not started: request deadline exceeded")
+    try:
+        async with asyncio.timeout(timeout_s + TIMEOUT_GRACE_S):
+            return await session.call_tool(tool_name, tool_args, read_timeout_seconds=timedelta(seconds=timeout_s))
+    except TimeoutError as e:
+        raise ToolTimeoutError(f"Tool '{tool_name}' timed out after {timeout_s:.0f}s ({reason})") from e
+
+
+async def stream_until_disconnect(http_request, events: AsyncIterator[Any], poll_s: float = DISCONNECT_POLL_S):
+    """Relay an SSE generator; when the client disconnects, cancel whatever it is awaiting and stop."""
+    task = asyncio.current_task()
+    disconnected = False
+    waiting = False  # Only cancel while awaiting the generator, never mid-send
+
+    async def watch():
+        nonlocal disconnected
+        while not await http_request.is_disconnected():
+            await asyncio.sleep(poll_s)
+        disconnected = True
+        if waiting:
+            task.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        while not disconnected:
+            waiting = True
+            try:
+                event = await events.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                waiting = False
+            yield event
+    except asyncio.CancelledError:
+        if not disconnected:
+            raise
+        task.uncancel()
+    finally:
+        watcher.cancel()
+        await events.aclose()
+    if disconnected:
+        print("[SSE] Client disconnected; cancelled in-flight work")
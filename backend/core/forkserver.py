@@ -0,0 +1,412 @@
+"""
+Fork-server launcher for native agent processes.
+
+Each native agent used to start as `python agents/<name>.py`. That is a
+fresh interpreter, which re-imports mcp, pydantic, anyio and core.config
+before it can answer initialize. Every spawn pays for the imports,
+including lazy first use, supervisor restarts and extra pool workers. Each
+process also ends up with a private copy of the same modules.
+
+With settings.agent_fork_server the API starts one fork server:
+
+    python -m core.forkserver serve <socket> --preload mcp.server,...
+
+It imports the common modules once, freezes them out of the garbage
+collector, and then waits on a Unix socket. Agents are still spawned
+through stdio_client. The command is now a small launcher (`python -I -S
+core/forkserver.py launch ...`, stdlib only) that sends its stdin, stdout
+and stderr to the fork server (SCM_RIGHTS). The fork server forks a child
+that takes those fds as 0/1/2 and runs the agent script as __main__. The
+child shares the preloaded modules' pages with the fork server
+(copy-on-write). The launcher stays behind as the process stdio_client
+manages. It forwards termination signals to the agent and exits with the
+agent's exit code.
+
+If the fork server is not running, the launcher execs `python script.py`
+as before. POSIX only; see fork_server_supported().
+
+The launcher hands over its environment and stdio, so the socket lives in a
+private 0700 directory, and each side checks the other's credentials
+(SO_PEERCRED, where the platform has it) before trusting the connection.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import struct
+from typing import Optional
+
+# subprocess and tempfile are imported where used: the launcher runs this file and must start fast
+
+# Imported by (nearly) every agent; settings.agent_fork_server_preload adds agent-specific ones (e.g. pandas)
+FORKSERVER_PRELOAD = (
+    "anyio",
+    "pydantic",
+    "httpx",
+    "mcp.types",
+    "mcp.server",
+    "mcp.server.stdio",
+    "core.config",
+    "core.payloads",
+)
+# How long a launcher waits for a starting fork server before falling back to a plain spawn
+FORKSERVER_CONNECT_WAIT_S = 15.0
+FORKSERVER_REAP_INTERVAL_S = 1.0
+FORWARDED_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP) if hasattr(signal, "SIGHUP") else ()
+
+
+def fork_server_supported() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# --- Orchestrator side ---
+
+class ForkServer:
+    """Owns the fork server process and builds launcher commands for agents."""
+
+    def __init__(self, preload=FORKSERVER_PRELOAD, env: Optional[dict] = None, sock_path: Optional[str] = None):
+        self.preload = list(dict.fromkeys(preload))
+        self.env = env
+        self._private_dir = None
+        if sock_path is None:
+            import tempfile
+            # mkdtemp makes a 0700 directory no other user can reach into.
+            # Short path: AF_UNIX addresses are limited to ~100 bytes
+            self._private_dir = tempfile.mkdtemp(prefix="agent-forkserver-")
+            sock_path = os.path.join(self._private_dir, "fs.sock")
+        self.sock_path = sock_path
+        self.process = None  # subprocess.Popen
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Start the fork server; returns at once (launchers wait for its socket while it preloads)."""
+        import subprocess
+        backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "core.forkserver", "serve", self.sock_path, "--preload", ",".join(self.preload)],
+            cwd=backend_root, env=self.env, stdin=subprocess.DEVNULL,
+        )
+        print(f"DEBUG: Agent fork server started (pid {self.process.pid}, preloading {len(self.preload)} modules)")
+
+    def launcher_args(self, script_path: str, args: Optional[list] = None) -> list[str]:
+        """Arguments for sys.executable that run script_path forked from this server."""
+        pid = self.process.pid if self.process else 0
+        return ["-I", "-S", os.path.abspath(__file__), "launch", self.sock_path, str(pid), script_path, *(args or [])]
+
+    def stop(self):
+        """Stop the fork server. Agents already forked keep running until their sessions close."""
+        import subprocess
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        try:
+            os.unlink(self.sock_path)
+        except OSError:
+            pass
+        if self._private_dir:
+            try:
+                os.rmdir(self._private_dir)
+            except OSError:
+                pass
+
+
+def _peer_credentials(conn: socket.socket) -> Optional[tuple[int, int]]:
+    """(pid, uid) of the process at the other end of a Unix socket, or None where SO_PEERCRED is unavailable."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    pid, uid, _gid = struct.unpack("3i", conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")))
+    return pid, uid
+
+
+# --- Launcher (stdio_client's process; stdlib only, started with -I -S) ---
+
+def _connect(sock_path: str, server_pid: int) -> Optional[socket.socket]:
+    deadline = time.monotonic() + FORKSERVER_CONNECT_WAIT_S
+    while True:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(sock_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            conn.close()
+        else:
+            # Only hand our environment and stdio to the fork server we were told about
+            peer = _peer_credentials(conn)
+            if peer is None or peer == (server_pid, os.getuid()):
+                return conn
+            print(f"WARNING: {sock_path} is served by pid {peer[0]} (uid {peer[1]}), not the agent fork server; "
+                  "spawning directly", file=sys.stderr)
+            conn.close()
+            return None
+        # Socket not bound yet: the server is still preloading, unless it is gone
+        if not server_pid or not _alive(server_pid) or time.monotonic() > deadline:
+            return None
+        time.sleep(0.02)
+
+
+def launch(sock_path: str, server_pid: int, script: str, args: list[str]):
+    conn = _connect(sock_path, server_pid)
+    if conn is not None:
+        body = json.dumps({"script": os.path.abspath(script), "args": args,
+                           "env": dict(os.environ), "cwd": os.getcwd()}).encode("utf-8")
+        try:
+            socket.send_fds(conn, [struct.pack("!I", len(body)) + body], [0, 1, 2])
+            reply = conn.makefile("rb")
+            line = reply.readline()
+        except OSError as e:
+            print(f"WARNING: Agent fork server failed ({e}); spawning directly", file=sys.stderr)
+            line = b""
+        if line:
+            _wait_for_agent(int(line), reply)
+    os.execv(sys.executable, [sys.executable, script, *args])
+
+
+def _wait_for_agent(pid: int, reply):
+    # The agent holds the stdio pipes now; let go of ours so EOF reaches stdio_client when it exits
+    null = os.open(os.devnull, os.O_RDWR)
+    os.dup2(null, 0)
+    os.dup2(null, 1)
+    os.close(null)
+    for signum in FORWARDED_SIGNALS:
+        signal.signal(signum, lambda n, _frame: _alive(pid) and os.kill(pid, n))
+    line = reply.readline()
+    if line.startswith(b"exit "):
+        code = int(line.split()[1])
+        os._exit(code if code >= 0 else 128 - code)
+    # Fork server gone: the agent is no longer our (or its) child, so poll for it
+    while _alive(pid):
+        time.sleep(0.5)
+    os._exit(0)
+
+
+# --- Fork server ---
+
+_replaced_streams = []
+
+def _preload(modules: list[str]):
+    import gc
+    import importlib
+    started = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"WARNING: Fork server could not preload {name}: {e}")
+    # Objects that exist now are never collected; keeps the GC from writing to (and un-sharing) their pages
+    gc.collect()
+    gc.freeze()
+    print(f"DEBUG: Agent fork server preloaded {len(modules)} modules in "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def _read_request(conn: socket.socket) -> tuple[dict, list[int]]:
+    msg, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+    if len(fds) != 3 or len(msg) < 4:
+        for fd in fds:
+            os.close(fd)
+        raise ConnectionError("launcher sent no stdio fds")
+    (size,) = struct.unpack("!I", msg[:4])
+    body = msg[4:]
+    while len(body) < size:
+        chunk = conn.recv(size - len(body))
+        if not chunk:
+            raise ConnectionError("launcher closed the connection mid-request")
+        body += chunk
+    return json.loads(body), fds
+
+
+def _reopen_stdio():
+    """Fresh sys.stdin/stdout/stderr over fds 0-2, set up as a new interpreter would for what they are now."""
+    for name, fd, mode in (("stdin", 0, "r"), ("stdout", 1, "w"), ("stderr", 2, "w")):
+        old = getattr(sys, name)
+        # Kept referenced: the old objects own fds 0-2 and would close them when collected
+        _replaced_streams.append(old)
+        stream = open(fd, mode, closefd=False, encoding=old.encoding, errors=old.errors,
+                      buffering=1 if name == "stderr" or os.isatty(fd) else -1)
+        setattr(sys, name, stream)
+        setattr(sys, f"__{name}__", stream)
+
+
+def _run_child(request: dict, fds: list[int], inherited: list):
+    """In the forked child: become the agent process. Never returns."""
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        for signum in (signal.SIGCHLD, signal.SIGTERM, *FORWARDED_SIGNALS):
+            signal.signal(signum, signal.SIG_DFL)
+        for item in inherited:
+            item.close() if hasattr(item, "close") else os.close(item)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        _reopen_stdio()
+        os.environ.clear()
+        os.environ.update(request["env"])
+        os.chdir(request["cwd"])
+        script = request["script"]
+        sys.argv = [script, *request["args"]]
+        sys.path.insert(0, os.path.dirname(script))
+        if "random" in sys.modules:
+            sys.modules["random"].seed()  # Not the same sequence in every agent
+        import runpy
+        runpy.run_path(script, run_name="__main__")
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def serve(sock_path: str, preload: list[str]):
+    import select
+    sock_dir = os.path.dirname(os.path.abspath(sock_path))
+    st = os.stat(sock_dir)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        sys.exit(f"Fork server socket directory {sock_dir} must be private (owned by this user, mode 0700)")
+    _preload(preload)
+    try:
+        os.unlink(sock_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        sys.exit(f"Fork server cannot take over {sock_path}: {e}")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created 0600: no window in which another user could connect
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(sock_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+
+    # SIGCHLD wakes select through this pipe, so exits are reported without polling delay
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    children: dict[int, socket.socket] = {}   # agent pid -> its launcher's connection
+    watched: dict[socket.socket, int] = {}    # launcher connections still open
+    try:
+        while True:
+            ready, _, _ = select.select([listener, wake_r, *watched], [], [], FORKSERVER_REAP_INTERVAL_S)
+            for item in ready:
+                if item is wake_r:
+                    try:
+                        os.read(wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                elif item is listener:
+                    conn, _ = listener.accept()
+                    peer = _peer_credentials(conn)
+                    if peer is not None and peer[1] != os.getuid():
+                        print(f"WARNING: Fork server rejected a connection from uid {peer[1]}")
+                        conn.close()
+                        continue
+                    try:
+                        request, fds = _read_request(conn)
+                    except (OSError, ValueError) as e:
+                        print(f"WARNING: Fork server rejected a launch request: {e}")
+                        conn.close()
+                        continue
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    pid = os.fork()
+                    if pid == 0:
+                        _run_child(request, fds, [listener, wake_r, wake_w, conn, *watched])
+                    for fd in fds:
+                        os.close(fd)
+                    children[pid] = conn
+                    watched[conn] = pid
+                    try:
+                        conn.sendall(f"{pid}\n".encode())
+                    except OSError:
+                        pass
+                elif not _recv_or_eof(item):
+                    # Launcher killed outright (SIGKILL): take its agent down with it
+                    pid = watched.pop(item)
+                    if _alive(pid):
+                        os.kill(pid, signal.SIGTERM)
+            _reap(children, watched)
+    finally:
+        listener.close()
+        try:
+            os.unlink(sock_path)
+        except OSError:
+            pass
+
+
+def _recv_or_eof(conn: socket.socket) -> bytes:
+    try:
+        return conn.recv(1)
+    except OSError:
+        return b""
+
+
+def _reap(children: dict, watched: dict):
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        conn = children.pop(pid, None)
+        if conn is None:
+            continue
+        watched.pop(conn, None)
+        try:
+            conn.sendall(f"exit {os.waitstatus_to_exitcode(status)}\n".encode())
+        except OSError:
+            pass
+        conn.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["launch"] and len(argv) >= 4:
+        launch(argv[1], int(argv[2]), argv[3], argv[4:])
+    elif argv[:1] == ["serve"] and len(argv) >= 2:
+        preload = argv[3].split(",") if argv[2:3] == ["--preload"] and len(argv) > 3 else list(FORKSERVER_PRELOAD)
+        serve(argv[1], [name for name in preload if name])
+    else:
+        print("usage: forkserver.py launch <socket> <server-pid> <script> [args...]\n"
+              "       python -m core.forkserver serve <socket> [--preload mod1,mod2]", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
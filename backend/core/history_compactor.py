@@ -0,0 +1,144 @@
+"""
+Rolling summarization of short-term conversation history.
+
+Prompts replay only the newest turns verbatim (core.session.split_history).
+After a response is sent, schedule_history_compaction() folds the older
+turns into a running per-(agent, session) summary with a cheap model
+(settings.history_summary_model, defaulting to the chat model) and drops
+them from the raw history:
+
+    history_summary["<agent>_<session>"] = {"summary", "turns_folded", "updated_at"}
+
+Compaction waits until HISTORY_FOLD_MIN_TURNS turns are waiting, so one
+summary call covers several turns. If the model fails, the turns simply
+stay in the raw history and are retried after the next turn.
+"""
+import time
+import asyncio
+import threading
+
+from core.llm_providers import generate_response
+from core.session import get_session_store, split_history, _history_key
+
+HISTORY_FOLD_MIN_TURNS = 2
+HISTORY_SUMMARY_MAX_WORDS = 200
+HISTORY_SUMMARY_TURN_CHARS = 2000  # Per-message cap when building the summarization prompt
+CLOUD_MODEL_PREFIXES = ("gpt", "claude", "gemini", "bedrock")
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Merge the new turns into the existing summary. Keep facts, decisions, names, IDs, dates "
+    "and open requests; drop pleasantries and verbatim tool output. "
+    f"Reply with the updated summary only, in at most {HISTORY_SUMMARY_MAX_WORDS} words."
+)
+
+compaction_stats = {"runs": 0, "failures": 0, "turns_folded": 0, "last_ms": None}
+_stats_lock = threading.Lock()
+_in_flight: set[str] = set()
+_tasks: set[asyncio.Task] = set()  # Strong references until each task finishes
+
+
+def _summary_model(settings: dict) -> tuple[str, str]:
+    """(mode, model) for summarization: settings.history_summary_model or the chat model."""
+    model = (settings.get("history_summary_model") or "").strip()
+    if not model:
+        return settings.get("mode", "local"), settings.get("model", "mistral")
+    return ("cloud" if model.startswith(CLOUD_MODEL_PREFIXES) else "local"), model
+
+
+def _clip(text: str) -> str:
+    text = text or ""
+    return text if len(text) <= HISTORY_SUMMARY_TURN_CHARS else text[:HISTORY_SUMMARY_TURN_CHARS] + "…"
+
+
+def build_summary_prompt(previous: str, turns: list) -> str:
+    lines = [f"Existing summary:\n{previous or '(none)'}", "", "New turns:"]
+    for turn in turns:
+        lines.append(f"User: {_clip(turn.get('user'))}")
+        lines.append(f"Assistant: {_clip(turn.get('assistant'))}")
+    return "\n".join(lines)
+
+
+async def _summarize_with_llm(previous: str, turns: list, settings: dict) -> str | None:
+    mode, model = _summary_model(settings)
+    text = await generate_response(
+        build_summary_prompt(previous, turns), SUMMARY_SYSTEM_PROMPT, mode, model, settings,
+    )
+    text = (text or "").strip()
+    if not text or text.startswith(("Error", "Cloud API Error")):
+        print(f"WARNING: History summarization with {model} failed: {text[:200]}")
+        return None
+    return text
+
+
+async def compact_history(session_id: str, agent_id: str | None, settings: dict, summarize_fn=None) -> int:
+    """Fold turns outside the verbatim window into the running summary. Returns turns folded."""
+    store = get_session_store()
+    key = _history_key(session_id, agent_id)
+    to_fold, _ = split_history(store.get("history", key, []) or [])
+    if len(to_fold) < HISTORY_FOLD_MIN_TURNS:
+        return 0
+
+    previous = (store.get("history_summary", key, {}) or {}).get("summary", "")
+    started = time.perf_counter()
+    try:
+        summary = await (summarize_fn or _summarize_with_llm)(previous, to_fold, settings)
+    except Exception as e:
+        print(f"Error summarizing history for {key}: {e}")
+        summary = None
+    if not summary:
+        with _stats_lock:
+            compaction_stats["failures"] += 1
+        return 0
+
+    # Drop exactly the turns we summarized; skip if the history changed underneath (e.g. cleared)
+    folded = len(to_fold)
+    trimmed = []
+
+    def trim(turns):
+        if turns[:folded] == to_fold:
+            trimmed.append(True)
+            return turns[folded:]
+        return turns
+
+    store.update("history", key, trim, default=[])
+    if not trimmed:
+        return 0
+    store.update(
+        "history_summary", key,
+        lambda s: {
+            "summary": summary,
+            "turns_folded": (s or {}).get("turns_folded", 0) + folded,
+            "updated_at": time.time(),
+        },
+        default={},
+    )
+    with _stats_lock:
+        compaction_stats["runs"] += 1
+        compaction_stats["turns_folded"] += folded
+        compaction_stats["last_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"DEBUG: Folded {folded} turns of {key} into the history summary ({len(summary)} chars)")
+    return folded
+
+
+def schedule_history_compaction(session_id: str, agent_id: str | None, settings: dict):
+    """Run compact_history in the background (at most one per history at a time)."""
+    key = _history_key(session_id, agent_id)
+    if key in _in_flight:
+        return
+    _in_flight.add(key)
+
+    async def run():
+        try:
+            await compact_history(session_id, agent_id, settings)
+        finally:
+            _in_flight.discard(key)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def history_compaction_stats() -> dict:
+    with _stats_lock:
+        return {**compaction_stats, "in_flight": len(_in_flight)}
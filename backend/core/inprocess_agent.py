@@ -0,0 +1,162 @@
+"""
+In-process runtime for lightweight native agents.
+
+time, personal_details and collect_data are small pure-Python MCP servers.
+Running each one as a subprocess costs a Python interpreter apiece, and
+every call pays stdio JSON-RPC serialization. InProcessAgentSession imports
+the agent script as a module and dispatches straight to the handlers its
+`Server` decorators registered. Input validation and result normalization
+are the same as over stdio, but there is no transport.
+
+The stock handler also re-checks each tool's inputSchema against the JSON
+Schema metaschema on every call (jsonschema.validate), which costs more
+than the tool itself. Here validators are compiled once at load, and the
+server's cached tool definitions (the private Server._tool_cache, pinned
+by tests/test_inprocess_agent.py and the mcp range in requirements.txt)
+carry an empty inputSchema so the handler does not validate a second
+time. If that cache is missing or does not hold the listed tools, the
+handler is left to validate as usual.
+
+Only use this for agents whose handlers are quick and non-blocking: they
+run on the API event loop. Selected with settings.in_process_agents.
+"""
+import sys
+import copy
+import time
+import importlib.util
+
+import jsonschema
+from typing import Any, Optional
+
+from mcp import types
+from mcp.server.lowlevel import Server
+
+# Default for settings.in_process_agents
+IN_PROCESS_AGENTS = ("time", "personal_details", "collect_data")
+
+
+def load_agent_server(name: str, script_path: str) -> Server:
+    """Import an agent script under a private module name and return its MCP Server instance."""
+    module_name = f"_inprocess_agent_{name}"
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before executing, so pydantic can resolve postponed annotations in the module
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)  # `if __name__ == "__main__"` keeps the stdio loop from starting
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    servers = [v for v in vars(module).values() if isinstance(v, Server)]
+    if len(servers) != 1:
+        raise RuntimeError(f"Expected one MCP Server in {script_path}, found {len(servers)}")
+    return servers[0]
+
+
+class InProcessAgentSession:
+    """ClientSession stand-in that calls an agent's handlers directly, in this process."""
+
+    def __init__(self, name: str, script_path: str, timeline: Optional[dict] = None, clock=None):
+        self.name = name
+        self.script_path = script_path
+        self.timeline = timeline if timeline is not None else {}
+        self.clock = clock
+        self.server: Optional[Server] = None
+        self.tools: list[types.Tool] = []
+        self.validators: dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.stats = {"calls": 0, "total_ms": 0.0, "last_used": None}
+
+    @property
+    def running(self) -> bool:
+        return self.server is not None
+
+    async def prepare(self) -> bool:
+        """Import the agent and list its tools."""
+        started = time.perf_counter()
+        if self.clock:
+            self.timeline["start_ms"] = self.clock.elapsed_ms()
+        try:
+            self.server = load_agent_server(self.name, self.script_path)
+            self.timeline["initialize_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            t = time.perf_counter()
+            self.tools = list((await self.list_tools_uncached()).tools)
+            self._compile_validators()
+            self.timeline["list_tools_ms"] = round((time.perf_counter() - t) * 1000, 1)
+            self.timeline.update(status="ready", tools=len(self.tools))
+            return True
+        except Exception as e:
+            self.server = None
+            self.error = str(e)
+            self.timeline.update(status="failed", error=self.error)
+            print(f"Error loading agent {self.name} in-process: {e}")
+            return False
+        finally:
+            self.timeline["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def list_tools_uncached(self) -> types.ListToolsResult:
+        result = await self.server.request_handlers[types.ListToolsRequest](types.ListToolsRequest(method="tools/list"))
+        return result.root
+
+    def _compile_validators(self):
+        for tool in self.tools:
+            cls = jsonschema.validators.validator_for(tool.inputSchema)
+            cls.check_schema(tool.inputSchema)
+            self.validators[tool.name] = cls(tool.inputSchema)
+        tool_cache = getattr(self.server, "_tool_cache", None)
+        # Only rewrite a cache that looks like the one list_tools just filled (name -> Tool)
+        if not (isinstance(tool_cache, dict) and all(tool.name in tool_cache for tool in self.tools)
+                and all(isinstance(cached, types.Tool) for cached in tool_cache.values())):
+            # Still correct, just slower: the handler validates every call again
+            print(f"WARNING: mcp Server tool cache not recognised; agent {self.name} validates tool input twice")
+            return
+        for tool in self.tools:
+            tool_cache[tool.name] = tool.model_copy(update={"inputSchema": {}})
+
+    # --- ClientSession surface ---
+
+    async def initialize(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs) -> types.ListToolsResult:
+        return types.ListToolsResult(tools=list(self.tools))
+
+    async def call_tool(self, name: str, arguments: Optional[dict[str, Any]] = None, *args, **kwargs) -> types.CallToolResult:
+        if self.server is None:
+            raise RuntimeError(f"Agent '{self.name}' is not loaded: {self.error}")
+        started = time.perf_counter()
+        try:
+            validator = self.validators.get(name)
+            if validator is not None:
+                error = jsonschema.exceptions.best_match(validator.iter_errors(arguments or {}))
+                if error is not None:
+                    return types.CallToolResult(
+                        content=[types.TextContent(type="text", text=f"Input validation error: {error.message}")],
+                        isError=True,
+                    )
+            request = types.CallToolRequest(
+                method="tools/call",
+                # Copied, as serialization would: a handler must not mutate the caller's dict
+                params=types.CallToolRequestParams(name=name, arguments=copy.deepcopy(arguments or {})),
+            )
+            result = await self.server.request_handlers[types.CallToolRequest](request)
+            return result.root
+        finally:
+            self.stats["calls"] += 1
+            self.stats["total_ms"] += (time.perf_counter() - started) * 1000
+            self.stats["last_used"] = time.time()
+
+    async def stop(self):
+        pass
+
+    def status(self) -> dict:
+        calls = self.stats["calls"]
+        return {
+            "running": self.running,
+            "in_process": True,
+            "tools": len(self.tools),
+            "error": self.error,
+            "calls": calls,
+            "mean_ms": round(self.stats["total_ms"] / calls, 3) if calls else None,
+            "last_used": self.stats["last_used"],
+        }
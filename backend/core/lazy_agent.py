@@ -0,0 +1,283 @@
+"""
+On-demand native agents backed by a persisted tool manifest.
+
+Spawning every agent at startup costs seconds of imports and keeps
+playwright, pandas, pdfplumber etc. resident even when their tools are
+never called. Instead, each agent's list_tools result is saved to
+data/tool_manifests/<agent>.json, keyed by a hash of the agent script and
+the local modules it imports (core/, services/, ...).
+On the next start the tools are advertised straight from the manifest,
+and the process is spawned on the first call_tool. With
+settings.agent_idle_shutdown_min it is stopped again after that many
+idle minutes, and respawned on the next call. While running, the process
+is health-checked and restarted if it dies (see MCPServerConnection).
+
+LazyAgentSession has the ClientSession methods the routes use
+(list_tools, call_tool), so it sits in core.server.agent_sessions
+unchanged.
+"""
+import os
+import sys
+import ast
+import json
+import time
+import asyncio
+import hashlib
+from importlib import metadata
+from typing import Any, Optional
+
+from mcp import StdioServerParameters, types
+
+from core.config import DATA_DIR
+from core.mcp_client import MCPServerConnection, StartupTimeline, MCP_CONNECT_TIMEOUT_S, MCP_HEALTH_CHECK_S
+
+TOOL_MANIFEST_DIR = os.path.join(DATA_DIR, "tool_manifests")
+TOOL_MANIFEST_VERSION = 2
+# Agents run with the backend root on PYTHONPATH (next to their own directory)
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IDLE_CHECK_INTERVAL_S = 30
+
+
+def _mcp_version() -> str:
+    try:
+        return metadata.version("mcp")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _module_file(root: str, module: str) -> Optional[str]:
+    base = os.path.join(root, *module.split("."))
+    for path in (base + ".py", os.path.join(base, "__init__.py")):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _imported_files(path: str, roots: list[str]) -> list[str]:
+    """Local source files `path` imports (from any of roots or relatively), packages' __init__ included."""
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+    modules: list[tuple[list[str], str]] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules += [(roots, alias.name) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            search = roots
+            if node.level:
+                # Relative import: resolved against the importing file's package
+                base = os.path.dirname(path)
+                for _ in range(node.level - 1):
+                    base = os.path.dirname(base)
+                search = [base]
+            prefix = f"{node.module}." if node.module else ""
+            if node.module:
+                modules.append((search, node.module))
+            modules += [(search, prefix + alias.name) for alias in node.names if alias.name != "*"]
+    files = []
+    for search, module in modules:
+        if module in sys.builtin_module_names:
+            continue
+        parts = module.split(".")
+        for root in search:
+            # Every package on the way (a.b.c imports a/__init__.py and a/b/__init__.py too)
+            found = [_module_file(root, ".".join(parts[:i])) for i in range(1, len(parts) + 1)]
+            files += [f for f in found if f]
+            if any(found):
+                break
+    return files
+
+
+def code_hash(script_path: str) -> str:
+    """
+    Manifest key: the manifest format and mcp versions, the agent script and
+    every local module it imports, directly or through other local modules.
+    Third-party packages (not found under the script's directory or the
+    backend root) are not hashed.
+    """
+    script_path = os.path.abspath(script_path)
+    roots = [os.path.dirname(script_path), BACKEND_ROOT]
+    digest = hashlib.sha256(f"{TOOL_MANIFEST_VERSION}:{_mcp_version()}:".encode())
+    seen, pending = {script_path}, [script_path]
+    while pending:
+        for path in _imported_files(pending.pop(), roots):
+            if path not in seen:
+                seen.add(path)
+                pending.append(path)
+    for path in [script_path] + sorted(seen - {script_path}):
+        digest.update(f"\0{os.path.relpath(path, BACKEND_ROOT)}\0".encode())
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _manifest_path(name: str, manifest_dir: str) -> str:
+    return os.path.join(manifest_dir, f"{name}.json")
+
+
+def load_tool_manifest(name: str, script_path: str, manifest_dir: str = TOOL_MANIFEST_DIR) -> Optional[list[types.Tool]]:
+    """Tools from a manifest matching the script's current code hash, else None."""
+    path = _manifest_path(name, manifest_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("code_hash") != code_hash(script_path):
+            print(f"DEBUG: Tool manifest for {name} is stale (agent code changed)")
+            return None
+        return [types.Tool.model_validate(t) for t in manifest.get("tools", [])]
+    except Exception as e:
+        print(f"WARNING: Unreadable tool manifest {path}: {e}")
+        return None
+
+
+def _dump_tools(tools: list) -> list[dict]:
+    return [t.model_dump(mode="json", by_alias=True, exclude_none=True) for t in tools]
+
+
+def save_tool_manifest(name: str, script_path: str, tools: list, manifest_dir: str = TOOL_MANIFEST_DIR):
+    os.makedirs(manifest_dir, exist_ok=True)
+    path = _manifest_path(name, manifest_dir)
+    manifest = {
+        "agent": name,
+        "code_hash": code_hash(script_path),
+        "saved_at": time.time(),
+        "tools": _dump_tools(tools),
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class LazyAgentSession:
+    """ClientSession stand-in that spawns its agent on first call_tool (and after idle shutdown)."""
+
+    def __init__(self, name: str, script_path: str, params: StdioServerParameters, lazy: bool = True,
+                 idle_shutdown_s: float = 0, timeout_s: float = MCP_CONNECT_TIMEOUT_S,
+                 health_check_s: float = MCP_HEALTH_CHECK_S, timeline: Optional[dict] = None, clock: Optional[StartupTimeline] = None,
+                 manifest_dir: str = TOOL_MANIFEST_DIR):
+        self.name = name
+        self.script_path = script_path
+        self.params = params
+        self.lazy = lazy
+        self.idle_shutdown_s = idle_shutdown_s
+        self.timeout_s = timeout_s
+        self.health_check_s = health_check_s
+        self.timeline = timeline if timeline is not None else {}
+        self.clock = clock
+        self.manifest_dir = manifest_dir
+        self.tools: list[types.Tool] = (load_tool_manifest(name, script_path, manifest_dir) if lazy else None) or []
+        self.from_manifest = bool(self.tools)
+        self.connection: Optional[MCPServerConnection] = None
+        self.error: Optional[str] = None
+        self.stats = {"spawns": 0, "calls": 0, "idle_shutdowns": 0, "last_used": None}
+        self._in_flight = 0
+        self._start_lock = asyncio.Lock()
+        self._idle_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self.connection and self.connection.session)
+
+    async def prepare(self) -> bool:
+        """Startup: advertise manifest tools without spawning, or spawn now when there is no manifest."""
+        if self.lazy and self.from_manifest:
+            self.timeline.update(status="deferred", tools=len(self.tools))
+            print(f"DEBUG: {self.name}: {len(self.tools)} tools from manifest, spawning on first use")
+            return True
+        try:
+            await self._ensure_started()
+            return True
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+    def defer(self, tools: list[types.Tool]):
+        """Advertise tools another worker of the same agent listed, and spawn on first use (even if not lazy)."""
+        self.tools = list(tools) or self.tools
+        self.from_manifest = bool(self.tools)
+        self.timeline.update(status="deferred", tools=len(self.tools))
+
+    async def _ensure_started(self):
+        async with self._start_lock:
+            if self.connection and (self.connection.running or self.connection.restarting):
+                # While its supervisor restarts it, calls fail fast rather than spawning a second process
+                return self.connection
+            if self.connection:
+                await self.connection.stop()
+            connection = MCPServerConnection(self.name, self.params, timeout_s=self.timeout_s,
+                                             timeline=self.timeline, clock=self.clock,
+                                             health_check_s=self.health_check_s)
+            if not await connection.start():
+                self.error = connection.error
+                raise RuntimeError(f"Agent '{self.name}' failed to start: {connection.error}")
+            self.connection = connection
+            self.error = None
+            self.stats["spawns"] += 1
+            self.stats["last_used"] = time.time()
+            # The live tool list wins over a manifest that missed a code change (names, schemas or descriptions)
+            if _dump_tools(connection.tools) != _dump_tools(self.tools) or not self.from_manifest:
+                if self.from_manifest:
+                    print(f"WARNING: {self.name}: tool manifest was stale, replacing it with the live tool list")
+                self.tools = connection.tools
+                self.from_manifest = True
+                try:
+                    save_tool_manifest(self.name, self.script_path, self.tools, self.manifest_dir)
+                except Exception as e:
+                    print(f"WARNING: Could not save tool manifest for {self.name}: {e}")
+            if self.idle_shutdown_s > 0 and (self._idle_task is None or self._idle_task.done()):
+                self._idle_task = asyncio.create_task(self._idle_watch(), name=f"idle-{self.name}")
+            return connection
+
+    async def _idle_watch(self):
+        while self.connection is not None:
+            await asyncio.sleep(min(IDLE_CHECK_INTERVAL_S, self.idle_shutdown_s))
+            idle_for = time.time() - (self.stats["last_used"] or 0)
+            if self.running and self._in_flight == 0 and idle_for >= self.idle_shutdown_s:
+                async with self._start_lock:
+                    if self._in_flight == 0 and self.connection:
+                        print(f"DEBUG: Stopping idle agent {self.name} (unused for {idle_for:.0f}s)")
+                        connection, self.connection = self.connection, None
+                        self.stats["idle_shutdowns"] += 1
+                        self.timeline["status"] = "idle"
+                        await connection.stop()
+
+    # --- ClientSession surface ---
+
+    async def initialize(self):
+        pass
+
+    async def list_tools(self, *args, **kwargs) -> types.ListToolsResult:
+        return types.ListToolsResult(tools=list(self.tools))
+
+    async def call_tool(self, name: str, arguments: Optional[dict[str, Any]] = None, *args, **kwargs):
+        self._in_flight += 1
+        try:
+            connection = await self._ensure_started()
+            self.stats["calls"] += 1
+            return await connection.call_tool(name, arguments, *args, **kwargs)
+        finally:
+            self._in_flight -= 1
+            self.stats["last_used"] = time.time()
+
+    async def stop(self):
+        if self._idle_task and not self._idle_task.done():
+            self._idle_task.cancel()
+        if self.connection:
+            connection, self.connection = self.connection, None
+            await connection.stop()
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "from_manifest": self.from_manifest,
+            "tools": len(self.tools),
+            "error": self.error,
+            "restarts": self.connection.stats["restarts"] if self.connection else 0,
+            "restarting": bool(self.connection and self.connection.restarting),
+            **self.stats,
+        }
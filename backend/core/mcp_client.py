@@ -1,18 +1,360 @@
 import os
 import json
 import sys
+import time
 import asyncio
+from datetime import timedelta
 from typing import List, Dict, Any, Optional
-from mcp import ClientSession, StdioServerParameters
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
-from contextlib import AsyncExitStack
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamable_http_client
+from mcp.shared.exceptions import McpError
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import httpx
+
+from core.agent_pool import AgentPool
 
 MCP_SERVERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "mcp_servers.json")
+# Spawn + initialize + list_tools budget per server; external configs may set "startup_timeout_s"
+MCP_CONNECT_TIMEOUT_S = 60.0
+# Supervision: ping every MCP_HEALTH_CHECK_S (0 = off; external configs may set "health_check_s"),
+# restart a dead or unresponsive server with exponential backoff between attempts
+MCP_HEALTH_CHECK_S = 30.0
+MCP_PING_TIMEOUT_S = 10.0
+MCP_RESTART_BACKOFF_S = 1.0
+MCP_RESTART_BACKOFF_MAX_S = 60.0
+# Remote servers ("url" in mcp_servers.json): HTTP timeout, and how long a stream may stay silent
+MCP_HTTP_TIMEOUT_S = 30.0
+MCP_SSE_READ_TIMEOUT_S = 300.0
+MCP_REMOTE_TRANSPORTS = ("http", "sse")
+
+
+class RemoteServerParameters:
+    """
+    An MCP server reached over the network: transport "http" (streamable HTTP) or "sse".
+
+    The httpx client is created once and shared by every session to this
+    server (pool workers, reconnects), so keep-alive connections are reused
+    rather than re-established. Close it with aclose() when the server is removed.
+    """
+
+    def __init__(self, url: str, transport: str = "http", headers: Optional[Dict[str, str]] = None,
+                 timeout_s: float = MCP_HTTP_TIMEOUT_S):
+        if transport not in MCP_REMOTE_TRANSPORTS:
+            raise ValueError(f"Unknown MCP transport '{transport}' (expected one of {', '.join(MCP_REMOTE_TRANSPORTS)})")
+        self.url = url
+        self.transport = transport
+        self.headers = headers or {}
+        self.timeout_s = timeout_s
+        self._http_client = None
+
+    def http_client(self):
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                headers=self.headers, timeout=httpx.Timeout(self.timeout_s, read=MCP_SSE_READ_TIMEOUT_S),
+                follow_redirects=True,
+            )
+        return self._http_client
+
+    def transport_client(self):
+        """Async context manager yielding the (read, write) streams for a ClientSession."""
+        if self.transport == "sse":
+            return sse_client(self.url, headers=self.headers, timeout=self.timeout_s, sse_read_timeout=MCP_SSE_READ_TIMEOUT_S)
+        return _streams_only(streamable_http_client(self.url, http_client=self.http_client()))
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+
+@asynccontextmanager
+async def _streams_only(transport):
+    async with transport as (read, write, _get_session_id):
+        yield read, write
+
+
+class StartupTimeline:
+    """Per-server startup phases (spawn, initialize, list_tools), served by /api/startup/timeline."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.finished_ms: float | None = None
+        self.servers: Dict[str, Dict[str, Any]] = {}
+
+    def elapsed_ms(self, since: float | None = None) -> float:
+        return round((time.perf_counter() - (self._t0 if since is None else since)) * 1000, 1)
+
+    def server(self, name: str, kind: str) -> Dict[str, Any]:
+        entry = {"name": name, "kind": kind, "status": "pending", "start_ms": None, "spawn_ms": None,
+                 "initialize_ms": None, "list_tools_ms": None, "total_ms": None, "tools": 0, "error": None}
+        self.servers[name] = entry
+        return entry
+
+    def finish(self):
+        self.finished_ms = self.elapsed_ms()
+
+    def snapshot(self) -> Dict[str, Any]:
+        servers = sorted(self.servers.values(), key=lambda e: (e["start_ms"] is None, e["start_ms"] or 0))
+        return {
+            "started_at": self.started_at,
+            "total_ms": self.finished_ms,
+            "servers": [dict(e) for e in servers],
+        }
+
+
+def _error_text(e: BaseException) -> str:
+    """Message of the first leaf exception (the MCP transports wrap failures in task-group exception groups)."""
+    while isinstance(e, BaseExceptionGroup) and e.exceptions:
+        e = e.exceptions[0]
+    return str(e) or type(e).__name__
+
+
+class MCPServerConnection:
+    """
+    One MCP server (a stdio process, or a remote one over HTTP/SSE), owned by its own task.
+
+    The task spawns the process, initializes the session and lists tools,
+    then holds the transport open until stop(). The MCP transports use
+    anyio cancel scopes, which must be exited by the task that entered
+    them. Giving each server a task is what lets servers start
+    concurrently and shut down (or fail) independently.
+
+    With health_check_s set, a supervisor task pings the server and
+    restarts it (exponential backoff) when the process dies or stops
+    answering. Route calls through call_tool rather than .session: it
+    follows restarts, and fails fast while the server is down instead of
+    waiting on a dead process.
+    """
+
+    def __init__(self, name: str, params: StdioServerParameters | RemoteServerParameters, timeout_s: float = MCP_CONNECT_TIMEOUT_S,
+                 timeline: Optional[Dict[str, Any]] = None, clock: Optional[StartupTimeline] = None,
+                 health_check_s: float = 0, ping_timeout_s: float = MCP_PING_TIMEOUT_S,
+                 backoff_s: float = MCP_RESTART_BACKOFF_S, backoff_max_s: float = MCP_RESTART_BACKOFF_MAX_S):
+        self.name = name
+        self.params = params
+        self.timeout_s = timeout_s
+        self.timeline = timeline if timeline is not None else {}
+        self.clock = clock
+        self.health_check_s = health_check_s
+        self.ping_timeout_s = ping_timeout_s
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.session: Optional[ClientSession] = None
+        self.tools: list = []
+        self.error: Optional[str] = None
+        self.restarting = False
+        self.stats = {"restarts": 0, "failed_restarts": 0, "health_failures": 0, "cancelled_calls": 0, "last_ping_ms": None}
+        self._closed = False
+        self._stop = asyncio.Event()   # Ends the current transport
+        self._down = asyncio.Event()   # The current transport was lost
+        self._task: Optional[asyncio.Task] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.session is not None
+
+    def _mark(self, phase: str, started: float):
+        self.timeline[f"{phase}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def start(self) -> bool:
+        """Connect; returns False (with self.error set) on failure or timeout."""
+        ok = await self._connect()
+        if ok and self.health_check_s > 0 and self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise(), name=f"mcp-supervisor-{self.name}")
+        return ok
+
+    async def _connect(self) -> bool:
+        self._stop = asyncio.Event()
+        self._down = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready), name=f"mcp-{self.name}")
+        return await ready
+
+    async def _run(self, ready: asyncio.Future):
+        started = time.perf_counter()
+        if self.clock:
+            self.timeline["start_ms"] = self.clock.elapsed_ms()
+        self.timeline["status"] = "connecting"
+        deadline = asyncio.timeout(self.timeout_s)
+        try:
+            async with AsyncExitStack() as stack:
+                async with deadline:
+                    t = time.perf_counter()
+                    if isinstance(self.params, RemoteServerParameters):
+                        read, write = await stack.enter_async_context(self.params.transport_client())
+                    else:
+                        read, write = await stack.enter_async_context(stdio_client(self.params))
+                    self._mark("spawn", t)
+                    session = await stack.enter_async_context(ClientSession(read, write))
+                    t = time.perf_counter()
+                    await session.initialize()
+                    self._mark("initialize", t)
+                    t = time.perf_counter()
+                    result = await session.list_tools()
+                    self._mark("list_tools", t)
+                self.session = session
+                self.tools = list(result.tools)
+                self.timeline.update(status="ready", tools=len(self.tools))
+                self._mark("total", started)
+                ready.set_result(True)
+                await self._stop.wait()
+        except (Exception, asyncio.CancelledError) as e:
+            if deadline.expired():
+                self.error = f"timed out after {self.timeout_s:g}s"
+            else:
+                self.error = _error_text(e)
+            if not ready.done():
+                self.timeline.update(status="failed", error=self.error)
+                self._mark("total", started)
+                ready.set_result(False)
+        finally:
+            self.session = None
+            if not ready.done():
+                ready.set_result(False)
+            elif not self._stop.is_set():
+                # The process exited or the transport broke after startup
+                print(f"WARNING: MCP server '{self.name}' went down: {self.error}")
+                self._down.set()
+
+    async def _disconnect(self):
+        self._stop.set()
+        if self._task and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (Exception, asyncio.CancelledError) as e:
+                print(f"Error stopping MCP server '{self.name}': {e}")
+
+    async def stop(self):
+        """Stop supervising, close the session and terminate the process (idempotent)."""
+        self._closed = True
+        if self._supervisor and not self._supervisor.done() and self._supervisor is not asyncio.current_task():
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except (Exception, asyncio.CancelledError):
+                pass
+        await self._disconnect()
+
+    # --- Supervision ---
+
+    async def ping(self) -> bool:
+        session = self.session
+        if session is None:
+            return False
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=self.ping_timeout_s)
+            self.stats["last_ping_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return True
+        except asyncio.TimeoutError:
+            self.error = f"health check failed: no ping reply in {self.ping_timeout_s:g}s"
+        except Exception as e:
+            self.error = f"health check failed: {_error_text(e)}"
+        self.stats["health_failures"] += 1
+        print(f"WARNING: MCP server '{self.name}' {self.error}")
+        return False
+
+    async def _supervise(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._down.wait(), timeout=self.health_check_s)
+            except asyncio.TimeoutError:
+                if await self.ping():
+                    continue
+            if not self._closed:
+                await self.restart()
+
+    async def restart(self) -> bool:
+        """Replace the process, retrying with exponential backoff until it starts or stop() is called."""
+        self.restarting = True
+        self._down.set()  # Calls in flight on the old process fail now rather than hang
+        delay = self.backoff_s
+        try:
+            while not self._closed:
+                await self._disconnect()
+                print(f"DEBUG: Restarting MCP server '{self.name}'...")
+                self.timeline["status"] = "restarting"
+                if await self._connect():
+                    self.stats["restarts"] += 1
+                    print(f"DEBUG: MCP server '{self.name}' restarted")
+                    return True
+                self.stats["failed_restarts"] += 1
+                print(f"WARNING: Restart of MCP server '{self.name}' failed ({self.error}); retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.backoff_max_s)
+            return False
+        finally:
+            self.restarting = False
+
+    # --- ClientSession surface (follows restarts) ---
+
+    async def list_tools(self, *args, **kwargs) -> types.ListToolsResult:
+        return types.ListToolsResult(tools=list(self.tools))
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                        read_timeout_seconds: Optional[timedelta] = None, *args, **kwargs):
+        session = self.session
+        if session is None or self.restarting or self._down.is_set():
+            state = "restarting" if self.restarting else "not running"
+            raise RuntimeError(f"MCP server '{self.name}' is {state}: {self.error}")
+        call = asyncio.ensure_future(self._call_tool(session, name, arguments, read_timeout_seconds, *args, **kwargs))
+        down = asyncio.ensure_future(self._down.wait())
+        try:
+            await asyncio.wait({call, down}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            call.cancel()  # The caller gave up (e.g. SSE client disconnected): cancel on the server too
+            raise
+        finally:
+            down.cancel()
+        if not call.done():
+            call.cancel()
+            raise RuntimeError(f"MCP server '{self.name}' went down during {name}: {self.error}")
+        error = call.exception()
+        if isinstance(error, McpError) and error.error.code == types.CONNECTION_CLOSED:
+            # The process exited: restart now rather than at the next health check
+            self.error = f"connection closed during {name}"
+            self._down.set()
+        return call.result()
+
+    async def _call_tool(self, session: ClientSession, name: str, arguments, timeout: Optional[timedelta], *args, **kwargs):
+        """One tools/call; on timeout or cancellation the server gets notifications/cancelled."""
+        # ClientSession.call_tool reaches send_request, which claims the next id, before its
+        # first await, so no concurrent call can take this id first (tests/test_deadlines.py).
+        # The counter is private mcp state (range pinned in requirements.txt): without it the
+        # call still times out, the server just is not told to stop.
+        request_id = getattr(session, "_request_id", None)
+        try:
+            async with asyncio.timeout(timeout.total_seconds() if timeout else None):
+                return await session.call_tool(name, arguments, *args, **kwargs)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            reason = "timed out" if isinstance(e, TimeoutError) else "cancelled by client"
+            self.stats["cancelled_calls"] += 1
+            if not isinstance(request_id, int):
+                print(f"DEBUG: No request id for {name} on MCP server '{self.name}', skipping cancellation notice")
+                raise
+            try:
+                await asyncio.shield(session.send_notification(types.ClientNotification(types.CancelledNotification(
+                    params=types.CancelledNotificationParams(requestId=request_id, reason=f"{name} {reason}"),
+                ))))
+            except Exception as notify_error:
+                print(f"DEBUG: Could not send cancellation to MCP server '{self.name}': {notify_error}")
+            raise
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.running, "restarting": self.restarting, "error": self.error, **self.stats}
+
 
 class MCPClientManager:
-    def __init__(self, exit_stack: AsyncExitStack):
+    def __init__(self, exit_stack: AsyncExitStack, timeline: Optional[StartupTimeline] = None):
         self.exit_stack = exit_stack
-        self.sessions: Dict[str, ClientSession] = {}
+        self.timeline = timeline
+        self.sessions: Dict[str, MCPServerConnection | AgentPool] = {}  # Restart-following call surfaces
+        self.connections: Dict[str, MCPServerConnection | AgentPool] = {}
+        self.remote_params: Dict[str, RemoteServerParameters] = {}
         self.servers_config: List[Dict[str, Any]] = self.load_servers()
 
     def load_servers(self) -> List[Dict[str, Any]]:
@@ -30,54 +372,87 @@ class MCPClientManager:
         with open(MCP_SERVERS_FILE, 'w') as f:
             json.dump(self.servers_config, f, indent=4)
 
-    async def connect_server(self, config: Dict[str, Any]) -> Optional[ClientSession]:
+    async def connect_server(self, config: Dict[str, Any]) -> Optional[MCPServerConnection | AgentPool]:
         name = config.get("name")
         command = config.get("command")
         args = config.get("args", [])
         env_vars = config.get("env", {})
+        url = config.get("url")
 
-        if not name or not command:
+        if not name or not (command or url):
             print(f"Skipping invalid server config: {config}")
             return None
 
-        print(f"Connecting to MCP server '{name}' ({command} {args})...")
-        
-        # Prepare environment
-        env = os.environ.copy()
-        env.update(env_vars)
+        if url:
+            # Remote server: {"url": ..., "transport": "http" | "sse", "headers": {...}}
+            print(f"Connecting to remote MCP server '{name}' ({url})...")
+            try:
+                server_params = RemoteServerParameters(
+                    url, transport=config.get("transport", "http"), headers=config.get("headers"),
+                    timeout_s=float(config.get("http_timeout_s") or MCP_HTTP_TIMEOUT_S),
+                )
+            except ValueError as e:
+                print(f"Skipping invalid server config '{name}': {e}")
+                return None
+        else:
+            print(f"Connecting to MCP server '{name}' ({command} {args})...")
+
+            # Prepare environment
+            env = os.environ.copy()
+            env.update(env_vars)
+
+            # Handle 'npx' explicitly if needed, but often checking command is enough
+            # If running on linux/mac, Ensure PATH is correct
 
-        # Handle 'npx' explicitly if needed, but often checking command is enough
-        # If running on linux/mac, Ensure PATH is correct
-        
-        try:
             server_params = StdioServerParameters(
                 command=command,
                 args=args,
                 env=env
             )
-
-            read, write = await self.exit_stack.enter_async_context(stdio_client(server_params))
-            session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-            await session.initialize()
-            
-            self.sessions[name] = session
-            print(f"Connected to MCP server '{name}'.")
-            return session
-        except Exception as e:
-            print(f"Failed to connect to MCP server '{name}': {e}")
+        # "workers": N runs N processes (or remote sessions) of the server behind one AgentPool
+        count = max(1, int(config.get("workers") or 1))
+        workers = [
+            MCPServerConnection(
+                name, server_params,
+                timeout_s=float(config.get("startup_timeout_s") or MCP_CONNECT_TIMEOUT_S),
+                timeline=self.timeline.server(f"ext_mcp_{name}" if i == 0 else f"ext_mcp_{name}#{i + 1}",
+                                              "remote" if url else "external")
+                if self.timeline else None,
+                clock=self.timeline,
+                health_check_s=float(config.get("health_check_s", MCP_HEALTH_CHECK_S)),
+            )
+            for i in range(count)
+        ]
+        started = await asyncio.gather(*(w.start() for w in workers))
+        for worker, ok in zip(workers, started):
+            if not ok:
+                print(f"Failed to connect to MCP server '{name}': {worker.error}")
+        live = [w for w, ok in zip(workers, started) if ok]
+        if not live:
+            if url:
+                await server_params.aclose()
             return None
+        connection = live[0] if count == 1 else AgentPool(name, live)
+        if url:
+            self.remote_params[name] = server_params
+            self.exit_stack.push_async_callback(server_params.aclose)
+        self.exit_stack.push_async_callback(connection.stop)
+
+        self.sessions[name] = connection
+        self.connections[name] = connection
+        print(f"Connected to MCP server '{name}'.")
+        return connection
 
     async def connect_all(self):
-        """Connect to all configured servers."""
-        for config in self.servers_config:
-            # Avoid duplicate connections
-            if config["name"] in self.sessions:
-                continue
-            await self.connect_server(config)
+        """Connect to all configured servers concurrently (a slow or broken one does not hold up the rest)."""
+        # Avoid duplicate connections
+        pending = [c for c in self.servers_config if c.get("name") not in self.sessions]
+        await asyncio.gather(*(self.connect_server(config) for config in pending))
         return self.sessions
 
-    async def add_server(self, name: str, command: str, args: List[str], env: Dict[str, str] = None):
-        """Add a new server configuration and connect to it."""
+    async def add_server(self, name: str, command: Optional[str] = None, args: List[str] = None, env: Dict[str, str] = None,
+                         url: Optional[str] = None, transport: str = "http", headers: Dict[str, str] = None):
+        """Add a new server configuration (a local command, or a remote url) and connect to it."""
         import shutil
         
         # Check if exists
@@ -85,6 +460,19 @@ class MCPClientManager:
             if s["name"] == name:
                 raise ValueError(f"Server with name '{name}' already exists.")
 
+        if url:
+            if transport not in MCP_REMOTE_TRANSPORTS:
+                raise ValueError(f"Unknown transport '{transport}'. Use one of: {', '.join(MCP_REMOTE_TRANSPORTS)}.")
+            new_config = {"name": name, "url": url, "transport": transport, "headers": headers or {}}
+            if not await self.connect_server(new_config):
+                raise RuntimeError(f"Could not connect to server '{name}' at {url}.")
+            self.servers_config.append(new_config)
+            self.save_servers()
+            return new_config
+
+        if not command:
+            raise ValueError("Either a command or a url is required.")
+
         # Check if command is installed
         if shutil.which(command) is None:
             if command == "uvx":
@@ -97,7 +485,7 @@ class MCPClientManager:
         new_config = {
             "name": name,
             "command": command,
-            "args": args,
+            "args": args or [],
             "env": env or {}
         }
         
@@ -115,16 +503,14 @@ class MCPClientManager:
         self.servers_config = [s for s in self.servers_config if s["name"] != name]
         self.save_servers()
         
-        # We can't easily "disconnect" a session in mcp python client explicitely without closing the whole stack?
-        # Actually ClientSession doesn't have a close/disconnect method that isolates it from the transport?
-        # The transport is managed by the exit_stack. 
-        # For now, we will just remove it from our tracking. 
-        # A full restart might be best for clean cleanup, but for this MVP:
-        if name in self.sessions:
-            del self.sessions[name]
-            # Note: The underlying process might still be running until server restart
-            # This is a known limitation of the ExitStack approach for dynamic resource management unfortunately.
-            # Ideally we should manage individual ExitStacks per connection.
+        # Each server owns its transport (MCPServerConnection), so it can be shut down on its own
+        self.sessions.pop(name, None)
+        connection = self.connections.pop(name, None)
+        if connection:
+            await connection.stop()
+        remote = self.remote_params.pop(name, None)
+        if remote:
+            await remote.aclose()
         return True
 
     def get_server_config(self, name: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,86 @@
+"""
+Serve a native agent over HTTP, so it can run on another node.
+
+CPU-heavy agents (browser, pdf_parser, xlsx_parser) can be moved off the
+API host and scaled on their own:
+
+    python -m core.mcp_http agents/pdf_parser.py --host 0.0.0.0 --port 8765
+
+Then register the agent on the API host in data/mcp_servers.json:
+
+    {"name": "pdf_remote", "url": "http://pdf-node:8765/mcp", "transport": "http", "workers": 2}
+
+External servers register their tools after the native agents, so the
+remote agent takes over those tool names and the local copy sits idle
+(with a tool manifest it is never spawned, see core.lazy_agent).
+--transport sse serves the older HTTP+SSE transport at /sse instead.
+"""
+import os
+import sys
+import argparse
+import contextlib
+
+from mcp.server.lowlevel import Server
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.fastmcp.server import StreamableHTTPASGIApp
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+MCP_HTTP_PATH = "/mcp"
+MCP_SSE_PATH = "/sse"
+
+
+def build_http_app(server: Server, transport: str = "http", path: str = MCP_HTTP_PATH) -> Starlette:
+    """Starlette app serving one MCP Server over streamable HTTP (at path) or SSE (at /sse)."""
+    if transport == "sse":
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read, write):
+                await server.run(read, write, server.create_initialization_options())
+            return Response()
+
+        return Starlette(routes=[
+            Route(MCP_SSE_PATH, endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ])
+
+    if transport != "http":
+        raise ValueError(f"Unknown MCP transport '{transport}' (expected 'http' or 'sse')")
+    manager = StreamableHTTPSessionManager(app=server)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with manager.run():
+            yield
+
+    return Starlette(routes=[Route(path, endpoint=StreamableHTTPASGIApp(manager))], lifespan=lifespan)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a native MCP agent over HTTP")
+    parser.add_argument("script", help="Agent script, e.g. agents/pdf_parser.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--transport", choices=["http", "sse"], default="http")
+    args = parser.parse_args(argv)
+
+    # Agents import 'core' and 'services' from the backend root
+    backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if backend_root not in sys.path:
+        sys.path.insert(0, backend_root)
+
+    import uvicorn
+    from core.inprocess_agent import load_agent_server
+
+    name = os.path.splitext(os.path.basename(args.script))[0]
+    server = load_agent_server(name, os.path.abspath(args.script))
+    path = MCP_HTTP_PATH if args.transport == "http" else MCP_SSE_PATH
+    print(f"Serving agent '{name}' over {args.transport} at http://{args.host}:{args.port}{path}")
+    uvicorn.run(build_http_app(server, args.transport), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,96 @@
-import chromadb
+import numpy as np
 from typing import Any, Callable, Optional
 import uuid
 import os
 import json
+import time
+import threading
 from datetime import datetime
 
+from core.blob_store import BlobStore, BLOBS_DIR
+from core.tool_result import ToolResult
+from core.vector_store import LocalVectorStore, create_vector_store, normalize_compression
+from core.memory_executor import AsyncMemoryStore
+from core.report_summary import generate_report_summary
+from core.memory_migration import (
+    CHAT_COLLECTION, EMBED_TEXT_KEY, MEMORY_STATE_FILE, ReindexJob,
+    load_memory_state, save_memory_state, new_migration,
+)
+from core.memory_policy import (
+    INGEST_EMBED, INGEST_STORE, INGEST_SUMMARIZE, INGEST_SKIP,
+    INGESTION_POLICIES, OUTPUT_SUMMARY_MARKER,
+    resolve_ingestion_policy, summarize_tool_execution,
+)
+
+# Recency-aware ranking for long-term memory.
+# We over-fetch candidates by distance, then blend similarity with an
+# exponential age decay so recent relevant memories surface first.
+RECENCY_OVERFETCH = 4               # Fetch n_results * this many candidates
+RECENCY_HALF_LIFE_S = 7 * 24 * 3600 # Relevance weight halves every 7 days
+RECENCY_FLOOR = 0.3                 # Old memories keep at least 30% of their relevance
+
+# Tool outputs larger than this go to the blob store; Chroma keeps only the
+# compact summary plus a "blob_ref" that query_memory rehydrates on demand.
+BLOB_THRESHOLD_CHARS = 4000
+
+
 class MemoryStore:
     def __init__(
         self,
         storage_path="chroma_db",
         model="llama3",
         embed_fn: Optional[Callable[[str], list[float] | None]] = None,
+        backend: str = "chroma",
+        compression: dict | None = None,
     ):
-        # Initialize ChromaDB
-        # We use a persistent client so data survives restarts
-        self.storage_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "chroma_db")
+        # Initialize the vector store ("chroma" or the in-process "local" backend)
+        # Both persist to disk so data survives restarts
+        self.backend = (backend or "chroma").strip().lower()
+        store_dir = "vector_store" if self.backend == "local" else "chroma_db"
+        self.storage_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", store_dir)
+        explicit_path = os.path.isabs(storage_path)
+        if explicit_path:
+            self.storage_path = storage_path  # Explicit location (tests, tooling)
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path)
             
-        self.client = chromadb.PersistentClient(path=self.storage_path)
-        self.collection = self.client.get_or_create_collection(name="chat_history")
+        # Optional int8 / truncated-dimension storage (local backend, see core.vector_store)
+        self.client = create_vector_store(self.backend, self.storage_path, compression=compression)
+        # chat_history is versioned (chat_history_v<N>) by re-index migrations;
+        # memory_state.json names the active collection and its embedding space
+        self._state_path = os.path.join(self.storage_path, MEMORY_STATE_FILE)
+        self._state_lock = threading.RLock()
+        self.memory_state = load_memory_state(self._state_path)
+        self.collection = self.client.get_or_create_collection(name=self.memory_state.get("active") or CHAT_COLLECTION)
+        # New memories go here; differs from self.collection only while a re-index runs
+        self.write_collection = self.collection
+        self.reindex_job: ReindexJob | None = None
+        # Space of the current embedder, as last declared by bind_embedding_space
+        self.embedding_space: str | None = None
+        self._aio: AsyncMemoryStore | None = None
+        # Records stored under the "store" ingestion policy (no embedding).
+        # Chroma needs a vector per record, so we use a fixed 1-d placeholder.
+        self.log_collection = self.client.get_or_create_collection(name="tool_log")
+        # Large tool outputs live outside Chroma (see BLOB_THRESHOLD_CHARS), next to this store's data.
+        # The default store can still read blobs from the shared data/blobs of earlier versions.
+        self.blob_store = BlobStore(os.path.join(self.storage_path, "blobs"),
+                                    fallback_root=None if explicit_path else BLOBS_DIR)
         self.model = model
-        self._embed_fn = embed_fn
-        print(f"DEBUG: MemoryStore initialized at {self.storage_path} with model {self.model}")
+        # (model, embed_fn) swapped as one tuple by set_embedder, so readers never see a mixed pair
+        self._embedder = (model, embed_fn)
+        # Settings fingerprints set by core.routes.settings to decide swap vs rebuild
+        self.embedding_signature: str | None = None
+        self.storage_signature: str | None = None
+        # Cumulative ingestion counters, keyed by policy
+        self.ingestion_stats: dict[str, int] = {p: 0 for p in INGESTION_POLICIES}
+        print(f"DEBUG: MemoryStore initialized at {self.storage_path} ({self.backend} backend) with model {self.model}")
+
+    @property
+    def aio(self) -> AsyncMemoryStore:
+        """Async view of this store; use from async handlers (see core.memory_executor)."""
+        if self._aio is None:
+            self._aio = AsyncMemoryStore(self)
+        return self._aio
 
     def get_embedding(self, text):
         # CRITICAL: AWS Bedrock embedding models have TWO limits:
@@ -37,9 +105,10 @@ class MemoryStore:
             text = text[:MAX_CHARS]
             print(f"WARNING: Truncated embedding text from {original_len} to {MAX_CHARS} chars to stay within token limit")
         
-        if self._embed_fn:
+        model, embed_fn = self._embedder
+        if embed_fn:
             try:
-                return self._embed_fn(text)
+                return embed_fn(text)
             except Exception as e:
                 print(f"Error getting embedding from configured provider: {e}")
                 return None
@@ -47,29 +116,220 @@ class MemoryStore:
             # Default: Use Ollama for embeddings (best-effort)
             import ollama
 
-            response = ollama.embeddings(model=self.model, prompt=text)
+            response = ollama.embeddings(model=model, prompt=text)
             return response["embedding"]
         except Exception as e:
             print(f"Error getting embedding from Ollama: {e}")
             return None
 
-    def add_memory(self, role, content, metadata: dict[str, Any] | None = None):
+    def set_embedder(self, model: str, embed_fn: Optional[Callable[[str], list[float] | None]], signature: str | None = None):
+        """Swap the embedding provider in place; the vector store client and blob store stay open."""
+        self._embedder = (model, embed_fn)
+        self.model = model
+        self.embedding_signature = signature
+
+    def set_compression(self, compression: dict | None):
+        """Compression for collections created from now on; existing collections keep their recorded settings."""
+        if isinstance(self.client, LocalVectorStore):
+            self.client.compression = compression or None
+        elif compression and normalize_compression(compression) != normalize_compression(None):
+            print("WARNING: Vector compression is only supported by the local backend; storing float32 in Chroma")
+
+    def close(self):
+        """Stop the re-index job and release the vector store, before another store opens this directory.
+
+        A running migration stays recorded in memory_state.json; the next store resumes it.
+        """
+        if self.reindex_job:
+            self.reindex_job.stop()
+            self.reindex_job = None
+        self.client.close()
+        print(f"DEBUG: Closed MemoryStore at {self.storage_path}")
+
+    def get_embeddings(self, texts: list[str]) -> list[list[float] | None]:
+        """Embed several texts with the current provider (None for any that fail)."""
+        return [self.get_embedding(t) if t and t.strip() else None for t in texts]
+
+    # ========================================================================
+    # EMBEDDING SPACE / RE-INDEX MIGRATION (see core.memory_migration)
+    # ========================================================================
+
+    def _save_memory_state(self):
+        with self._state_lock:
+            try:
+                save_memory_state(self._state_path, self.memory_state)
+            except Exception as e:
+                print(f"Error saving memory state: {e}")
+
+    def bind_embedding_space(self, space: str):
+        """Declare the embedding space of the current embedder ("ollama:llama3", "bedrock:<model>").
+
+        The first call just records it. Later, a different space starts (or
+        resumes) a background re-index of chat_history into a new collection.
+        """
+        with self._state_lock:
+            self.embedding_space = space
+            state = self.memory_state
+            migration = state.get("migration")
+            if not state.get("space"):
+                state["space"] = space
+                state["active"] = self.collection.name
+                self._save_memory_state()
+                return
+            if state["space"] == space:
+                if migration:
+                    # Switched back before the re-index finished
+                    self._abandon_reindex()
+                return
+            if migration and migration.get("space") == space:
+                if not (self.reindex_job and self.reindex_job.is_alive()):
+                    self._start_reindex(migration)  # Resume after a restart or failure
+                return
+            if migration:
+                self._abandon_reindex()
+            if self.collection.count() == 0:
+                state["space"] = space  # Nothing to re-embed
+                self._save_memory_state()
+                return
+
+            version = int(state.get("version", 0)) + 1
+            migration = new_migration(self.collection.name, space, version, self.collection.count())
+            state["migration"] = migration
+            self._save_memory_state()
+            self._start_reindex(migration)
+
+    def resume_reindex(self) -> bool:
+        """Restart an interrupted or failed re-index. Returns False if there is none."""
+        with self._state_lock:
+            migration = self.memory_state.get("migration")
+            if not migration:
+                return False
+            if not (self.reindex_job and self.reindex_job.is_alive()):
+                self._start_reindex(migration)
+            return True
+
+    def _start_reindex(self, migration: dict):
+        migration["status"] = "running"
+        migration["error"] = None
+        self.write_collection = self.client.get_or_create_collection(migration["target"])
+        self.reindex_job = ReindexJob(self, migration)
+        self.reindex_job.start()
+
+    def _abandon_reindex(self):
+        migration = self.memory_state.pop("migration", None)
+        if self.reindex_job:
+            self.reindex_job.stop()
+            self.reindex_job = None
+        self.write_collection = self.collection
+        if migration:
+            try:
+                self._drop_collection(migration["target"])
+            except Exception as e:
+                print(f"DEBUG: Could not drop abandoned re-index target {migration['target']}: {e}")
+            print(f"DEBUG: Abandoned memory re-index into {migration['target']}")
+        self._save_memory_state()
+
+    def _finish_reindex(self, job: ReindexJob):
+        """Called by the job when every page is copied: switch reads to the new collection."""
+        with self._state_lock:
+            migration = job.migration
+            if self.memory_state.get("migration") is not migration:
+                return  # Abandoned while the last page was being written
+            old = self.collection
+            self.collection = self.write_collection
+            migration["status"] = "done"
+            migration["finished_at"] = time.time()
+            state = self.memory_state
+            state.update(active=migration["target"], space=migration["space"], version=migration["version"])
+            state["last_migration"] = state.pop("migration")
+            self.reindex_job = None
+            self._save_memory_state()
+            print(f"DEBUG: Memory re-index done: reading {migration['target']} ({migration['migrated']} records)")
+
+            if migration["failed"]:
+                # Keep what could not be re-embedded rather than losing it
+                print(f"WARNING: {migration['failed']} memories could not be re-embedded; keeping {old.name}")
+                return
+            try:
+                self._drop_collection(old.name)
+            except Exception as e:
+                print(f"DEBUG: Could not drop old memory collection {old.name}: {e}")
+
+    def _drop_collection(self, name: str):
+        """Delete a collection, and the blobs that only its records referenced."""
+        refs = self._blob_refs(self.client.get_collection(name))
+        self.client.delete_collection(name)
+        self._release_blobs(refs, dropped=name)
+
+    @staticmethod
+    def _blob_refs(collection) -> set[str]:
+        metadatas = collection.get(include=["metadatas"]).get("metadatas") or []
+        return {m["blob_ref"] for m in metadatas if m and m.get("blob_ref")}
+
+    def _release_blobs(self, refs: set[str], dropped: str | None = None) -> int:
+        """Delete blobs no live record references any more (blobs are shared by identical outputs)."""
+        if not refs:
+            return 0
+        live = set()
+        for collection in {id(c): c for c in (self.collection, self.write_collection, self.log_collection)}.values():
+            if collection.name != dropped:
+                live |= self._blob_refs(collection)
+        removed = sum(self.blob_store.delete(ref) for ref in refs - live)
+        if removed:
+            print(f"DEBUG: Removed {removed} unreferenced blobs")
+        return removed
+
+    def _query_collection(self):
+        """The collection whose vectors are in the current embedder's space.
+
+        Mid re-index the embedder is already the new one: query the target
+        (migrated and new records) rather than ranking new-space vectors
+        against the old collection, which raises no error when the
+        dimensions happen to match.
+        """
+        with self._state_lock:
+            migration = self.memory_state.get("migration")
+            if migration and self.embedding_space == migration.get("space"):
+                return self.write_collection
+            return self.collection
+
+    def reindex_progress(self) -> dict:
+        with self._state_lock:
+            state = self.memory_state
+            migration = dict(state.get("migration") or {})
+            if migration:
+                migration["running"] = bool(self.reindex_job and self.reindex_job.is_alive())
+                total = migration.get("total") or 0
+                migration["percent"] = round(100.0 * min(migration.get("offset", 0), total) / total, 1) if total else 100.0
+            return {
+                "active": self.collection.name,
+                "space": state.get("space"),
+                "migration": migration or None,
+                "last_migration": state.get("last_migration"),
+            }
+
+    def add_memory(self, role, content, metadata: dict[str, Any] | None = None, embed_text: str | None = None):
+        """Embed and store a memory. `embed_text`, when given, is embedded instead of `content`
+        (and kept in the metadata, so a re-index embeds the same text)."""
         if not content or not content.strip():
             return
             
-        embedding = self.get_embedding(content)
+        embedding = self.get_embedding(embed_text or content)
         if not embedding:
             return
 
         doc_id = str(uuid.uuid4())
         base_meta: dict[str, Any] = {
             "role": role,
-            "timestamp": str(os.path.getmtime(__file__)),  # Dummy timestamp for now
+            # Numeric epoch seconds so Chroma can range-filter ($gte/$lte) on it
+            "timestamp": time.time(),
         }
         if metadata and isinstance(metadata, dict):
             base_meta.update(metadata)
+        if embed_text and embed_text != content:
+            base_meta[EMBED_TEXT_KEY] = embed_text
 
-        self.collection.add(
+        self.write_collection.add(
             ids=[doc_id],
             embeddings=[embedding],
             documents=[content],
@@ -77,73 +337,164 @@ class MemoryStore:
         )
         print(f"DEBUG: Added memory to DB: {role}: {content[:30]}...")
 
-    def query_memory(self, query, n_results=5, where: dict[str, Any] | None = None):
+    def query_memory(
+        self,
+        query,
+        n_results=5,
+        where: dict[str, Any] | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        recency_half_life: float | None = RECENCY_HALF_LIFE_S,
+    ):
+        """Semantic search over long-term memory.
+
+        Args:
+            query: Natural language query
+            n_results: Number of memories to return
+            where: Optional Chroma metadata filter
+            since / until: Optional epoch-second bounds on the memory timestamp
+            recency_half_life: Age (seconds) at which relevance is halved.
+                Pass None to rank by distance only.
+        """
         embedding = self.get_embedding(query)
         if not embedding:
             return []
 
+        # Build filter conditions — ChromaDB requires $and for 2+ conditions
+        conditions = []
+        if where and isinstance(where, dict):
+            conditions.append(where)
+        if since is not None:
+            conditions.append({"timestamp": {"$gte": float(since)}})
+        if until is not None:
+            conditions.append({"timestamp": {"$lte": float(until)}})
+
         try:
+            fetch_n = n_results * RECENCY_OVERFETCH if recency_half_life else n_results
             query_kwargs: dict[str, Any] = {
                 "query_embeddings": [embedding],
-                "n_results": n_results,
+                "n_results": fetch_n,
+                "include": ["documents", "metadatas", "distances"],
             }
-            if where and isinstance(where, dict):
-                query_kwargs["where"] = where
+            if len(conditions) == 1:
+                query_kwargs["where"] = conditions[0]
+            elif conditions:
+                query_kwargs["where"] = {"$and": conditions}
 
-            results = self.collection.query(**query_kwargs)
-            
-            # Format results
+            results = self._query_collection().query(**query_kwargs)
+            if not results['documents'] or not results['documents'][0]:
+                return []
+
+            docs = results['documents'][0]
+            metas = results['metadatas'][0]
+            order = range(len(docs))
+            if recency_half_life:
+                order = self._recency_rank(results['distances'][0], metas, recency_half_life)
+
+            # Format results (rehydrating blob-backed outputs only for the winners)
             memories = []
-            if results['documents']:
-                for i, doc in enumerate(results['documents'][0]):
-                    role = results['metadatas'][0][i].get('role', 'unknown')
-                    memories.append(f"{role}: {doc}")
-            
+            for i in list(order)[:n_results]:
+                role = metas[i].get('role', 'unknown')
+                memories.append(f"{role}: {self._rehydrate(docs[i], metas[i])}")
+
             return memories
         except Exception as e:
             print(f"Error querying memory: {e}")
             return []
 
+    def _rehydrate(self, document: str, metadata: dict) -> str:
+        """Swap a stored output summary for the full output from the blob store."""
+        ref = metadata.get("blob_ref") if metadata else None
+        if not ref:
+            return document
+        full_output = self.blob_store.get(ref)
+        if full_output is None:
+            return document
+        header = document.split(OUTPUT_SUMMARY_MARKER, 1)[0]
+        return f"{header}\nOutput: {full_output}"
+
+    @staticmethod
+    def _recency_rank(distances: list[float], metadatas: list[dict], half_life: float, now: float | None = None) -> list[int]:
+        """Return candidate indices ordered by similarity blended with recency.
+
+        score = 1 / (1 + distance) * (FLOOR + (1 - FLOOR) * 0.5 ** (age / half_life))
+
+        Memories without a numeric timestamp (written before timestamps were
+        real) are treated as arbitrarily old and only keep the floor weight.
+        """
+        now = time.time() if now is None else now
+        dist = np.asarray(distances, dtype=np.float64)
+        ts = np.array(
+            [m.get("timestamp") if isinstance(m.get("timestamp"), (int, float)) else np.nan for m in metadatas],
+            dtype=np.float64,
+        )
+        age = np.clip(now - ts, 0.0, None)
+        decay = np.where(np.isnan(age), 0.0, np.power(0.5, age / half_life))
+        scores = (1.0 / (1.0 + dist)) * (RECENCY_FLOOR + (1.0 - RECENCY_FLOOR) * decay)
+        # Stable sort keeps distance order between equal scores
+        return np.argsort(-scores, kind="stable").tolist()
+
     def add_tool_execution(self, session_id: str, tool_name: str, 
-                           tool_args: dict, tool_output: str, 
-                           timestamp: str = None, agent_id: str = None):
+                           tool_args: dict, tool_output: str | ToolResult, 
+                           timestamp: float = None, agent_id: str = None,
+                           policy: str | None = None) -> str:
         """Store tool execution details for session-scoped retrieval.
         
         ID-AGNOSTIC: Automatically extracts any field ending with '_id' or 'Id'
         from the tool output for easy retrieval.
+
+        `policy` is one of INGESTION_POLICIES (defaults to the per-tool default).
+        Returns the policy that was applied so callers can count saved embeddings.
+        A ToolResult that was already parsed upstream is not parsed again.
         """
+        tool_output = ToolResult.of(tool_output)
+        policy = policy if policy in INGESTION_POLICIES else resolve_ingestion_policy(tool_name)
+        self.ingestion_stats[policy] += 1
+        if policy == INGEST_SKIP:
+            print(f"DEBUG: Memory ingestion skipped for '{tool_name}' (policy=skip)")
+            return policy
+
         # Create searchable text representation
         content = f"Tool: {tool_name}\nArguments: {json.dumps(tool_args)}\nOutput: {tool_output}"
         
-        # Store with rich metadata
-        metadata = {
+        # Parsed IDs as metadata for easy retrieval (ID-AGNOSTIC, see ToolResult.ids);
+        # the record's own fields below win over an output field of the same name
+        metadata = {k: str(v) for k, v in tool_output.ids.items()}
+        metadata.update({
             "type": "tool_execution",
             "session_id": session_id,
             "tool_name": tool_name,
-            "timestamp": timestamp or datetime.now().isoformat()
-        }
+            "timestamp": timestamp or time.time()
+        })
         if agent_id:
             metadata["agent_id"] = agent_id
-        
-        # Add parsed IDs as metadata for easy retrieval (ID-AGNOSTIC)
-        try:
-            parsed_output = json.loads(tool_output)
-            if isinstance(parsed_output, dict):
-                # Automatically extract ANY field ending with "_id" or "Id"
-                for key, value in parsed_output.items():
-                    if (key.endswith("_id") or key.endswith("Id") or key.lower() in ["id", "uuid"]) and value is not None:
-                        metadata[key] = str(value)
-                
-                # Also check nested dicts for IDs (one level deep)
-                for key, value in parsed_output.items():
-                    if isinstance(value, dict):
-                        for nested_key, nested_value in value.items():
-                            if (nested_key.endswith("_id") or nested_key.endswith("Id")) and nested_value is not None:
-                                metadata[f"{key}.{nested_key}"] = str(nested_value)
-        except:
-            pass
-        
-        self.add_memory("tool", content, metadata)
+
+        # Tiered storage: big outputs go to the blob store, Chroma keeps the summary
+        if len(tool_output) > BLOB_THRESHOLD_CHARS:
+            blob_ref = self.blob_store.put(tool_output)
+            if blob_ref:
+                metadata["blob_ref"] = blob_ref
+                metadata["output_chars"] = len(tool_output)
+                content = summarize_tool_execution(tool_name, tool_args, tool_output)
+        
+        if policy == INGEST_STORE:
+            self._add_unembedded("tool", content, metadata)
+        elif policy == INGEST_SUMMARIZE:
+            self.add_memory("tool", content, metadata, embed_text=summarize_tool_execution(tool_name, tool_args, tool_output))
+        else:
+            self.add_memory("tool", content, metadata)
+        return policy
+
+    def _add_unembedded(self, role: str, content: str, metadata: dict[str, Any]):
+        """Persist a record without calling the embedding provider."""
+        meta = {"role": role, "timestamp": time.time(), **metadata}
+        self.log_collection.add(
+            ids=[str(uuid.uuid4())],
+            embeddings=[[0.0]],
+            documents=[content],
+            metadatas=[meta],
+        )
+        print(f"DEBUG: Stored (no embedding) {role}: {content[:30]}...")
 
     def get_session_tool_outputs(self, session_id: str, tool_name: str = None, 
                                  n_results: int = 10, agent_id: str = None):
@@ -169,11 +520,25 @@ class MemoryStore:
             where_filter = {"$and": conditions}
         
         try:
-            # Query by metadata filter
+            # Query by metadata filter — embedded records first, then
+            # records kept without an embedding (ingestion policy "store")
             results = self.collection.get(
                 where=where_filter,
                 limit=n_results
             )
+            # Mid re-index, new records land in the target collection
+            extra = [self.write_collection] if self.write_collection is not self.collection else []
+            for collection in extra + [self.log_collection]:
+                remaining = n_results - len(results.get("ids") or [])
+                if remaining <= 0:
+                    break
+                logged = collection.get(where=where_filter, limit=n_results)
+                # Skip ids already seen (a re-index target also holds copied records)
+                seen = set(results.get("ids") or [])
+                keep = [i for i, doc_id in enumerate(logged.get("ids") or []) if doc_id not in seen][:remaining]
+                for key in ("ids", "documents", "metadatas"):
+                    if results.get(key) is not None and logged.get(key):
+                        results[key] = list(results[key]) + [logged[key][i] for i in keep]
             return results
         except Exception as e:
             print(f"Error retrieving session tool outputs: {e}")
@@ -183,18 +548,25 @@ class MemoryStore:
         try:
             # Delete all items instead of dropping collection to keep UUID stable
             # fetch all ids first
-            result = self.collection.get()
-            if result and 'ids' in result and result['ids']:
-                self.collection.delete(ids=result['ids'])
+            blob_refs = set()
+            for collection in {id(c): c for c in (self.collection, self.write_collection, self.log_collection)}.values():
+                result = collection.get()
+                if result and 'ids' in result and result['ids']:
+                    blob_refs |= self._blob_refs(collection)
+                    collection.delete(ids=result['ids'])
                 
+            self._release_blobs(blob_refs)
             print("DEBUG: Memory Store cleared (items deleted).")
             return True
         except Exception as e:
             print(f"Error clearing memory: {e}")
             # Fallback: try to recreate
             try:
-                self.client.delete_collection("chat_history")
-                self.collection = self.client.create_collection(name="chat_history")
+                name = self.collection.name
+                self._drop_collection(name)
+                self.collection = self.client.create_collection(name=name)
+                if self.reindex_job is None:
+                    self.write_collection = self.collection
                 return True
             except:
                 return False
@@ -336,10 +708,9 @@ class MemoryStore:
             if collection_name:
                 collection_names = [collection_name]
             else:
-                all_collections = self.client.list_collections()
                 collection_names = [
-                    c.name for c in all_collections 
-                    if c.name.startswith(f"session_{session_id}_")
+                    name for name in self.client.list_collection_names()
+                    if name.startswith(f"session_{session_id}_")
                 ]
             
             if not collection_names:
@@ -469,18 +840,17 @@ class MemoryStore:
         """
         try:
             # Find all session collections
-            all_collections = self.client.list_collections()
             session_prefix = f"session_{session_id}_"
             
             deleted_count = 0
-            for collection in all_collections:
-                if collection.name.startswith(session_prefix):
+            for name in self.client.list_collection_names():
+                if name.startswith(session_prefix):
                     try:
-                        self.client.delete_collection(collection.name)
+                        self.client.delete_collection(name)
                         deleted_count += 1
-                        print(f"DEBUG: Deleted session collection {collection.name}")
+                        print(f"DEBUG: Deleted session collection {name}")
                     except Exception as e:
-                        print(f"Error deleting collection {collection.name}: {e}")
+                        print(f"Error deleting collection {name}: {e}")
             
             if deleted_count > 0:
                 print(f"DEBUG: Cleared {deleted_count} session embedding collections")
@@ -590,121 +960,5 @@ class MemoryStore:
     # SMART REPORT SUMMARY (for large reports that exceed context limits)
     # ========================================================================
 
-    @staticmethod
-    def generate_report_summary(report_data: list[dict], report_type: str, max_sample_rows: int = 5) -> dict:
-        """
-        Generate a compact but informative summary of a large report.
-        
-        Used when the full report is too large to fit in the LLM context window.
-        The summary includes:
-          - Pre-computed aggregations (sum, avg, min, max) for numeric columns
-          - Value distributions for categorical columns
-          - Sample rows for structure understanding
-          - Metadata (row count, column names)
-        
-        This allows the LLM to answer aggregation questions directly from the summary,
-        and use search_embedded_report for specific row lookups.
-        
-        Args:
-            report_data: Full list of report records
-            report_type: Type of report (e.g., "orders", "payments")
-            max_sample_rows: Number of sample rows to include
-        
-        Returns:
-            dict with summary info, suitable for JSON serialization
-        """
-        if not report_data:
-            return {"error": "No data to summarize"}
-
-        columns = list(report_data[0].keys()) if report_data else []
-        total_rows = len(report_data)
-
-        # Try pandas for richer analysis
-        try:
-            import pandas as pd
-            df = pd.DataFrame(report_data)
-
-            aggregations = {}
-            categorical_distributions = {}
-
-            for col in df.columns:
-                try:
-                    if pd.api.types.is_numeric_dtype(df[col]):
-                        col_stats = {
-                            "min": round(float(df[col].min()), 2),
-                            "max": round(float(df[col].max()), 2),
-                            "mean": round(float(df[col].mean()), 2),
-                            "sum": round(float(df[col].sum()), 2),
-                            "median": round(float(df[col].median()), 2),
-                            "non_null_count": int(df[col].notna().sum()),
-                        }
-                        # Add count of zeros and negatives if relevant
-                        zeros = int((df[col] == 0).sum())
-                        negatives = int((df[col] < 0).sum())
-                        if zeros > 0:
-                            col_stats["zero_count"] = zeros
-                        if negatives > 0:
-                            col_stats["negative_count"] = negatives
-                        aggregations[col] = col_stats
-                    elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
-                        value_counts = df[col].value_counts().head(10)
-                        if not value_counts.empty:
-                            categorical_distributions[col] = {
-                                "unique_values": int(df[col].nunique()),
-                                "top_values": {str(k): int(v) for k, v in value_counts.items()},
-                                "null_count": int(df[col].isna().sum()),
-                            }
-                except Exception:
-                    continue
-
-            summary = {
-                "is_summary": True,
-                "report_type": report_type,
-                "total_rows": total_rows,
-                "columns": columns,
-                "numeric_aggregations": aggregations,
-                "categorical_distributions": categorical_distributions,
-                "sample_rows": report_data[:max_sample_rows],
-                "note": (
-                    f"This is a SUMMARY of {total_rows} rows. Full data is embedded in RAG memory. "
-                    "Use the pre-computed aggregations above to answer totals/averages/min/max questions. "
-                    "For specific row lookups, use search_embedded_report tool."
-                ),
-            }
-
-        except ImportError:
-            # Fallback without pandas
-            aggregations = {}
-            for col in columns:
-                values = [r.get(col) for r in report_data if r.get(col) is not None]
-                numeric_values = []
-                for v in values:
-                    try:
-                        numeric_values.append(float(v))
-                    except (ValueError, TypeError):
-                        pass
-                if numeric_values:
-                    aggregations[col] = {
-                        "min": round(min(numeric_values), 2),
-                        "max": round(max(numeric_values), 2),
-                        "mean": round(sum(numeric_values) / len(numeric_values), 2),
-                        "sum": round(sum(numeric_values), 2),
-                        "count": len(numeric_values),
-                    }
-
-            summary = {
-                "is_summary": True,
-                "report_type": report_type,
-                "total_rows": total_rows,
-                "columns": columns,
-                "numeric_aggregations": aggregations,
-                "sample_rows": report_data[:max_sample_rows],
-                "note": (
-                    f"This is a SUMMARY of {total_rows} rows. Full data is embedded in RAG memory. "
-                    "Use the pre-computed aggregations above to answer totals/averages/min/max questions. "
-                    "For specific row lookups, use search_embedded_report tool."
-                ),
-            }
-
-        return summary
+    generate_report_summary = staticmethod(generate_report_summary)
 
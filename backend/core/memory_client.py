@@ -0,0 +1,178 @@
+"""
+Client for the out-of-process memory service (core.memory_service).
+
+RemoteMemoryStore has the MemoryStore call surface used by the routes, so it
+drops in for `core.server.memory_store` when settings.memory_service_url is
+set. Sync calls send one RPC each. Calls through `.aio` are coalesced:
+everything issued within MEMORY_RPC_BATCH_WINDOW_S (or MEMORY_RPC_BATCH_MAX
+calls) goes out as one POST /rpc. The user/assistant add_memory pair at the
+end of a turn, for example, costs a single round trip.
+"""
+import os
+import asyncio
+import weakref
+
+import httpx
+
+from core.memory_executor import MEMORY_OPERATIONS
+from core.memory_policy import INGEST_SKIP
+from core.report_summary import generate_report_summary
+
+MEMORY_RPC_TIMEOUT_S = 120.0      # Report embedding can take a while
+MEMORY_RPC_BATCH_WINDOW_S = 0.005
+MEMORY_RPC_BATCH_MAX = 32
+
+# Returned when the service is unreachable or the call failed, matching what
+# MemoryStore returns on its own errors
+RPC_FALLBACKS = {
+    "query_memory": [],
+    "search_session_embeddings": [],
+    "search_embedded_report": {"results": []},
+    "embed_report_for_session": {"error": "memory service unavailable"},
+    "clear_session_embeddings": 0,
+    "clear_memory": False,
+    "add_tool_execution": INGEST_SKIP,  # Nothing was stored
+    "get_ingestion_stats": {},
+    "reindex_progress": {},
+    "resume_reindex": False,
+}
+REMOTE_METHODS = set(MEMORY_OPERATIONS) | {"reindex_progress", "resume_reindex", "reload_settings", "service_stats"}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _transport_args(url: str) -> tuple[str, str | None]:
+    """Return (base_url, unix socket path or None) for a service URL."""
+    if url.startswith("unix://"):
+        path = url[len("unix://"):]
+        if not os.path.isabs(path):
+            path = os.path.join(BACKEND_DIR, path)
+        return "http://memory-service", path
+    return url.rstrip("/"), None
+
+
+class _AsyncBatcher:
+    """Per-event-loop RPC batcher for `RemoteMemoryStore.aio`."""
+
+    def __init__(self, base_url: str, uds: str | None, timeout: float):
+        transport = httpx.AsyncHTTPTransport(uds=uds) if uds else None
+        self._client = httpx.AsyncClient(base_url=base_url, transport=transport, timeout=timeout)
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def call(self, method: str, args: tuple, kwargs: dict):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(({"method": method, "args": list(args), "kwargs": kwargs}, future))
+        if len(self._pending) >= MEMORY_RPC_BATCH_MAX:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(MEMORY_RPC_BATCH_WINDOW_S, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._send(batch))
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]):
+        try:
+            resp = await self._client.post("/rpc", json={"calls": [c for c, _ in batch]})
+            resp.raise_for_status()
+            results = resp.json()["results"]
+        except Exception as e:
+            print(f"Error calling memory service ({len(batch)} calls): {e}")
+            results = [{"ok": False, "error": str(e)}] * len(batch)
+        for (call, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(_unwrap(call["method"], result))
+
+
+def _unwrap(method: str, result: dict):
+    if result.get("ok"):
+        return result.get("result")
+    print(f"Error from memory service {method}: {result.get('error')}")
+    return RPC_FALLBACKS.get(method)
+
+
+class _RemoteAio:
+    def __init__(self, remote: "RemoteMemoryStore"):
+        self._remote = remote
+
+    def __getattr__(self, name: str):
+        if name not in MEMORY_OPERATIONS:
+            raise AttributeError(f"'{name}' is not an async memory operation")
+
+        async def call(*args, **kwargs):
+            return await self._remote._batcher().call(name, args, kwargs)
+
+        call.__name__ = name
+        return call
+
+
+class RemoteMemoryStore:
+    """Thin MemoryStore stand-in backed by the memory service."""
+
+    backend = "remote"
+    # Pure helper, no store state: run it locally
+    generate_report_summary = staticmethod(generate_report_summary)
+
+    def __init__(self, url: str, timeout: float = MEMORY_RPC_TIMEOUT_S):
+        self.url = url
+        self._base_url, self._uds = _transport_args(url)
+        self._timeout = timeout
+        transport = httpx.HTTPTransport(uds=self._uds) if self._uds else None
+        self._client = httpx.Client(base_url=self._base_url, transport=transport, timeout=timeout)
+        # httpx async clients belong to one event loop
+        self._batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncBatcher]" = weakref.WeakKeyDictionary()
+        self.aio = _RemoteAio(self)
+        # Settings fingerprints (see core.routes.settings._refresh_memory_store)
+        self.embedding_signature: str | None = None
+        self.storage_signature: str | None = None
+        print(f"DEBUG: Using memory service at {url}")
+
+    def _batcher(self) -> _AsyncBatcher:
+        loop = asyncio.get_running_loop()
+        if loop not in self._batchers:
+            self._batchers[loop] = _AsyncBatcher(self._base_url, self._uds, self._timeout)
+        return self._batchers[loop]
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            resp = self._client.post("/rpc", json={"calls": [{"method": method, "args": list(args), "kwargs": kwargs}]})
+            resp.raise_for_status()
+            return _unwrap(method, resp.json()["results"][0])
+        except Exception as e:
+            print(f"Error calling memory service {method}: {e}")
+            return RPC_FALLBACKS.get(method)
+
+    def __getattr__(self, name: str):
+        if name not in REMOTE_METHODS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        def call(*args, **kwargs):
+            return self._call(name, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    @property
+    def ingestion_stats(self) -> dict:
+        return self._call("get_ingestion_stats") or {}
+
+    # The service owns the embedder: a provider change means "reload your settings"
+    def set_embedder(self, model, embed_fn, signature: str | None = None):
+        self.embedding_signature = signature
+        self._call("reload_settings")
+
+    def bind_embedding_space(self, space: str):
+        pass  # Tracked by the service's own store
+
+    def set_compression(self, compression: dict | None):
+        pass  # Applied by the service from its own settings
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,210 @@
+"""
+Async facade for MemoryStore.
+
+Chroma (SQLite + HNSW), the local vector backend and the embedding calls are
+all blocking. Called directly from an async handler they stall the event loop
+and every concurrent SSE stream with it. `memory_store.aio.<method>(...)`
+awaits the same method on a small dedicated thread pool instead:
+
+    memories = await memory_store.aio.query_memory(query, n_results=5)
+
+Reads run concurrently. Writes are serialized per collection (in arrival
+order) with asyncio locks, so queued writes wait on the event loop without
+holding pool threads. Every operation feeds a latency histogram, reported
+by /api/memory/stats.
+"""
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+
+MEMORY_EXECUTOR_WORKERS = 4
+
+# Operation -> collections it writes. Empty tuple = read (runs concurrently).
+# "{session_id}" is filled from the call's arguments.
+MEMORY_OPERATIONS: dict[str, tuple[str, ...]] = {
+    "query_memory": (),
+    "get_session_tool_outputs": (),
+    "search_embedded_report": (),
+    "search_session_embeddings": (),
+    "add_memory": ("chat_history",),
+    "add_tool_execution": ("chat_history", "tool_log"),
+    "clear_memory": ("chat_history", "tool_log"),
+    "embed_report_for_session": ("session_{session_id}",),
+    "clear_session_embeddings": ("session_{session_id}",),
+}
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets_ms: tuple = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float):
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}ms" for b in self.buckets_ms] + ["inf"]
+            return {
+                "count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+                "max_ms": round(self.max_ms, 3),
+                "p50_ms": self.quantile(0.5),
+                "p95_ms": self.quantile(0.95),
+                "p99_ms": self.quantile(0.99),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class MemoryExecutor:
+    """Bounded thread pool plus per-collection write locks and per-operation histograms."""
+
+    def __init__(self, max_workers: int = MEMORY_EXECUTOR_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="memory")
+        # asyncio locks belong to one event loop; keep a set per loop
+        self._write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._latency: dict[str, LatencyHistogram] = {}
+        self._queued: dict[str, LatencyHistogram] = {}
+        self._in_flight = 0
+        self._meta_lock = threading.Lock()
+
+    def _histograms(self, op: str) -> tuple[LatencyHistogram, LatencyHistogram]:
+        with self._meta_lock:
+            if op not in self._latency:
+                self._latency[op] = LatencyHistogram()
+                self._queued[op] = LatencyHistogram()
+            return self._latency[op], self._queued[op]
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        locks = self._write_locks.setdefault(asyncio.get_running_loop(), {})
+        if key not in locks:
+            locks[key] = asyncio.Lock()
+        return locks[key]
+
+    @staticmethod
+    def _write_keys(op: str, fn, args: tuple, kwargs: dict) -> list[str]:
+        templates = MEMORY_OPERATIONS.get(op, ())
+        if not any("{" in t for t in templates):
+            return sorted(templates)
+        try:
+            bound = inspect.signature(fn).bind_partial(*args, **kwargs).arguments
+        except TypeError:
+            bound = {}
+        return sorted(t.format(session_id=bound.get("session_id", "")) for t in templates)
+
+    async def run(self, op: str, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) on the pool; writes take their collection locks first."""
+        latency, queued = self._histograms(op)
+        enqueued = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            queued.observe((started - enqueued) * 1000)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                latency.observe((time.perf_counter() - started) * 1000)
+
+        loop = asyncio.get_running_loop()
+        async with AsyncExitStack() as stack:
+            # Sorted acquisition order, so multi-collection writes cannot deadlock
+            for key in self._write_keys(op, fn, args, kwargs):
+                await stack.enter_async_context(self._lock_for(key))
+            self._in_flight += 1
+            try:
+                return await loop.run_in_executor(self._pool, timed)
+            finally:
+                self._in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._meta_lock:
+            ops = sorted(self._latency)
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "operations": {
+                op: {"latency": self._latency[op].snapshot(), "queued": self._queued[op].snapshot()}
+                for op in ops
+            },
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: MemoryExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_memory_executor() -> MemoryExecutor:
+    """Process-wide executor shared by every MemoryStore (survives store rebuilds on settings save)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = MemoryExecutor()
+        return _executor
+
+
+def shutdown_memory_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+class AsyncMemoryStore:
+    """Awaitable view of a MemoryStore: each MEMORY_OPERATIONS method runs on the memory executor."""
+
+    def __init__(self, store, executor: MemoryExecutor | None = None):
+        self._store = store
+        self._executor = executor
+
+    def __getattr__(self, name: str):
+        if name not in MEMORY_OPERATIONS:
+            raise AttributeError(f"'{name}' is not an async memory operation")
+        method = getattr(self._store, name)
+
+        async def call(*args, **kwargs):
+            executor = self._executor or get_memory_executor()
+            return await executor.run(name, method, *args, **kwargs)
+
+        call.__name__ = name
+        return call
@@ -0,0 +1,142 @@
+"""
+Background re-embedding of long-term memory when the embedding space changes.
+
+Vectors from different embedding models (or different dimensions) cannot be
+compared, so switching e.g. from Ollama/llama3 (4096-d) to Bedrock Titan
+(1024-d) leaves chat_history unusable. MemoryStore records which embedding
+space its active collection was built with (data/<store>/memory_state.json).
+When that space changes it starts a ReindexJob, which:
+
+    1. pages documents out of the old collection (REINDEX_PAGE_SIZE at a time),
+    2. re-embeds them in batches with the current embedder (the text that
+       was embedded at ingest: metadata["embed_text"] when set, else the
+       document),
+    3. writes them into a new versioned collection (chat_history_v<N>).
+
+New memories go straight to the new collection while the job runs. Reads stay
+on the old one and switch atomically when the job finishes. Progress is
+checkpointed after every page, so a restart resumes where it stopped.
+"""
+import os
+import json
+import time
+import threading
+
+MEMORY_STATE_FILE = "memory_state.json"
+CHAT_COLLECTION = "chat_history"
+REINDEX_PAGE_SIZE = 100
+REINDEX_BATCH_SIZE = 16
+# Metadata key holding the text a record was embedded from, when that is not its document
+# (e.g. tool outputs ingested with the "summarize" policy)
+EMBED_TEXT_KEY = "embed_text"
+
+
+def load_memory_state(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except Exception as e:
+        print(f"WARNING: Unreadable memory state {path}: {e}")
+        return {}
+
+
+def save_memory_state(path: str, state: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def new_migration(source: str, space: str, version: int, total: int) -> dict:
+    return {
+        "source": source,
+        "target": f"{CHAT_COLLECTION}_v{version}",
+        "space": space,
+        "version": version,
+        "total": total,
+        "offset": 0,        # Source records processed (pages are read in a stable order)
+        "migrated": 0,
+        "failed": 0,        # Records the embedder returned nothing for (skipped)
+        "status": "running",
+        "error": None,
+        "started_at": time.time(),
+        "finished_at": None,
+    }
+
+
+class ReindexJob:
+    """Copies the source collection into the migration target, re-embedding every document."""
+
+    def __init__(self, store, migration: dict, page_size: int = REINDEX_PAGE_SIZE, batch_size: int = REINDEX_BATCH_SIZE):
+        self.store = store
+        self.migration = migration
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"reindex-{self.migration['target']}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def join(self, timeout: float | None = None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        m = self.migration
+        print(f"DEBUG: Re-indexing memory {m['source']} -> {m['target']} ({m['total']} records, from {m['offset']})")
+        try:
+            source = self.store.client.get_collection(m["source"])
+            target = self.store.client.get_or_create_collection(m["target"])
+            while not self._stop.is_set():
+                page = source.get(limit=self.page_size, offset=m["offset"], include=["documents", "metadatas"])
+                ids = page.get("ids") or []
+                if not ids:
+                    break
+                self._copy_page(target, ids, page.get("documents") or [None] * len(ids), page.get("metadatas") or [{}] * len(ids))
+                m["offset"] += len(ids)
+                self.store._save_memory_state()
+            if not self._stop.is_set():
+                self.store._finish_reindex(self)
+        except Exception as e:
+            m["status"] = "failed"
+            m["error"] = str(e)
+            self.store._save_memory_state()
+            print(f"Error re-indexing memory into {m['target']}: {e}")
+
+    def _copy_page(self, target, ids: list, documents: list, metadatas: list):
+        # Records already in the target were copied before a restart
+        done = set(target.get(ids=ids, include=[]).get("ids") or [])
+        todo = [i for i, doc_id in enumerate(ids) if doc_id not in done]
+        for start in range(0, len(todo), self.batch_size):
+            if self._stop.is_set():
+                return
+            batch = todo[start:start + self.batch_size]
+            embeddings = self.store.get_embeddings([
+                (metadatas[i] or {}).get(EMBED_TEXT_KEY) or documents[i] or "" for i in batch
+            ])
+            keep = [(i, e) for i, e in zip(batch, embeddings) if e]
+            if not keep:
+                # Nothing came back for a whole batch: the embedder is down, not the data
+                raise RuntimeError("embedding provider returned no vectors")
+            target.add(
+                ids=[ids[i] for i, _ in keep],
+                embeddings=[e for _, e in keep],
+                documents=[documents[i] for i, _ in keep],
+                metadatas=[metadatas[i] or {} for i, _ in keep],
+            )
+            self.migration["migrated"] += len(keep)
+            self.migration["failed"] += len(batch) - len(keep)
+        self.migration["migrated"] += len(ids) - len(todo)
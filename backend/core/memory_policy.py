@@ -0,0 +1,98 @@
+"""
+Memory ingestion policies and record formatting for tool executions.
+
+Kept free of vector-store imports so the chat routes can resolve policies
+even when MemoryStore dependencies are unavailable.
+"""
+import json
+from typing import Any
+
+from core.tool_result import ToolResult
+
+# ── Memory ingestion policies ──
+# Decides what happens to a tool execution after it runs:
+#   embed     — embed the full record and store it in chat_history (searchable)
+#   store     — keep the record for session lookups, but skip the embedding call
+#   summarize — store the full record, but embed only a compact summary of it
+#   skip      — don't persist at all
+INGEST_EMBED = "embed"
+INGEST_STORE = "store"
+INGEST_SUMMARIZE = "summarize"
+INGEST_SKIP = "skip"
+INGESTION_POLICIES = (INGEST_EMBED, INGEST_STORE, INGEST_SUMMARIZE, INGEST_SKIP)
+
+# Defaults per tool. Anything not listed is embedded.
+# Overridable globally via settings["memory_ingestion_policy"] and per agent
+# via agent["memory_policy"] (agent wins).
+DEFAULT_INGESTION_POLICY: dict[str, str] = {
+    # Internal bookkeeping tools — no retrieval value
+    "get_current_session_context": INGEST_SKIP,
+    "clear_session_context": INGEST_SKIP,
+    "decide_search_or_analyze": INGEST_SKIP,
+    # Form definition only; the user's answer arrives as a chat message
+    "collect_data": INGEST_SKIP,
+    # Useful for "what did I just ask for" lookups, never for semantic search
+    "get_datetime": INGEST_STORE,
+    "get_personal_details": INGEST_STORE,
+    "list_tables": INGEST_STORE,
+    "get_table_schema": INGEST_STORE,
+    # Large outputs — the embedding only needs the gist
+    "search_web": INGEST_SUMMARIZE,
+    "visit_page": INGEST_SUMMARIZE,
+    "parse_pdf": INGEST_SUMMARIZE,
+    "parse_xlsx": INGEST_SUMMARIZE,
+    "get_recent_emails_content": INGEST_SUMMARIZE,
+    "read_file_content": INGEST_SUMMARIZE,
+    "read_local_file": INGEST_SUMMARIZE,
+}
+
+
+def merge_ingestion_overrides(settings: dict | None, agent: dict | None) -> dict[str, str]:
+    """Merge settings-wide and per-agent policy overrides (agent wins)."""
+    return {
+        **((settings or {}).get("memory_ingestion_policy") or {}),
+        **((agent or {}).get("memory_policy") or {}),
+    }
+
+
+def resolve_ingestion_policy(tool_name: str, overrides: dict[str, str] | None = None) -> str:
+    """Return the ingestion policy for a tool, honouring settings/agent overrides."""
+    if overrides and isinstance(overrides, dict):
+        policy = overrides.get(tool_name) or overrides.get("*")
+        if policy in INGESTION_POLICIES:
+            return policy
+    return DEFAULT_INGESTION_POLICY.get(tool_name, INGEST_EMBED)
+
+
+TOOL_SUMMARY_CHARS = 1500  # Output budget for summarize-then-embed
+OUTPUT_SUMMARY_MARKER = "\nOutput summary: "
+
+
+def summarize_tool_execution(tool_name: str, tool_args: dict, tool_output: str | ToolResult) -> str:
+    """
+    Build a compact text for embedding a large tool output.
+
+    JSON outputs keep their structure (keys, ids, short values) with long
+    strings clipped; plain text keeps its head. Either way the result is
+    capped at TOOL_SUMMARY_CHARS.
+    """
+    def _clip(value: Any, depth: int = 0) -> Any:
+        if isinstance(value, str):
+            return value if len(value) <= 200 else value[:200] + "..."
+        if depth >= 3:
+            return "..."
+        if isinstance(value, dict):
+            return {k: _clip(v, depth + 1) for k, v in list(value.items())[:20]}
+        if isinstance(value, list):
+            clipped = [_clip(v, depth + 1) for v in value[:5]]
+            if len(value) > 5:
+                clipped.append(f"... ({len(value)} items)")
+            return clipped
+        return value
+
+    try:
+        output_text = json.dumps(_clip(ToolResult.of(tool_output).value), default=str)
+    except Exception:
+        output_text = str(tool_output)
+    header = f"Tool: {tool_name}\nArguments: {json.dumps(tool_args, default=str)}{OUTPUT_SUMMARY_MARKER}"
+    return (header + output_text)[:TOOL_SUMMARY_CHARS]
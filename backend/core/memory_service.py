@@ -0,0 +1,127 @@
+"""
+Out-of-process memory service.
+
+One process owns the vector store (Chroma or local) and the embedding calls.
+API workers talk to it through core.memory_client.RemoteMemoryStore. This
+lets uvicorn run several workers without them sharing data/chroma_db.
+
+    cd backend
+    python -m core.memory_service --uds data/memory.sock
+    python -m core.memory_service --host 127.0.0.1 --port 8765
+
+Then set "memory_service_url" in settings to "unix://data/memory.sock" (a
+relative path resolves under backend/) or "http://127.0.0.1:8765".
+
+Protocol: POST /rpc with {"calls": [{"method", "args", "kwargs"}, ...]}. The
+reply is {"results": [{"ok": true, "result": ...} | {"ok": false, "error": ...}]},
+in call order. Store operations go through the async memory executor: reads
+run concurrently, and writes to a collection apply in the order they arrive.
+"""
+import os
+import json
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from core.config import load_settings
+from core.memory_executor import MEMORY_OPERATIONS, get_memory_executor, shutdown_memory_executor
+
+# Callable over RPC in addition to MEMORY_OPERATIONS (which run on the executor)
+SERVICE_METHODS = {"reindex_progress", "resume_reindex", "get_ingestion_stats", "reload_settings", "service_stats"}
+
+
+def _service_settings() -> dict:
+    settings = dict(load_settings())
+    settings["memory_service_url"] = ""  # The service itself always owns the store
+    return settings
+
+
+def create_app(store=None) -> FastAPI:
+    """Build the service app. Without `store`, one is created from settings on startup."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if app.state.store is None:
+            from core.routes.settings import _init_memory_store
+
+            app.state.store = _init_memory_store(_service_settings())
+        print(f"Memory service ready ({getattr(app.state.store, 'backend', None)} backend)")
+        yield
+        shutdown_memory_executor()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.store = store
+    app.state.batches = 0
+    app.state.calls = 0
+
+    async def _dispatch(call: dict) -> dict:
+        method = call.get("method")
+        args = call.get("args") or []
+        kwargs = call.get("kwargs") or {}
+        store = app.state.store
+        try:
+            if store is None:
+                raise RuntimeError("memory store is not initialized")
+            if method in MEMORY_OPERATIONS:
+                result = await getattr(store.aio, method)(*args, **kwargs)
+            elif method == "get_ingestion_stats":
+                result = dict(store.ingestion_stats)
+            elif method == "reload_settings":
+                from core.routes.settings import _refresh_memory_store
+
+                app.state.store = await asyncio.to_thread(_refresh_memory_store, store, _service_settings())
+                result = True
+            elif method == "service_stats":
+                result = {
+                    "batches": app.state.batches,
+                    "calls": app.state.calls,
+                    "executor": get_memory_executor().stats(),
+                }
+            elif method in SERVICE_METHODS:
+                result = getattr(store, method)(*args, **kwargs)
+            else:
+                raise ValueError(f"unknown method '{method}'")
+            return {"ok": True, "result": result}
+        except Exception as e:
+            print(f"Error in memory service call {method}: {e}")
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    @app.post("/rpc")
+    async def rpc(request: Request):
+        body = await request.json()
+        calls = body.get("calls") or []
+        app.state.batches += 1
+        app.state.calls += len(calls)
+        # Tasks start in order, so per-collection write locks are taken in call order
+        results = await asyncio.gather(*[_dispatch(c) for c in calls])
+        return Response(json.dumps({"results": results}, default=str), media_type="application/json")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "ready": app.state.store is not None}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the shared memory service")
+    parser.add_argument("--uds", help="Unix socket path (preferred for same-host workers)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.uds:
+        if os.path.exists(args.uds):
+            os.remove(args.uds)  # Stale socket from a previous run
+        uvicorn.run(create_app(), uds=args.uds, workers=1)
+    else:
+        uvicorn.run(create_app(), host=args.host, port=args.port, workers=1)
+
+
+if __name__ == "__main__":
+    main()
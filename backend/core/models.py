@@ -32,6 +32,8 @@ class Agent(BaseModel):
     type: str = "conversational"  # conversational | analysis | workflow
     tools: list[str] # ["all"] or ["gmail", "search_web"]
     system_prompt: str
+    # Optional per-tool memory ingestion overrides: {"tool_name" | "*": "embed" | "store" | "summarize" | "skip"}
+    memory_policy: dict[str, str] = {}
 
 class AgentActiveRequest(BaseModel):
     agent_id: str
@@ -61,6 +63,38 @@ class Settings(BaseModel):
     n8n_table_id: str = ""
     global_config: dict[str, str] = {}
     show_browser: bool = False
+    # Optional per-tool memory ingestion overrides (see core.memory_policy.DEFAULT_INGESTION_POLICY)
+    memory_ingestion_policy: dict[str, str] = {}
+    # Long-term memory vector backend: "chroma" | "local" (in-process NumPy/HNSW)
+    vector_backend: str = "chroma"
+    # Local backend only: {"quantization": "none" | "int8", "truncate_dim": 0, "keep_exact": true}
+    vector_compression: dict[str, Any] = {}
+    # Optional shared memory service (core.memory_service): "unix://data/memory.sock" or "http://127.0.0.1:8765"
+    memory_service_url: str = ""
+    # Short-term session storage: "memory" (single worker) | "sqlite" (shared by workers; restart to apply)
+    session_store: str = "memory"
+    # Memory backend only: journal sessions to data/session_snapshots/ and restore them after a restart
+    session_snapshots: bool = True
+    # Session eviction overrides: {"idle_ttl_s": 7200, "max_sessions": 500, "max_bytes": 67108864}
+    session_eviction: dict[str, Any] = {}
+    # Model that folds older conversation turns into a running summary ("" = the chat model)
+    history_summary_model: str = ""
+    # Advertise native agent tools from data/tool_manifests/ and spawn each agent on first use
+    lazy_agents: bool = True
+    # Stop a native agent after this many idle minutes (0 = keep running); respawned on next call
+    agent_idle_shutdown_min: float = 0
+    # Lightweight native agents loaded as modules in the API process instead of subprocesses
+    in_process_agents: list[str] = ["time", "personal_details", "collect_data"]
+    # Worker processes per native agent, e.g. {"browser": 3}; merged over core.server.AGENT_WORKERS
+    agent_workers: dict[str, int] = {}
+    # Fork native agents from a server that has pre-imported mcp/pydantic (POSIX only; see core.forkserver)
+    agent_fork_server: bool = False
+    # Extra modules for the fork server to pre-import, e.g. ["pandas", "pdfplumber"]
+    agent_fork_server_preload: list[str] = []
+    # Whole-request time limit for chat, propagated into tool calls
+    chat_deadline_s: float = 600
+    # Per-tool or per-agent call timeouts in seconds, e.g. {"visit_page": 90, "sql": 30}
+    tool_timeouts: dict[str, float] = {}
 
 
 class PersonalAddress(BaseModel):
@@ -99,9 +133,13 @@ class MapsDetailsRequest(BaseModel):
 
 class AddMCPServerRequest(BaseModel):
     name: str
-    command: str
+    command: Optional[str] = None
     args: List[str] = []
     env: Dict[str, str] = {}
+    # Remote server instead of a command: streamable HTTP ("http") or SSE endpoint
+    url: Optional[str] = None
+    transport: str = "http"
+    headers: Dict[str, str] = {}
 
 
 class GoogleCredsRequest(BaseModel):
@@ -0,0 +1,162 @@
+"""
+Out-of-band transfer for large tool outputs.
+
+A parsed PDF, a workbook as markdown or a 50k-char page used to go
+through the stdio pipe as one JSON-RPC string: escaped, written,
+read, validated, then copied again by the orchestrator. Past
+PAYLOAD_INLINE_MAX_BYTES, an agent writes the text to a file under
+data/payloads/ instead. The tool result then carries only a small handle:
+
+    {"payload_ref": {"path": ..., "bytes": ..., "chars": ..., "preview": ...}}
+
+The orchestrator opens the handle with ToolOutput, mmaps the file and
+decodes it once into the ToolResult the chat loop works with. The file is
+removed as soon as it has been read. Anything left behind by a crash is
+swept at startup.
+
+Agents only offload when the orchestrator that spawned them set
+MCP_PAYLOAD_DIR, so they share its filesystem. An agent served over HTTP
+from another node (core.mcp_http) always returns its output inline.
+"""
+import os
+import json
+import mmap
+import time
+import uuid
+from typing import Optional
+
+from mcp import types
+
+from core.config import DATA_DIR
+from core.tool_result import ToolResult
+
+PAYLOADS_DIR = os.path.join(DATA_DIR, "payloads")
+PAYLOAD_DIR_ENV = "MCP_PAYLOAD_DIR"
+PAYLOAD_INLINE_MAX_BYTES = 32 * 1024
+PAYLOAD_PREVIEW_CHARS = 200
+PAYLOAD_MAX_AGE_S = 3600
+
+
+# --- Agent side ---
+
+def payload_content(text: str, inline_max_bytes: int = PAYLOAD_INLINE_MAX_BYTES) -> list[types.TextContent]:
+    """Tool result content for text: inline when small (or not spawned locally), else a payload handle."""
+    payload_dir = os.environ.get(PAYLOAD_DIR_ENV)
+    raw = text.encode("utf-8")
+    if not payload_dir or len(raw) <= inline_max_bytes:
+        return [types.TextContent(type="text", text=text)]
+    try:
+        os.makedirs(payload_dir, exist_ok=True)
+        path = os.path.join(payload_dir, f"{uuid.uuid4().hex}.txt")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"WARNING: Could not write payload file, returning inline: {e}")
+        return [types.TextContent(type="text", text=text)]
+    handle = {"payload_ref": {"path": path, "bytes": len(raw), "chars": len(text), "preview": text[:PAYLOAD_PREVIEW_CHARS]}}
+    return [types.TextContent(type="text", text=json.dumps(handle))]
+
+
+# --- Orchestrator side ---
+
+def _payload_path(text: str, root: str) -> Optional[str]:
+    """The file behind a payload handle, or None if text is an ordinary output (or points outside root)."""
+    if not text.startswith('{"payload_ref"') or len(text) > 4096:
+        return None
+    try:
+        ref = json.loads(text)["payload_ref"]
+        path = os.path.realpath(ref["path"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if os.path.dirname(path) != os.path.realpath(root):
+        print(f"WARNING: Ignoring payload handle outside {root}: {path}")
+        return None
+    return path
+
+
+class ToolOutput:
+    """The text of one tool result, inline or mapped from a payload file."""
+
+    def __init__(self, text: str = "", path: Optional[str] = None):
+        self._text = None if path else text
+        self.path = path
+        self._map: Optional[mmap.mmap] = None
+        if path:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else None
+
+    @classmethod
+    def from_result(cls, result, root: str = PAYLOADS_DIR) -> "ToolOutput":
+        text = result.content[0].text if result.content else ""
+        path = _payload_path(text, root)
+        if path is None:
+            return cls(text)
+        try:
+            return cls(path=path)
+        except OSError as e:
+            print(f"WARNING: Payload file unreadable ({e}); using the handle as output")
+            return cls(text)
+
+    @property
+    def out_of_band(self) -> bool:
+        return self.path is not None
+
+    @property
+    def size_bytes(self) -> int:
+        if self._map is not None:
+            return len(self._map)
+        return len(self._text.encode("utf-8")) if self._text is not None else 0
+
+    def result(self) -> ToolResult:
+        """The whole output, decoded from the mapped file if it came out of band."""
+        if self._text is not None:
+            return ToolResult(self._text)
+        if self._map is None:
+            return ToolResult("")
+        with memoryview(self._map) as view:
+            return ToolResult(str(view, "utf-8"))
+
+    def release(self):
+        """Unmap and delete the payload file (results already decoded stay usable)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def read_tool_output(result, root: str = PAYLOADS_DIR) -> ToolResult:
+    """A tool result's output, resolving a payload handle; the payload file is removed afterwards."""
+    output = ToolOutput.from_result(result, root)
+    if not output.out_of_band:
+        return output.result()
+    try:
+        started = time.perf_counter()
+        text = output.result()
+        print(f"DEBUG: Tool output mapped from payload file ({output.size_bytes} bytes, "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms)")
+        return text
+    finally:
+        output.release()
+
+
+def sweep_payloads(root: str = PAYLOADS_DIR, max_age_s: float = PAYLOAD_MAX_AGE_S) -> int:
+    """Delete payload files older than max_age_s (left behind by a crash). Returns the number removed."""
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age_s
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
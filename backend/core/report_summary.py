@@ -0,0 +1,123 @@
+"""
+Compact summaries of large reports (aggregations, distributions, sample rows).
+
+No vector-store imports: the memory service client runs this locally.
+"""
+
+
+def generate_report_summary(report_data: list[dict], report_type: str, max_sample_rows: int = 5) -> dict:
+    """
+    Generate a compact but informative summary of a large report.
+
+    Used when the full report is too large to fit in the LLM context window.
+    The summary includes:
+      - Pre-computed aggregations (sum, avg, min, max) for numeric columns
+      - Value distributions for categorical columns
+      - Sample rows for structure understanding
+      - Metadata (row count, column names)
+
+    This allows the LLM to answer aggregation questions directly from the summary,
+    and use search_embedded_report for specific row lookups.
+
+    Args:
+        report_data: Full list of report records
+        report_type: Type of report (e.g., "orders", "payments")
+        max_sample_rows: Number of sample rows to include
+
+    Returns:
+        dict with summary info, suitable for JSON serialization
+    """
+    if not report_data:
+        return {"error": "No data to summarize"}
+
+    columns = list(report_data[0].keys()) if report_data else []
+    total_rows = len(report_data)
+
+    # Try pandas for richer analysis
+    try:
+        import pandas as pd
+        df = pd.DataFrame(report_data)
+
+        aggregations = {}
+        categorical_distributions = {}
+
+        for col in df.columns:
+            try:
+                if pd.api.types.is_numeric_dtype(df[col]):
+                    col_stats = {
+                        "min": round(float(df[col].min()), 2),
+                        "max": round(float(df[col].max()), 2),
+                        "mean": round(float(df[col].mean()), 2),
+                        "sum": round(float(df[col].sum()), 2),
+                        "median": round(float(df[col].median()), 2),
+                        "non_null_count": int(df[col].notna().sum()),
+                    }
+                    # Add count of zeros and negatives if relevant
+                    zeros = int((df[col] == 0).sum())
+                    negatives = int((df[col] < 0).sum())
+                    if zeros > 0:
+                        col_stats["zero_count"] = zeros
+                    if negatives > 0:
+                        col_stats["negative_count"] = negatives
+                    aggregations[col] = col_stats
+                elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+                    value_counts = df[col].value_counts().head(10)
+                    if not value_counts.empty:
+                        categorical_distributions[col] = {
+                            "unique_values": int(df[col].nunique()),
+                            "top_values": {str(k): int(v) for k, v in value_counts.items()},
+                            "null_count": int(df[col].isna().sum()),
+                        }
+            except Exception:
+                continue
+
+        summary = {
+            "is_summary": True,
+            "report_type": report_type,
+            "total_rows": total_rows,
+            "columns": columns,
+            "numeric_aggregations": aggregations,
+            "categorical_distributions": categorical_distributions,
+            "sample_rows": report_data[:max_sample_rows],
+            "note": (
+                f"This is a SUMMARY of {total_rows} rows. Full data is embedded in RAG memory. "
+                "Use the pre-computed aggregations above to answer totals/averages/min/max questions. "
+                "For specific row lookups, use search_embedded_report tool."
+            ),
+        }
+
+    except ImportError:
+        # Fallback without pandas
+        aggregations = {}
+        for col in columns:
+            values = [r.get(col) for r in report_data if r.get(col) is not None]
+            numeric_values = []
+            for v in values:
+                try:
+                    numeric_values.append(float(v))
+                except (ValueError, TypeError):
+                    pass
+            if numeric_values:
+                aggregations[col] = {
+                    "min": round(min(numeric_values), 2),
+                    "max": round(max(numeric_values), 2),
+                    "mean": round(sum(numeric_values) / len(numeric_values), 2),
+                    "sum": round(sum(numeric_values), 2),
+                    "count": len(numeric_values),
+                }
+
+        summary = {
+            "is_summary": True,
+            "report_type": report_type,
+            "total_rows": total_rows,
+            "columns": columns,
+            "numeric_aggregations": aggregations,
+            "sample_rows": report_data[:max_sample_rows],
+            "note": (
+                f"This is a SUMMARY of {total_rows} rows. Full data is embedded in RAG memory. "
+                "Use the pre-computed aggregations above to answer totals/averages/min/max questions. "
+                "For specific row lookups, use search_embedded_report tool."
+            ),
+        }
+
+    return summary
@@ -8,13 +8,22 @@ from fastapi import APIRouter, HTTPException
 
 from core.models import Agent, AgentActiveRequest
 from core.tools import NATIVE_TOOL_SYSTEM_PROMPT
+from core.session import get_session_store
 
 router = APIRouter()
 
 USER_AGENTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "user_agents.json")
 
-# Module-level state
-active_agent_id = "aurora"  # Default
+# The active agent lives in the session store so every worker agrees on it
+DEFAULT_AGENT_ID = "aurora"
+
+
+def get_active_agent_id() -> str:
+    return get_session_store().get("globals", "active_agent_id") or DEFAULT_AGENT_ID
+
+
+def set_active_agent_id(agent_id: str):
+    get_session_store().set("globals", "active_agent_id", agent_id)
 
 
 def load_user_agents() -> list[dict]:
@@ -34,6 +43,7 @@ def save_user_agents(agents: list[dict]):
 
 def get_active_agent_data():
     agents = load_user_agents()
+    active_agent_id = get_active_agent_id()
     for a in agents:
         if a["id"] == active_agent_id:
             return a
@@ -80,18 +90,17 @@ async def delete_agent(agent_id: str):
 
 @router.get("/api/agents/active")
 async def get_active_agent_endpoint():
-    return {"active_agent_id": active_agent_id}
+    return {"active_agent_id": get_active_agent_id()}
 
 
 @router.post("/api/agents/active")
 async def set_active_agent_endpoint(req: AgentActiveRequest):
-    global active_agent_id
     # Validate
     agents = load_user_agents()
     ids = [a["id"] for a in agents]
     if req.agent_id not in ids:
         raise HTTPException(status_code=404, detail="Agent not found")
 
-    active_agent_id = req.agent_id
-    print(f"Active Agent switched to: {active_agent_id}")
-    return {"status": "success", "active_agent_id": active_agent_id}
+    set_active_agent_id(req.agent_id)
+    print(f"Active Agent switched to: {req.agent_id}")
+    return {"status": "success", "active_agent_id": req.agent_id}
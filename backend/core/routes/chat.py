@@ -9,8 +9,9 @@ import asyncio
 import re
 import time
 import traceback
+from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 import httpx
 
@@ -19,16 +20,22 @@ from core.models import ChatRequest, ChatResponse
 from core.session import (
     _get_session_id, _get_conversation_history, _get_session_state,
     _apply_sticky_args, _clear_session_context, _extract_and_persist_ids,
-    get_recent_history_messages,
+    _get_recent_tool_executions, _record_recent_tool_execution,
+    get_recent_history_messages, touch_session, _get_prompt_context,
 )
+from core.history_compactor import schedule_history_compaction
+from core.deadlines import call_tool_with_deadline, request_deadline, stream_until_disconnect
+from core.payloads import read_tool_output
+from core.tool_result import ToolResult
 from core.llm_providers import generate_response as llm_generate_response
+from core.memory_policy import INGEST_SKIP, INGEST_STORE, merge_ingestion_overrides, resolve_ingestion_policy
 from core.tools import (
     NATIVE_TOOL_SYSTEM_PROMPT,
     aggregate_all_tools,
     build_system_prompt,
 )
 from core.routes.agents import (
-    load_user_agents, get_active_agent_data, active_agent_id,
+    load_user_agents, get_active_agent_data, get_active_agent_id,
 )
 from core.routes.tools import load_custom_tools
 
@@ -40,8 +47,63 @@ router = APIRouter()
 # ---------------------------------------------------------------------------
 
 MAX_TURNS = 15  # Maximum ReAct loop iterations
+DEADLINE_RESPONSE = "I ran out of time before finishing this request. Please try again, or narrow it down."
 REPORT_CHUNK_SIZE = 50  # Rows per chunk when embedding reports into RAG
 
+
+def _parse_memory_time_range(tool_args) -> tuple[float | None, float | None]:
+    """
+    Turn query_past_conversations time arguments into epoch-second bounds.
+
+    Accepts `last_days` (int) and/or `since` / `until` (ISO date or datetime).
+    Invalid values are ignored rather than failing the tool call.
+    """
+    since = until = None
+    if not isinstance(tool_args, dict):
+        return since, until
+
+    if tool_args.get("last_days") is not None:
+        try:
+            since = time.time() - float(tool_args.get("last_days")) * 86400
+        except Exception:
+            pass
+
+    for key in ("since", "until"):
+        value = tool_args.get(key)
+        if not value:
+            continue
+        try:
+            parsed = datetime.fromisoformat(str(value)).timestamp()
+        except Exception:
+            print(f"DEBUG: Ignoring invalid '{key}' for memory query: {value}")
+            continue
+        if key == "since":
+            since = max(since, parsed) if since is not None else parsed
+        else:
+            # A bare date means "through the end of that day" (the bound is inclusive)
+            until = parsed + 86400 - 1e-6 if len(str(value)) == 10 else parsed
+
+    return since, until
+
+
+async def _record_tool_execution(memory_store, ingestion_stats: dict, ingestion_overrides: dict, **kwargs) -> None:
+    """Persist a tool execution under its ingestion policy and tally the outcome."""
+    policy = resolve_ingestion_policy(kwargs["tool_name"], ingestion_overrides)
+    if policy != INGEST_SKIP:
+        _record_recent_tool_execution(
+            kwargs["session_id"], kwargs["tool_name"], kwargs["tool_args"],
+            kwargs["tool_output"], agent_id=kwargs.get("agent_id"),
+        )
+    applied = await memory_store.aio.add_tool_execution(policy=policy, **kwargs)
+    ingestion_stats[applied] = ingestion_stats.get(applied, 0) + 1
+
+
+def _log_ingestion_stats(ingestion_stats: dict) -> None:
+    if not ingestion_stats:
+        return
+    saved = ingestion_stats.get(INGEST_STORE, 0) + ingestion_stats.get(INGEST_SKIP, 0)
+    print(f"DEBUG: 🧠 Memory ingestion this request: {ingestion_stats} — embeddings saved: {saved}")
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     import core.server as _server
@@ -49,6 +111,7 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail="No agents connected")
 
     session_id = _get_session_id(request)
+    touch_session(session_id)
     user_message = request.message
 
     # Merge client-provided ephemeral state into server session state (best-effort)
@@ -59,6 +122,7 @@ async def chat(request: ChatRequest):
             ss["facility_id"] = str(active_facility)
     
     # -- Load Active Agent Logic --
+    active_agent_id = get_active_agent_id()
     active_agent = get_active_agent_data()
     agent_system_template = active_agent.get("system_prompt", NATIVE_TOOL_SYSTEM_PROMPT)
     print(f"DEBUG: Using Agent '{active_agent.get('name')}' with tools: {active_agent.get('tools', ['all'])}")
@@ -72,12 +136,18 @@ async def chat(request: ChatRequest):
     # 2. Build System Prompt (from core.tools)
     system_prompt_text = build_system_prompt(
         agent_system_template, tools_json, session_id,
-        _get_session_state, _server.memory_store, agent_id=active_agent_id
+        _get_session_state, _server.memory_store, agent_id=active_agent_id,
+        recent_tools_getter=_get_recent_tool_executions, session_context_getter=_get_prompt_context,
     )
 
     current_settings = load_settings()
     current_model = current_settings.get("model", "mistral")
     mode = current_settings.get("mode", "local")
+    deadline = request_deadline(current_settings)
+
+    # Memory ingestion policy: settings-wide overrides, then per-agent overrides
+    ingestion_overrides = merge_ingestion_overrides(current_settings, active_agent)
+    ingestion_stats: dict[str, int] = {}
 
     # LLM caller wrapper — delegates to the shared llm_providers module
     async def generate_response(
@@ -120,6 +190,10 @@ async def chat(request: ChatRequest):
     async with httpx.AsyncClient() as client:
         for turn in range(MAX_TURNS):
             print(f"Turn {turn + 1}/{MAX_TURNS}")
+            if deadline.expired():
+                print(f"⚠️ Request deadline ({deadline.seconds:.0f}s) exceeded, stopping ReAct loop")
+                final_response = DEADLINE_RESPONSE
+                break
             
             # Determine Prompt logic
             # If it's the first turn, we use the clean Native System Prompt & History
@@ -233,7 +307,8 @@ async def chat(request: ChatRequest):
                      # NEW: Store in memory
                      if _server.memory_store:
                          try:
-                             _server.memory_store.add_tool_execution(
+                             await _record_tool_execution(
+                                 _server.memory_store, ingestion_stats, ingestion_overrides,
                                  session_id=session_id,
                                  tool_name=tool_name,
                                  tool_args={},
@@ -250,7 +325,7 @@ async def chat(request: ChatRequest):
                 # 1. Internal Tool: Clear Session Context
                 if tool_name == "clear_session_context":
                     scope = tool_args.get("scope", "transient") if isinstance(tool_args, dict) else "transient"
-                    cleared_keys = _clear_session_context(session_id, scope)
+                    cleared_keys = await _clear_session_context(session_id, scope)
                     
                     result = {
                         "status": "success",
@@ -265,7 +340,8 @@ async def chat(request: ChatRequest):
                     # Store in memory
                     if _server.memory_store:
                         try:
-                            _server.memory_store.add_tool_execution(
+                            await _record_tool_execution(
+                                _server.memory_store, ingestion_stats, ingestion_overrides,
                                 session_id=session_id,
                                 tool_name=tool_name,
                                 tool_args={"scope": scope},
@@ -302,7 +378,8 @@ async def chat(request: ChatRequest):
                         # Store in memory
                         if _server.memory_store:
                             try:
-                                _server.memory_store.add_tool_execution(
+                                await _record_tool_execution(
+                                    _server.memory_store, ingestion_stats, ingestion_overrides,
                                     session_id=session_id,
                                     tool_name=tool_name,
                                     tool_args=tool_args,
@@ -350,7 +427,7 @@ async def chat(request: ChatRequest):
                             raise ValueError("No data found in report")
                         
                         # Embed the report
-                        result = _server.memory_store.embed_report_for_session(
+                        result = await _server.memory_store.aio.embed_report_for_session(
                             session_id=session_id,
                             report_data=report_data,
                             report_type=report_type,
@@ -396,7 +473,7 @@ async def chat(request: ChatRequest):
                         print(f"DEBUG: Session ID: {session_id}")
                         
                         # Search session embeddings
-                        results = _server.memory_store.search_embedded_report(
+                        results = await _server.memory_store.aio.search_embedded_report(
                             session_id=session_id,
                             query=query,
                             n_results=n_results
@@ -465,7 +542,10 @@ async def chat(request: ChatRequest):
                         if scope == "session":
                             where = {"session_id": session_id}
 
-                        memories = _server.memory_store.query_memory(query, n_results=n_results, where=where)
+                        since, until = _parse_memory_time_range(tool_args)
+                        memories = await _server.memory_store.aio.query_memory(
+                            query, n_results=n_results, where=where, since=since, until=until
+                        )
                         raw_output = json.dumps({"memories": memories, "scope": scope})
 
                         current_context_text += f"\nTool '{tool_name}' Output: {raw_output}\n"
@@ -517,13 +597,13 @@ async def chat(request: ChatRequest):
                                      if filtered_resp:
                                          json_resp = filtered_resp
 
-                                 raw_output = json.dumps(json_resp)
+                                 raw_output = ToolResult.from_value(json_resp)
                              except Exception as e:
                                  print(f"DEBUG: Failed to parse JSON from {url}: {e}")
-                                 raw_output = resp.text
+                                 raw_output = ToolResult(resp.text)
                                  if not raw_output:
                                      print(f"DEBUG: ❌ Empty response from {tool_name} (Status: {resp.status_code})")
-                                     raw_output = json.dumps({"error": f"Empty response from tool {tool_name} (Status: {resp.status_code})"})
+                                     raw_output = ToolResult.from_value({"error": f"Empty response from tool {tool_name} (Status: {resp.status_code})"})
                                  
                                  
                              # NEW: Extract and persist IDs for custom tools too
@@ -542,7 +622,7 @@ async def chat(request: ChatRequest):
                                          # Report tools: auto-embed via RAG (skip normal embedding)
                                          print(f"DEBUG: ✅ REPORT TOOL DETECTED - Starting auto-embed for '{tool_name}'")
                                          try:
-                                             parsed_output = json.loads(raw_output)
+                                             parsed_output = raw_output.value
                                              print(f"DEBUG: Parsed report output type: {type(parsed_output)}")
                                              
                                              # Automatically embed each report + build context-safe output
@@ -560,7 +640,7 @@ async def chat(request: ChatRequest):
                                                          
                                                          print(f"DEBUG: 📊 AUTO-EMBEDDING REPORT #{idx+1}: '{report_type}' with {len(report_data)} rows")
                                                          
-                                                         embed_result = _server.memory_store.embed_report_for_session(
+                                                         embed_result = await _server.memory_store.aio.embed_report_for_session(
                                                              session_id=session_id,
                                                              report_data=report_data,
                                                              report_type=report_type,
@@ -576,14 +656,14 @@ async def chat(request: ChatRequest):
                                                              ss["last_report_context"] = {
                                                                  "timestamp": time.time(),
                                                                  "type": report_type,
-                                                                 "row_count": len(report_data)
+                                                                 "row_count": len(report_data),
                                                              }
                                                              print(f"DEBUG: 💾 Saved report context to session state")
                                                          except Exception as e:
                                                              print(f"DEBUG: Error saving report context: {e}")
                                                          
                                                          # Check if this individual report's data is too large for context
-                                                         report_json_size = len(json.dumps(report_obj))
+                                                         report_json_size = raw_output.item_size(idx)
                                                          if report_json_size > REPORT_SIZE_THRESHOLD:
                                                              print(f"DEBUG: 📏 Report '{report_type}' is {report_json_size} chars — TOO LARGE for context. Sending summary instead.")
                                                              summary = _server.memory_store.generate_report_summary(report_data, report_type)
@@ -595,7 +675,11 @@ async def chat(request: ChatRequest):
                                                          context_safe_reports.append(report_obj)
                                                  
                                                  # Replace raw_output with context-safe version
-                                                 raw_output = json.dumps(context_safe_reports)
+                                                 # Reports kept as-is reuse their text from the tool output; only summaries are serialized
+                                                 raw_output = ToolResult.from_items(context_safe_reports, [
+                                                     raw_output.item_raw(i) if item is parsed_output[i] else json.dumps(item)
+                                                     for i, item in enumerate(context_safe_reports)
+                                                 ])
                                                  print(f"DEBUG: 📦 Context-safe output size: {len(raw_output)} chars (threshold: {REPORT_SIZE_THRESHOLD})")
                                              else:
                                                  print(f"DEBUG: ⚠️ Report output is not a list: {type(parsed_output)}")
@@ -607,9 +691,10 @@ async def chat(request: ChatRequest):
                                              import traceback
                                              traceback.print_exc()
                                      else:
-                                         # Normal tools: use standard embedding
-                                         print(f"DEBUG: Using normal embedding for non-report tool '{tool_name}'")
-                                         _server.memory_store.add_tool_execution(
+                                         # Normal tools: use the tool's ingestion policy
+                                         print(f"DEBUG: Using normal memory ingestion for non-report tool '{tool_name}'")
+                                         await _record_tool_execution(
+                                             _server.memory_store, ingestion_stats, ingestion_overrides,
                                              session_id=session_id,
                                              tool_name=tool_name,
                                              tool_args=tool_args,
@@ -648,13 +733,15 @@ async def chat(request: ChatRequest):
                 print(f"Executing {tool_name} on {agent_name}...")
                 try:
                     # tool_args already processed
-                    result = await session.call_tool(tool_name, tool_args)
-                    raw_output = result.content[0].text
+                    result = await call_tool_with_deadline(session, agent_name, tool_name, tool_args, deadline, current_settings)
+                    raw_output = read_tool_output(result)
+                    # Text for the prompt; ID extraction and memory keep the parsed raw_output
+                    prompt_output = raw_output
                     
                     # Store intent/data for frontend if it's the *last* interesting thing
                     # But for intermediate steps, we mainly care about text output
                     try:
-                        parsed = json.loads(raw_output)
+                        parsed = raw_output.value
                         if "error" in parsed and parsed["error"] == "auth_required":
                              return ChatResponse(response="Authentication required.", intent="request_auth", data=parsed)
                         
@@ -662,7 +749,7 @@ async def chat(request: ChatRequest):
                         if tool_name == "get_recent_emails_content" and isinstance(parsed, dict) and "emails" in parsed:
                             emails = parsed.get("emails", [])
                             email_texts = [f"Email {i+1}:\nSubject: {e.get('subject', 'N/A')}\nFrom: {e.get('from', 'N/A')}\nDate: {e.get('date', 'N/A')}\nBody: {e.get('body', 'N/A')}" for i, e in enumerate(emails)]
-                            raw_output = f"Here is the content of the {len(emails)} emails found (Note: This might be fewer than requested). FAST AND CONCISELY Summarize them. EXPLICITLY mention that you found {len(emails)} emails matching the query:\n" + "\n".join(email_texts)
+                            prompt_output = f"Here is the content of the {len(emails)} emails found (Note: This might be fewer than requested). FAST AND CONCISELY Summarize them. EXPLICITLY mention that you found {len(emails)} emails matching the query:\n" + "\n".join(email_texts)
                         
                         # Set intent for frontend logic (e.g. if we list files, we want the UI to show them)
                         if tool_name.startswith("list_") or tool_name.startswith("read_") or tool_name.startswith("create_") or tool_name == "draft_email" or tool_name == "send_email" or tool_name == "get_recent_emails_content":
@@ -684,9 +771,9 @@ async def chat(request: ChatRequest):
 
                     # Append Result to Context
                     # Increase truncation limit to 50k to allow full email contents to be passed to next steps
-                    display_output = raw_output[:50000] + "...(truncated)" if len(raw_output) > 50000 else raw_output
+                    display_output = prompt_output[:50000] + "...(truncated)" if len(prompt_output) > 50000 else prompt_output
                     print(f"DEBUG: Tool Output Length: {len(raw_output)}", flush=True)
-                    print(f"DEBUG: Tool Output Content: {raw_output}", flush=True)
+                    print(f"DEBUG: Tool Output Content: {raw_output[:2000]}{'...' if len(raw_output) > 2000 else ''}", flush=True)
                     current_context_text += f"\nTool '{tool_name}' Output: {display_output}\n"
                     
                     # NEW: Extract and persist critical IDs to session state
@@ -695,7 +782,8 @@ async def chat(request: ChatRequest):
                     # NEW: Store tool execution in memory for retrieval
                     if _server.memory_store:
                         try:
-                            _server.memory_store.add_tool_execution(
+                            await _record_tool_execution(
+                                _server.memory_store, ingestion_stats, ingestion_overrides,
                                 session_id=session_id,
                                 tool_name=tool_name,
                                 tool_args=tool_args,
@@ -723,8 +811,9 @@ async def chat(request: ChatRequest):
         
     # 4. Save to Memory (Background Task ideal, but inline for POC)
     if _server.memory_store and final_response:
-        _server.memory_store.add_memory("user", user_message, metadata={"session_id": session_id, "agent_id": active_agent_id})
-        _server.memory_store.add_memory("assistant", final_response, metadata={"session_id": session_id, "agent_id": active_agent_id})
+        await _server.memory_store.aio.add_memory("user", user_message, metadata={"session_id": session_id, "agent_id": active_agent_id})
+        await _server.memory_store.aio.add_memory("assistant", final_response, metadata={"session_id": session_id, "agent_id": active_agent_id})
+    _log_ingestion_stats(ingestion_stats)
         
     # Save to Short-Term History (session-scoped)
     _get_conversation_history(session_id, agent_id=active_agent_id).append({
@@ -733,6 +822,8 @@ async def chat(request: ChatRequest):
         "tools": tools_used_summary
     })
     print(f"DEBUG: Conversation History Updated. session_id={session_id} length={len(_get_conversation_history(session_id))}")
+    # Fold older turns into the running summary once the response is on its way
+    schedule_history_compaction(session_id, active_agent_id, current_settings)
         
     return ChatResponse(
         response=final_response,
@@ -742,7 +833,7 @@ async def chat(request: ChatRequest):
     )
 
 @router.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(request: ChatRequest, http_request: Request):
     """Real-time streaming endpoint with SSE"""
     print(f"[SSE] Endpoint called with message: {request.message[:50]}...")
     
@@ -754,6 +845,7 @@ async def chat_stream(request: ChatRequest):
                 return
 
             session_id = _get_session_id(request)
+            touch_session(session_id)
             user_message = request.message
 
             # Merge client-provided ephemeral state into server session state (best-effort)
@@ -782,7 +874,7 @@ async def chat_stream(request: ChatRequest):
             else:
                 active_agent = get_active_agent_data()
 
-            active_agent_id_for_session = active_agent.get("id", active_agent_id)
+            active_agent_id_for_session = active_agent.get("id", get_active_agent_id())
             agent_system_template = active_agent.get("system_prompt", NATIVE_TOOL_SYSTEM_PROMPT)
             print(f"DEBUG: 🎯 Active agent: id={active_agent.get('id')}, name={active_agent.get('name')}, allowed_tools={active_agent.get('tools', ['all'])}")
 
@@ -795,12 +887,18 @@ async def chat_stream(request: ChatRequest):
             # 2. Build System Prompt (from core.tools)
             system_prompt_text = build_system_prompt(
                 agent_system_template, tools_json, session_id,
-                _get_session_state, _server.memory_store, agent_id=active_agent_id_for_session
+                _get_session_state, _server.memory_store, agent_id=active_agent_id_for_session,
+                recent_tools_getter=_get_recent_tool_executions, session_context_getter=_get_prompt_context,
             )
 
             current_settings = load_settings()
             current_model = current_settings.get("model", "mistral")
             mode = current_settings.get("mode", "local")
+            deadline = request_deadline(current_settings)
+
+            # Memory ingestion policy: settings-wide overrides, then per-agent overrides
+            ingestion_overrides = merge_ingestion_overrides(current_settings, active_agent)
+            ingestion_stats: dict[str, int] = {}
 
             # LLM caller wrapper — delegates to the shared llm_providers module
             async def generate_response(
@@ -839,6 +937,10 @@ async def chat_stream(request: ChatRequest):
             async with httpx.AsyncClient() as client:
                 while current_turn < MAX_TURNS:
                     current_turn += 1
+                    if deadline.expired():
+                        print(f"⚠️ Request deadline ({deadline.seconds:.0f}s) exceeded, stopping ReAct loop")
+                        final_response = DEADLINE_RESPONSE
+                        break
                     
                     # Display turn number in terminal
                     print(f"\n{'#'*60}")
@@ -991,7 +1093,8 @@ async def chat_stream(request: ChatRequest):
                             
                             if _server.memory_store:
                                 try:
-                                    _server.memory_store.add_tool_execution(
+                                    await _record_tool_execution(
+                                        _server.memory_store, ingestion_stats, ingestion_overrides,
                                         session_id=session_id,
                                         tool_name=tool_name,
                                         tool_args={},
@@ -1011,7 +1114,7 @@ async def chat_stream(request: ChatRequest):
 
                         if tool_name == "clear_session_context":
                             scope = tool_args.get("scope", "transient") if isinstance(tool_args, dict) else "transient"
-                            cleared_keys = _clear_session_context(session_id, scope)
+                            cleared_keys = await _clear_session_context(session_id, scope)
                             
                             result = {
                                 "status": "success",
@@ -1025,7 +1128,8 @@ async def chat_stream(request: ChatRequest):
                             
                             if _server.memory_store:
                                 try:
-                                    _server.memory_store.add_tool_execution(
+                                    await _record_tool_execution(
+                                        _server.memory_store, ingestion_stats, ingestion_overrides,
                                         session_id=session_id,
                                         tool_name=tool_name,
                                         tool_args={"scope": scope},
@@ -1067,7 +1171,7 @@ async def chat_stream(request: ChatRequest):
                                 if not report_data:
                                     raise ValueError("No data found in report")
                                 
-                                result = _server.memory_store.embed_report_for_session(
+                                result = await _server.memory_store.aio.embed_report_for_session(
                                     session_id=session_id,
                                     report_data=report_data,
                                     report_type=report_type,
@@ -1114,7 +1218,7 @@ async def chat_stream(request: ChatRequest):
                                 if not isinstance(n_results, int):
                                     n_results = 3
                                 
-                                results = _server.memory_store.search_session_embeddings(
+                                results = await _server.memory_store.aio.search_session_embeddings(
                                     session_id=session_id,
                                     query=query,
                                     n_results=n_results
@@ -1182,7 +1286,10 @@ async def chat_stream(request: ChatRequest):
                                 if scope == "session":
                                     where = {"session_id": session_id}
 
-                                memories = _server.memory_store.query_memory(query, n_results=n_results, where=where)
+                                since, until = _parse_memory_time_range(tool_args)
+                                memories = await _server.memory_store.aio.query_memory(
+                                    query, n_results=n_results, where=where, since=since, until=until
+                                )
                                 raw_output = json.dumps({"memories": memories, "scope": scope})
 
                                 current_context_text += f"\nTool '{tool_name}' Output: {raw_output}\n"
@@ -1262,7 +1369,7 @@ async def chat_stream(request: ChatRequest):
                                 print(f"DEBUG: Session ID: {session_id}")
                                 
                                 # Search embedded report data
-                                results = _server.memory_store.search_embedded_report(
+                                results = await _server.memory_store.aio.search_embedded_report(
                                     session_id=session_id,
                                     query=query,
                                     n_results=n_results
@@ -1354,13 +1461,13 @@ async def chat_stream(request: ChatRequest):
                                                     filtered_resp[key] = json_resp[key]
                                             if filtered_resp:
                                                 json_resp = filtered_resp
-                                        raw_output = json.dumps(json_resp)
+                                        raw_output = ToolResult.from_value(json_resp)
                                     except Exception as e:
                                         print(f"DEBUG: Failed to parse JSON from {url}: {e}")
-                                        raw_output = resp.text
+                                        raw_output = ToolResult(resp.text)
                                         if not raw_output:
                                             print(f"DEBUG: ❌ Empty response from {tool_name} (Status: {resp.status_code})")
-                                            raw_output = json.dumps({"error": f"Empty response from tool {tool_name} (Status: {resp.status_code})"})
+                                            raw_output = ToolResult.from_value({"error": f"Empty response from tool {tool_name} (Status: {resp.status_code})"})
                                     
                                     # Debug logging for custom tool
                                     print(f"\n{'='*60}")
@@ -1382,7 +1489,7 @@ async def chat_stream(request: ChatRequest):
                                                 # Report tools: auto-embed via RAG (skip normal embedding)
                                                 print(f"DEBUG: ✅ REPORT TOOL DETECTED (STREAM) - Starting auto-embed for '{tool_name}'")
                                                 try:
-                                                    parsed_output = json.loads(raw_output)
+                                                    parsed_output = raw_output.value
                                                     print(f"DEBUG: Parsed report output type: {type(parsed_output)}")
                                                     
                                                     # Automatically embed each report + build context-safe output
@@ -1400,7 +1507,7 @@ async def chat_stream(request: ChatRequest):
                                                                 
                                                                 print(f"DEBUG: 📊 AUTO-EMBEDDING REPORT #{idx+1}: '{report_type}' with {len(report_data)} rows")
                                                                 
-                                                                embed_result = _server.memory_store.embed_report_for_session(
+                                                                embed_result = await _server.memory_store.aio.embed_report_for_session(
                                                                     session_id=session_id,
                                                                     report_data=report_data,
                                                                     report_type=report_type,
@@ -1416,14 +1523,14 @@ async def chat_stream(request: ChatRequest):
                                                                     ss["last_report_context"] = {
                                                                         "timestamp": time.time(),
                                                                         "type": report_type,
-                                                                        "row_count": len(report_data)
+                                                                        "row_count": len(report_data),
                                                                     }
                                                                     print(f"DEBUG: 💾 Saved report context to session state")
                                                                 except Exception as e:
                                                                     print(f"DEBUG: Error saving report context: {e}")
                                                                 
                                                                 # Check if this report is too large for context
-                                                                report_json_size = len(json.dumps(report_obj))
+                                                                report_json_size = raw_output.item_size(idx)
                                                                 if report_json_size > REPORT_SIZE_THRESHOLD:
                                                                     print(f"DEBUG: 📏 Report '{report_type}' is {report_json_size} chars — TOO LARGE for context. Sending summary instead.")
                                                                     summary = _server.memory_store.generate_report_summary(report_data, report_type)
@@ -1435,7 +1542,11 @@ async def chat_stream(request: ChatRequest):
                                                                 context_safe_reports.append(report_obj)
                                                         
                                                         # Replace raw_output with context-safe version
-                                                        raw_output = json.dumps(context_safe_reports)
+                                                        # Reports kept as-is reuse their text from the tool output; only summaries are serialized
+                                                        raw_output = ToolResult.from_items(context_safe_reports, [
+                                                            raw_output.item_raw(i) if item is parsed_output[i] else json.dumps(item)
+                                                            for i, item in enumerate(context_safe_reports)
+                                                        ])
                                                         print(f"DEBUG: 📦 Context-safe output size: {len(raw_output)} chars (threshold: {REPORT_SIZE_THRESHOLD})")
                                                     
                                                     print(f"DEBUG: 🎯 SKIPPED normal embedding for report tool '{tool_name}' (using RAG instead)")
@@ -1446,9 +1557,10 @@ async def chat_stream(request: ChatRequest):
                                                     traceback.print_exc()
                                             
                                             else:
-                                                # Normal tools: use standard embedding
-                                                print(f"DEBUG: Using normal embedding for non-report tool '{tool_name}'")
-                                                _server.memory_store.add_tool_execution(
+                                                # Normal tools: use the tool's ingestion policy
+                                                print(f"DEBUG: Using normal memory ingestion for non-report tool '{tool_name}'")
+                                                await _record_tool_execution(
+                                                    _server.memory_store, ingestion_stats, ingestion_overrides,
                                                     session_id=session_id,
                                                     tool_name=tool_name,
                                                     tool_args=tool_args,
@@ -1485,8 +1597,10 @@ async def chat_stream(request: ChatRequest):
                         session = _server.agent_sessions[agent_name]
                         
                         try:
-                            result = await session.call_tool(tool_name, tool_args)
-                            raw_output = result.content[0].text
+                            result = await call_tool_with_deadline(session, agent_name, tool_name, tool_args, deadline, current_settings)
+                            raw_output = read_tool_output(result)
+                            # Text for the prompt; ID extraction and memory keep the parsed raw_output
+                            prompt_output = raw_output
                             
                             # Debug logging for result
                             print(f"\n{'='*60}")
@@ -1495,7 +1609,7 @@ async def chat_stream(request: ChatRequest):
                             print(f"{'='*60}\n")
                             
                             try:
-                                parsed = json.loads(raw_output)
+                                parsed = raw_output.value
                                 if "error" in parsed and parsed["error"] == "auth_required":
                                     yield f"data: {json.dumps({'type': 'response', 'content': 'Authentication required.', 'intent': 'request_auth', 'data': parsed})}\n\n"
                                     yield f"data: {json.dumps({'type': 'done'})}\n\n"
@@ -1504,7 +1618,7 @@ async def chat_stream(request: ChatRequest):
                                 if tool_name == "get_recent_emails_content" and isinstance(parsed, dict) and "emails" in parsed:
                                     emails = parsed.get("emails", [])
                                     email_texts = [f"Email {i+1}:\nSubject: {e.get('subject', 'N/A')}\nFrom: {e.get('from', 'N/A')}\nDate: {e.get('date', 'N/A')}\nBody: {e.get('body', 'N/A')}" for i, e in enumerate(emails)]
-                                    raw_output = f"Here is the content of the {len(emails)} emails found. FAST AND CONCISELY Summarize them:\n" + "\n".join(email_texts)
+                                    prompt_output = f"Here is the content of the {len(emails)} emails found. FAST AND CONCISELY Summarize them:\n" + "\n".join(email_texts)
                                 
                                 if tool_name.startswith("list_") or tool_name.startswith("read_") or tool_name.startswith("create_") or tool_name == "draft_email" or tool_name == "send_email" or tool_name == "get_recent_emails_content":
                                     last_intent = tool_name
@@ -1525,14 +1639,15 @@ async def chat_stream(request: ChatRequest):
                             except:
                                 pass
 
-                            display_output = raw_output[:50000] + "...(truncated)" if len(raw_output) > 50000 else raw_output
+                            display_output = prompt_output[:50000] + "...(truncated)" if len(prompt_output) > 50000 else prompt_output
                             current_context_text += f"\nTool '{tool_name}' Output: {display_output}\n"
                             
                             _extract_and_persist_ids(session_id, tool_name, raw_output)
                             
                             if _server.memory_store:
                                 try:
-                                    _server.memory_store.add_tool_execution(
+                                    await _record_tool_execution(
+                                        _server.memory_store, ingestion_stats, ingestion_overrides,
                                         session_id=session_id,
                                         tool_name=tool_name,
                                         tool_args=tool_args,
@@ -1564,8 +1679,9 @@ async def chat_stream(request: ChatRequest):
 
             # Save to memory
             if _server.memory_store and final_response:
-                _server.memory_store.add_memory("user", user_message, metadata={"session_id": session_id, "agent_id": active_agent_id_for_session})
-                _server.memory_store.add_memory("assistant", final_response, metadata={"session_id": session_id, "agent_id": active_agent_id_for_session})
+                await _server.memory_store.aio.add_memory("user", user_message, metadata={"session_id": session_id, "agent_id": active_agent_id_for_session})
+                await _server.memory_store.aio.add_memory("assistant", final_response, metadata={"session_id": session_id, "agent_id": active_agent_id_for_session})
+            _log_ingestion_stats(ingestion_stats)
             
             # Save to short-term history
             _get_conversation_history(session_id, agent_id=active_agent_id_for_session).append({
@@ -1580,6 +1696,7 @@ async def chat_stream(request: ChatRequest):
             
             # Stream done event
             yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            schedule_history_compaction(session_id, active_agent_id_for_session, current_settings)
             
         except Exception as e:
             print(f"ERROR in SSE stream: {e}")
@@ -1589,7 +1706,7 @@ async def chat_stream(request: ChatRequest):
     
     
     return StreamingResponse(
-        event_generator(), 
+        stream_until_disconnect(http_request, event_generator()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -11,7 +11,11 @@ import httpx
 
 from core.config import load_settings
 from core.llm_providers import _make_aws_client, OLLAMA_BASE_URL
-from core.session import conversation_histories, session_state
+from core.session import (
+    conversation_histories, history_summaries, session_state, recent_tool_executions,
+    session_activity, session_context_meta, session_stats, evict_sessions, evict_session,
+)
+from core.history_compactor import history_compaction_stats
 from services.synthetic_data import generate_synthetic_data, SyntheticDataRequest, current_job, DATASETS_DIR
 
 router = APIRouter()
@@ -155,7 +159,11 @@ async def get_bedrock_inference_profiles():
 async def clear_recent_history():
     """Clears the short-term in-memory session history."""
     conversation_histories.clear()
+    history_summaries.clear()
     session_state.clear()
+    recent_tool_executions.clear()
+    session_activity.clear()
+    session_context_meta.clear()
     return {"status": "success", "message": "Recent session history (all sessions) cleared."}
 
 
@@ -165,9 +173,84 @@ async def clear_all_history():
     import core.server as _server
 
     conversation_histories.clear()
+    history_summaries.clear()
     session_state.clear()
+    recent_tool_executions.clear()
+    session_activity.clear()
+    session_context_meta.clear()
     if _server.memory_store:
-        success = _server.memory_store.clear_memory()
+        success = await _server.memory_store.aio.clear_memory()
         if not success:
             raise HTTPException(status_code=500, detail="Failed to clear long-term memory.")
     return {"status": "success", "message": "All history (Recent + Long-term) cleared."}
+
+
+@router.get("/api/memory/stats")
+async def get_memory_stats():
+    """Cumulative long-term memory ingestion counters, by policy."""
+    import core.server as _server
+    from core.memory_policy import INGEST_SKIP, INGEST_STORE
+    from core.memory_executor import get_memory_executor
+
+    store = _server.memory_store
+    if not store:
+        return {"enabled": False}
+    # Off the event loop: for a remote store these are blocking RPCs
+    ingestion = dict(await asyncio.to_thread(getattr, store, "ingestion_stats"))
+    stats = {
+        "enabled": True,
+        "ingestion": ingestion,
+        "embeddings_saved": ingestion.get(INGEST_STORE, 0) + ingestion.get(INGEST_SKIP, 0),
+        # Per-operation latency histograms of the async memory facade
+        "executor": get_memory_executor().stats(),
+    }
+    if getattr(store, "backend", None) == "remote":
+        # Store operations run in the memory service; its histograms are the interesting ones
+        stats["service"] = await asyncio.to_thread(store.service_stats)
+    return stats
+
+
+@router.get("/api/memory/reindex")
+async def get_memory_reindex_progress():
+    """Progress of the background re-embedding that follows an embedding model change."""
+    import core.server as _server
+
+    if not _server.memory_store:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(_server.memory_store.reindex_progress)}
+
+
+@router.post("/api/memory/reindex/resume")
+async def resume_memory_reindex():
+    """Restart a failed or interrupted re-index from its last checkpoint."""
+    import core.server as _server
+
+    if not _server.memory_store:
+        raise HTTPException(status_code=400, detail="Memory store is not initialized.")
+    if not await asyncio.to_thread(_server.memory_store.resume_reindex):
+        raise HTTPException(status_code=404, detail="No re-index in progress.")
+    return {"enabled": True, **await asyncio.to_thread(_server.memory_store.reindex_progress)}
+
+
+# --- Session Eviction ---
+
+@router.get("/api/sessions/stats")
+async def get_session_stats():
+    """Session count, approximate memory footprint, eviction and history compaction counters."""
+    stats = await asyncio.to_thread(session_stats)
+    stats["history_compaction"] = history_compaction_stats()
+    return stats
+
+
+@router.post("/api/sessions/evict")
+async def run_session_eviction():
+    """Run an eviction sweep now (normally every SESSION_EVICT_INTERVAL_S)."""
+    evicted = await asyncio.to_thread(evict_sessions)
+    return {"status": "success", "evicted": [{"session_id": sid, "reason": reason} for sid, reason in evicted]}
+
+
+@router.delete("/api/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """Evict one session: short-term state plus its session-scoped RAG collections."""
+    await asyncio.to_thread(evict_session, session_id)
+    return {"status": "success", "session_id": session_id}
@@ -3,7 +3,8 @@ Settings, personal details, Google Maps, and config endpoints.
 """
 import os
 import json
-from typing import Optional, Tuple
+import asyncio
+from typing import Callable, Optional, Tuple
 from urllib.parse import quote
 
 from fastapi import APIRouter, HTTPException, Request
@@ -28,13 +29,23 @@ def save_settings(settings: dict):
         json.dump(settings, f, indent=4)
 
 
-def _init_memory_store(settings: dict):
-    """Initialize the long-term memory store with an embedding provider consistent with settings."""
-    try:
-        from core.memory import MemoryStore as _MemoryStore
-    except ImportError:
-        return None
+# Settings that determine the embedding provider. Changing any of them swaps the
+# embedder of the live MemoryStore in place.
+EMBEDDING_SETTINGS_KEYS = (
+    "mode", "model", "embedding_model", "aws_region",
+    "bedrock_api_key", "aws_access_key_id", "aws_secret_access_key", "aws_session_token",
+)
+# Settings that determine the storage client. Changing any of them re-creates the MemoryStore.
+# (vector_compression is applied in place: only collections created afterwards use it.)
+STORAGE_SETTINGS_KEYS = ("vector_backend", "memory_service_url")
+
+
+def _settings_signature(settings: dict, keys: tuple) -> str:
+    return json.dumps({k: settings.get(k) for k in keys}, sort_keys=True, default=str)
 
+
+def _build_embedder(settings: dict) -> Tuple[str, Optional[Callable[[str], Optional[list]]]]:
+    """Return (ollama model, embed_fn) for the configured mode. embed_fn None means Ollama."""
     mode = (settings.get("mode") or "local").strip().lower()
     model = (settings.get("model") or OLLAMA_MODEL).strip() or OLLAMA_MODEL
 
@@ -45,9 +56,13 @@ def _init_memory_store(settings: dict):
     if mode == "bedrock":
         region = (settings.get("aws_region") or "us-east-1").strip() or "us-east-1"
         embed_model_id = (settings.get("embedding_model") or "amazon.titan-embed-text-v2:0").strip()
+        # One boto3 client per embedder (clients are thread-safe); a settings change builds a new embedder
+        client_cache = {}
 
         def _bedrock_embed(text: str):
-            bedrock = _make_aws_client("bedrock-runtime", region, settings)
+            bedrock = client_cache.get("client")
+            if bedrock is None:
+                bedrock = client_cache["client"] = _make_aws_client("bedrock-runtime", region, settings)
             payload = {"inputText": text}
             resp = bedrock.invoke_model(
                 modelId=embed_model_id,
@@ -62,7 +77,76 @@ def _init_memory_store(settings: dict):
 
         embed_fn = _bedrock_embed
 
-    return _MemoryStore(model=model, embed_fn=embed_fn)
+    return model, embed_fn
+
+
+def _embedding_space(settings: dict) -> str:
+    """Identify the vector space embeddings live in; a change triggers a memory re-index."""
+    mode = (settings.get("mode") or "local").strip().lower()
+    if mode == "bedrock":
+        return f"bedrock:{(settings.get('embedding_model') or 'amazon.titan-embed-text-v2:0').strip()}"
+    return f"ollama:{(settings.get('model') or OLLAMA_MODEL).strip() or OLLAMA_MODEL}"
+
+
+def _init_memory_store(settings: dict, storage_path: Optional[str] = None):
+    """Initialize the long-term memory store with an embedding provider consistent with settings.
+
+    storage_path overrides the default data/ location (tests, tooling).
+    """
+    try:
+        from core.memory import MemoryStore as _MemoryStore
+    except ImportError:
+        return None
+
+    service_url = (settings.get("memory_service_url") or "").strip()
+    if service_url:
+        # A separate process (core.memory_service) owns the store and the embedder
+        from core.memory_client import RemoteMemoryStore
+
+        store = RemoteMemoryStore(service_url)
+        store.embedding_signature = _settings_signature(settings, EMBEDDING_SETTINGS_KEYS)
+        store.storage_signature = _settings_signature(settings, STORAGE_SETTINGS_KEYS)
+        store.reload_settings()  # Pick up settings saved while it was running
+        return store
+
+    model, embed_fn = _build_embedder(settings)
+    backend = (settings.get("vector_backend") or "chroma").strip().lower()
+    compression = settings.get("vector_compression") or None
+    location = {"storage_path": storage_path} if storage_path else {}
+    store = _MemoryStore(model=model, embed_fn=embed_fn, backend=backend, compression=compression, **location)
+    store.embedding_signature = _settings_signature(settings, EMBEDDING_SETTINGS_KEYS)
+    store.storage_signature = _settings_signature(settings, STORAGE_SETTINGS_KEYS)
+    # Resumes an interrupted re-index, or starts one if settings changed while we were down
+    store.bind_embedding_space(_embedding_space(settings))
+    return store
+
+
+def _refresh_memory_store(store, settings: dict, storage_path: Optional[str] = None):
+    """
+    Bring the memory store in line with new settings.
+
+    Only a storage change (backend/memory service) builds a new MemoryStore;
+    the old one is closed first so it never writes next to its replacement.
+    A provider change swaps the embedder of the existing store, so the vector
+    store client, blob store and counters stay warm and requests already
+    holding the store see the new embedder. A compression change applies to
+    collections created from then on. Anything else is a no-op.
+    """
+    if store is None or store.storage_signature != _settings_signature(settings, STORAGE_SETTINGS_KEYS):
+        if store is not None:
+            store.close()
+        return _init_memory_store(settings, storage_path)
+
+    store.set_compression(settings.get("vector_compression") or None)
+
+    signature = _settings_signature(settings, EMBEDDING_SETTINGS_KEYS)
+    if store.embedding_signature != signature:
+        model, embed_fn = _build_embedder(settings)
+        store.set_embedder(model, embed_fn, signature=signature)
+        print(f"DEBUG: Swapped memory embedder (model {model}, {'bedrock' if embed_fn else 'ollama'})")
+        # A new embedding model re-indexes chat_history in the background
+        store.bind_embedding_space(_embedding_space(settings))
+    return store
 
 
 def _normalize_point(address: Optional[str], lat: Optional[float], lng: Optional[float]) -> Tuple[str, dict]:
@@ -91,7 +175,7 @@ def _build_directions_url(origin: str, destination: str, travel_mode: str) -> st
 
 @router.get("/api/status")
 async def get_status():
-    from core.routes.agents import load_user_agents, active_agent_id
+    from core.routes.agents import load_user_agents, get_active_agent_id
 
     user_agents = load_user_agents()
     agents_status = {}
@@ -102,7 +186,7 @@ async def get_status():
 
     return {
         "agents": agents_status,
-        "active_agent_id": active_agent_id,
+        "active_agent_id": get_active_agent_id(),
         "overall": "operational",
         "model": current_settings.get("model", "mistral"),
         "mode": current_settings.get("mode", "local")
@@ -132,7 +216,8 @@ async def update_settings(settings: Settings):
 
     save_settings(data)
 
-    # Reinitialize memory so embeddings provider matches the new mode.
+    # Keep memory in line with the new settings: swap the embedder in place when the
+    # provider changed, rebuild the store only when its storage settings changed.
     import core.server as _server
     try:
         from core.memory import MemoryStore as _MemoryStore
@@ -141,9 +226,10 @@ async def update_settings(settings: Settings):
     
     if _MemoryStore:
         try:
-            _server.memory_store = _init_memory_store(data)
+            # Off the event loop: may build a store, load an embedder or call the memory service
+            _server.memory_store = await asyncio.to_thread(_refresh_memory_store, _server.memory_store, data)
         except Exception as e:
-            print(f"Warning: failed to reinitialize MemoryStore after settings update: {e}")
+            print(f"Warning: failed to refresh MemoryStore after settings update: {e}")
     return data
 
 
@@ -96,6 +96,30 @@ async def delete_custom_tool(tool_name: str):
     return {"status": "success"}
 
 
+# --- Startup ---
+
+@router.get("/api/startup/timeline")
+async def get_startup_timeline():
+    """Per-server startup phases (spawn, initialize, list_tools) from the last server start."""
+    import core.server as _server
+    if not _server.startup_timeline:
+        return {"started_at": None, "total_ms": None, "servers": []}
+    return _server.startup_timeline.snapshot()
+
+
+@router.get("/api/agents/processes")
+async def get_agent_processes():
+    """Native agent processes: running or not, spawns, calls, idle shutdowns; per-worker load and queue depth for pools."""
+    import core.server as _server
+    from core.agent_pool import AgentPool
+    processes = {name: agent.status() for name, agent in _server.agent_connections.items()}
+    if _server.mcp_manager:
+        for name, connection in _server.mcp_manager.connections.items():
+            if isinstance(connection, AgentPool):
+                processes[f"ext_mcp_{name}"] = connection.status()
+    return processes
+
+
 # --- External MCP Server Management ---
 
 @router.get("/api/mcp/servers")
@@ -112,7 +136,9 @@ async def add_mcp_server(req: AddMCPServerRequest):
     if not _server.mcp_manager:
         raise HTTPException(status_code=500, detail="MCP Manager not initialized")
     try:
-        config = await _server.mcp_manager.add_server(req.name, req.command, req.args, req.env)
+        config = await _server.mcp_manager.add_server(
+            req.name, req.command, req.args, req.env, url=req.url, transport=req.transport, headers=req.headers,
+        )
         # Register the new session and tools immediately
         session = _server.mcp_manager.sessions.get(req.name)
         if session:
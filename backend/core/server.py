@@ -1,11 +1,11 @@
 import os
 import sys
+import asyncio
 from typing import Optional
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
 
 try:
     from core.memory import MemoryStore
@@ -13,9 +13,16 @@ except ImportError:
     print("Warning: MemoryStore dependencies not found. Memory disabled.")
     MemoryStore = None
 
-from core.mcp_client import MCPClientManager
+from core.mcp_client import MCPClientManager, StartupTimeline
+from core.lazy_agent import LazyAgentSession
+from core.inprocess_agent import InProcessAgentSession, IN_PROCESS_AGENTS
+from core.agent_pool import AgentPool
+from core.payloads import PAYLOADS_DIR, PAYLOAD_DIR_ENV, sweep_payloads
+from core.forkserver import ForkServer, FORKSERVER_PRELOAD, fork_server_supported
 from core.config import load_settings
 from core.routes.settings import _init_memory_store
+from core.memory_executor import shutdown_memory_executor
+from core.session import session_janitor, configure_session_store, close_session_store
 
 # Route routers
 from core.routes.auth import router as auth_router
@@ -46,12 +53,43 @@ AGENTS = {
     "xlsx_parser": os.path.join(os.path.dirname(os.path.dirname(__file__)), "agents", "xlsx_parser.py"),
 }
 
+# Worker processes per agent, for agents whose tools block for seconds (overridable with settings.agent_workers).
+# Extra workers are spawned only while the running ones are busy.
+AGENT_WORKERS = {
+    "browser": 2,
+    "pdf_parser": 2,
+}
+
 # Global variables
-agent_sessions: dict[str, ClientSession] = {}  # Map of client_name -> session
+agent_sessions: dict[str, ClientSession] = {}  # Map of client_name -> session (LazyAgentSession for native agents)
 tool_router: dict[str, str] = {}                # Map of tool_name -> client_name
 exit_stack = None
 memory_store = None
 mcp_manager: Optional[MCPClientManager] = None
+agent_connections: dict[str, LazyAgentSession | InProcessAgentSession | AgentPool] = {}  # Native agents
+startup_timeline: Optional[StartupTimeline] = None
+fork_server: Optional[ForkServer] = None         # Set when settings.agent_fork_server is on
+
+
+def _agent_env() -> dict:
+    # Prepare environment with PYTHONPATH specifically pointing to backend root
+    # This is crucial so agents can assume 'services' and 'core' are importable
+    env = os.environ.copy()
+    backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = backend_root + os.pathsep + env.get("PYTHONPATH", "")
+    # Large tool outputs come back through files on this host (see core.payloads)
+    env[PAYLOAD_DIR_ENV] = PAYLOADS_DIR
+    return env
+
+
+def _agent_server_params(script_path: str) -> StdioServerParameters:
+    # With the fork server, the command is a small launcher that has the agent forked from it
+    return StdioServerParameters(
+        command=sys.executable,
+        args=fork_server.launcher_args(script_path) if fork_server else [script_path],
+        env=_agent_env()
+    )
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -61,65 +99,105 @@ async def lifespan(app: FastAPI):
     from contextlib import AsyncExitStack
     exit_stack = AsyncExitStack()
     
+    global startup_timeline, mcp_manager, memory_store, fork_server
+    startup_timeline = StartupTimeline()
+    swept = sweep_payloads()
+    if swept:
+        print(f"DEBUG: Removed {swept} stale tool payload files")
     try:
+        # Every agent and external server connects concurrently, each with its own
+        # timeout; one slow or broken server no longer holds up (or aborts) the rest.
+        # Agents with a current tool manifest are not spawned until first used.
+        settings = load_settings()
+        configure_session_store(settings)
+        idle_shutdown_s = float(settings.get("agent_idle_shutdown_min") or 0) * 60
+        in_process = set(settings.get("in_process_agents", IN_PROCESS_AGENTS) or ())
+        agent_workers = {**AGENT_WORKERS, **(settings.get("agent_workers") or {})}
+        if settings.get("agent_fork_server") and fork_server_supported():
+            # Preloads while the API keeps starting; launchers wait for its socket
+            fork_server = ForkServer(
+                preload=[*FORKSERVER_PRELOAD, *(settings.get("agent_fork_server_preload") or [])], env=_agent_env(),
+            )
+            fork_server.start()
+            exit_stack.callback(fork_server.stop)  # Registered first, so it stops after the agents
+        elif settings.get("agent_fork_server"):
+            print("WARNING: agent_fork_server needs os.fork and Unix sockets; spawning agents directly")
         for agent_name, script_path in AGENTS.items():
+            if agent_name in in_process:
+                print(f"Loading {agent_name} agent in-process from {script_path}...")
+                agent_connections[agent_name] = InProcessAgentSession(
+                    agent_name, script_path,
+                    timeline=startup_timeline.server(agent_name, "in_process"), clock=startup_timeline,
+                )
+                continue
             print(f"Connecting to {agent_name} agent at {script_path}...")
-            
-            # Prepare environment with PYTHONPATH specifically pointing to backend root
-            # This is crucial so agents can assume 'services' and 'core' are importable
-            env = os.environ.copy()
-            backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            env["PYTHONPATH"] = backend_root + os.pathsep + env.get("PYTHONPATH", "")
-
-            server_params = StdioServerParameters(
-                command=sys.executable,
-                args=[script_path],
-                env=env
-            )
-            
-            read, write = await exit_stack.enter_async_context(stdio_client(server_params))
-            session = await exit_stack.enter_async_context(ClientSession(read, write))
-            await session.initialize()
-            
-            agent_sessions[agent_name] = session
-            
-            # Register tools
-            tools = await session.list_tools()
-            for tool in tools.tools:
+            workers = [
+                LazyAgentSession(
+                    agent_name, script_path, _agent_server_params(script_path),
+                    lazy=settings.get("lazy_agents", True), idle_shutdown_s=idle_shutdown_s,
+                    timeline=startup_timeline.server(agent_name if i == 0 else f"{agent_name}#{i + 1}", "native"),
+                    clock=startup_timeline,
+                )
+                for i in range(max(1, int(agent_workers.get(agent_name, 1))))
+            ]
+            agent_connections[agent_name] = workers[0] if len(workers) == 1 else AgentPool(agent_name, workers)
+            exit_stack.push_async_callback(agent_connections[agent_name].stop)
+
+        mcp_manager = MCPClientManager(exit_stack, startup_timeline)
+        print("Connecting to external MCP servers...")
+
+        # Initialize Memory Store (blocking; overlaps with the agent processes starting)
+        memory_init = None
+        if MemoryStore:
+            print("Initializing Memory Store...")
+            memory_entry = startup_timeline.server("memory_store", "store")
+            memory_entry["start_ms"] = startup_timeline.elapsed_ms()
+            memory_init = asyncio.to_thread(_init_memory_store, settings)
+
+        results = await asyncio.gather(
+            *(agent.prepare() for agent in agent_connections.values()),
+            mcp_manager.connect_all(),
+            *([memory_init] if memory_init else []),
+            return_exceptions=True,
+        )
+
+        if memory_init:
+            started = memory_entry["start_ms"]
+            if isinstance(results[-1], BaseException):
+                print(f"Error initializing Memory Store: {results[-1]}")
+                memory_entry.update(status="failed", error=str(results[-1]))
+            else:
+                memory_store = results[-1]
+                memory_entry["status"] = "ready"
+            memory_entry["total_ms"] = round(startup_timeline.elapsed_ms() - started, 1)
+
+        # Register tools in AGENTS order, so name collisions resolve as before
+        for agent_name, agent in agent_connections.items():
+            if not agent.tools:
+                print(f"Error connecting to {agent_name} agent: {agent.error}")
+                continue
+            agent_sessions[agent_name] = agent
+            for tool in agent.tools:
                 tool_router[tool.name] = agent_name
                 print(f"  Registered tool: {tool.name} -> {agent_name}")
 
-        # --- Initialize External MCP Servers ---
-        global mcp_manager
-        mcp_manager = MCPClientManager(exit_stack)
-        print("Connecting to external MCP servers...")
-        external_sessions = await mcp_manager.connect_all()
-        
-        for name, session in external_sessions.items():
+        for name, connection in mcp_manager.connections.items():
             # Prefix to avoid collision with internal agents
             agent_key = f"ext_mcp_{name}"
-            agent_sessions[agent_key] = session
+            agent_sessions[agent_key] = connection
             print(f"Connected external MCP server: {name}")
-            
-            try:
-                tools = await session.list_tools()
-                print(f"  MCP Server '{name}' returned {len(tools.tools)} tools.")
-                for tool in tools.tools:
-                    tool_router[tool.name] = agent_key
-                    print(f"  Registered external tool: {tool.name} -> {agent_key}")
-            except Exception as e:
-                print(f"  Error listing tools for {name}: {e}")
-                import traceback
-                traceback.print_exc()
-                
-        # Initialize Memory Store
-        if MemoryStore:
-            print("Initializing Memory Store...")
-            global memory_store
-            memory_store = _init_memory_store(load_settings())
-        
-        print("All agents connected.")
-        yield
+            print(f"  MCP Server '{name}' returned {len(connection.tools)} tools.")
+            for tool in connection.tools:
+                tool_router[tool.name] = agent_key
+                print(f"  Registered external tool: {tool.name} -> {agent_key}")
+
+        startup_timeline.finish()
+        print(f"All agents connected ({len(agent_sessions)} servers in {startup_timeline.finished_ms:.0f} ms).")
+        janitor = asyncio.create_task(session_janitor())
+        try:
+            yield
+        finally:
+            janitor.cancel()
         
     except Exception as e:
         print(f"Error starting agents: {e}")
@@ -128,6 +206,8 @@ async def lifespan(app: FastAPI):
         print("Shutting down agents...")
         if exit_stack:
             await exit_stack.aclose()
+        shutdown_memory_executor()
+        close_session_store()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -3,31 +3,208 @@ Session and conversation state management.
 Extracted from server.py for better readability.
 """
 import json
+import time
+import asyncio
+import threading
 from typing import Any
-from collections import deque
 
+from core.config import load_settings
 from core.models import ChatRequest
+from core.memory_policy import summarize_tool_execution
+from core.tool_result import ToolResult
+from core.session_store import InMemorySessionStore, SessionStore, create_session_store
 
 
-# Session-scoped short-term history/state. We intentionally do NOT persist these across reloads;
-# the frontend should create a new session_id on page load.
-conversation_histories: dict[str, deque] = {}
-session_state: dict[str, dict[str, Any]] = {}
+# Session-scoped short-term history/state. The frontend creates a new session_id on page load.
+# Storage is pluggable (core.session_store): process-local by default (journaled
+# to data/session_snapshots/ so a server restart keeps open sessions, see
+# settings.session_snapshots), or a shared SQLite file when running several
+# workers (settings.session_store). The server configures the store from
+# settings at startup; until then (scripts, tests) sessions live in memory
+# only and nothing is written to disk.
+#
+# Prompts replay the last HISTORY_VERBATIM_TURNS turns verbatim, within
+# HISTORY_TOKEN_BUDGET. Older turns are folded into a running summary by
+# core.history_compactor after the response is sent. HISTORY_MAX_TURNS is
+# only a safety cap for when summarization keeps failing.
+HISTORY_MAX_TURNS = 50
+HISTORY_VERBATIM_TURNS = 4
+HISTORY_TOKEN_BUDGET = 1500  # Approximate tokens (chars / 4) of verbatim history per prompt
+
+# Ordered ring buffer of the latest tool executions per (agent, session).
+# Feeds the "RECENT TOOL EXECUTIONS" prompt section without a vector-store
+# query; Chroma keeps the durable long-term copy.
+RECENT_TOOL_EXECUTIONS_MAX = 5
+RECENT_TOOL_OUTPUT_CHARS = 4000  # Larger outputs are replaced by a structural summary
+
+# Eviction defaults; override per key with settings.session_eviction
+SESSION_IDLE_TTL_S = 2 * 3600            # Drop sessions not seen for this long (0 = never)
+SESSION_MAX_COUNT = 500                  # Keep at most this many sessions (LRU beyond it)
+SESSION_MAX_BYTES = 64 * 1024 * 1024     # Approximate serialized size budget across all sessions
+SESSION_EVICT_INTERVAL_S = 60
+SESSION_EVICT_GRACE_S = 60               # Never evict for count/bytes a session seen this recently
+SESSION_NAMESPACES = ("history", "history_summary", "state", "recent_tools", "context_meta")
+
+# Session context injected into the system prompt. Tool arguments and *_id
+# fields accumulate in session_state; only the best SESSION_CONTEXT_MAX_KEYS
+# (ranked by recency, boosted by use) are kept, and keys untouched for
+# SESSION_CONTEXT_TTL_S are dropped. Pinned keys are never evicted.
+SESSION_CONTEXT_MAX_KEYS = 16
+SESSION_CONTEXT_TTL_S = 30 * 60
+SESSION_CONTEXT_USE_BONUS_S = 60         # Each use ranks a key like being set a minute later
+SESSION_CONTEXT_VALUE_CHARS = 200        # Longer values are truncated in the prompt
+SESSION_CONTEXT_PINNED_KEYS = {"facility_id", "location", "personal_details", "last_report_context"}
+SESSION_CONTEXT_INTERNAL_KEYS = {"last_report_context"}  # Stored, but injected by its own prompt section
+
+_session_store: SessionStore | None = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            # Not configured (see configure_session_store): in memory, no snapshot journal
+            _session_store = InMemorySessionStore()
+        return _session_store
+
+
+def configure_session_store(settings: dict | None = None) -> SessionStore:
+    """Create the session store settings ask for (server startup); replaces any store in use."""
+    settings = load_settings() if settings is None else settings
+    store = create_session_store(
+        settings.get("session_store") or "memory",
+        snapshots=bool(settings.get("session_snapshots", True)),
+    )
+    set_session_store(store)
+    return store
+
+
+def close_session_store():
+    """Flush and release the session store (server shutdown)."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is not None:
+            _session_store.close()
+            _session_store = None
+
+
+def set_session_store(store: SessionStore):
+    """Replace the session store (tests, or a backend change without restart)."""
+    global _session_store
+    with _session_store_lock:
+        _session_store = store
+
+
+class SessionNamespace:
+    """Handle on one namespace of the session store (e.g. to clear all histories)."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    def clear(self):
+        get_session_store().clear(self.namespace)
+
+    def keys(self) -> list[str]:
+        return get_session_store().keys(self.namespace)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+
+class SessionDict(dict):
+    """Snapshot of a stored dict; every mutation is also written through atomically."""
+
+    def __init__(self, namespace: str, key: str, data: dict):
+        super().__init__(data or {})
+        self._namespace = namespace
+        self._key = key
+
+    def _persist(self, fn):
+        get_session_store().update(self._namespace, self._key, fn, default={})
+
+    def __setitem__(self, k, v):
+        super().__setitem__(k, v)
+        self._persist(lambda d: {**d, k: v})
+
+    def __delitem__(self, k):
+        super().__delitem__(k)
+        self._persist(lambda d: {kk: vv for kk, vv in d.items() if kk != k})
+
+    def pop(self, k, *default):
+        value = super().pop(k, *default)
+        self._persist(lambda d: {kk: vv for kk, vv in d.items() if kk != k})
+        return value
+
+    def setdefault(self, k, default=None):
+        if k not in self:
+            self[k] = default
+        return self[k]
+
+    def update(self, *args, **kwargs):
+        changes = dict(*args, **kwargs)
+        super().update(changes)
+        self._persist(lambda d: {**d, **changes})
+
+    def clear(self):
+        super().clear()
+        self._persist(lambda d: {})
+
+
+class SessionList(list):
+    """Snapshot of a stored bounded list (oldest first); append writes through atomically."""
+
+    def __init__(self, namespace: str, key: str, data: list, maxlen: int):
+        super().__init__((data or [])[-maxlen:])
+        self._namespace = namespace
+        self._key = key
+        self.maxlen = maxlen
+
+    def append(self, item):
+        super().append(item)
+        del self[:-self.maxlen]
+        maxlen = self.maxlen
+        get_session_store().update(self._namespace, self._key, lambda l: (l + [item])[-maxlen:], default=[])
+
+
+# Namespace handles, e.g. conversation_histories.clear()
+conversation_histories = SessionNamespace("history")
+history_summaries = SessionNamespace("history_summary")
+session_state = SessionNamespace("state")
+recent_tool_executions = SessionNamespace("recent_tools")
+session_activity = SessionNamespace("activity")
+session_context_meta = SessionNamespace("context_meta")
 
 
 def _get_session_id(request: ChatRequest) -> str:
     return request.session_id or "default"
 
-def _get_conversation_history(session_id: str, agent_id: str = None) -> deque:
+def _get_conversation_history(session_id: str, agent_id: str = None) -> SessionList:
+    key = _history_key(session_id, agent_id)
+    return SessionList("history", key, get_session_store().get("history", key, []), HISTORY_MAX_TURNS)
+
+def _get_session_state(session_id: str) -> SessionDict:
+    return SessionDict("state", session_id, get_session_store().get("state", session_id, {}))
+
+def _get_recent_tool_executions(session_id: str, agent_id: str = None) -> SessionList:
     key = f"{agent_id}_{session_id}" if agent_id else session_id
-    if key not in conversation_histories:
-        conversation_histories[key] = deque(maxlen=10)
-    return conversation_histories[key]
+    return SessionList("recent_tools", key, get_session_store().get("recent_tools", key, []), RECENT_TOOL_EXECUTIONS_MAX)
 
-def _get_session_state(session_id: str) -> dict[str, Any]:
-    if session_id not in session_state:
-        session_state[session_id] = {}
-    return session_state[session_id]
+def _record_recent_tool_execution(session_id: str, tool_name: str, tool_args: Any,
+                                  tool_output: str | ToolResult, agent_id: str = None):
+    """Append a tool execution to the session's ring buffer (oldest entry drops off)."""
+    if len(tool_output) > RECENT_TOOL_OUTPUT_CHARS:
+        document = summarize_tool_execution(tool_name, tool_args, tool_output)
+    else:
+        document = f"Tool: {tool_name}\nArguments: {json.dumps(tool_args, default=str)}\nOutput: {tool_output}"
+    _get_recent_tool_executions(session_id, agent_id).append({
+        "tool_name": tool_name,
+        "timestamp": time.time(),
+        "document": document,
+    })
 
 
 def _apply_sticky_args(session_id: str, tool_name: str, tool_args: Any, tool_schema: dict | None = None) -> Any:
@@ -48,17 +225,16 @@ def _apply_sticky_args(session_id: str, tool_name: str, tool_args: Any, tool_sch
     # The LLM gets context via system prompt injection instead
     
     # Keep args in session for tracking (but don't auto-inject)
-    ss = _get_session_state(session_id)
-    for k, v in tool_args.items():
-        if v and isinstance(v, (str, int, float, bool)):
-            ss[k] = v
+    scalars = {k: v for k, v in tool_args.items() if v and isinstance(v, (str, int, float, bool))}
+    if scalars:
+        _track_context_keys(session_id, list(scalars), values=scalars)
 
     return tool_args
 
 
 
 
-def _clear_session_context(session_id: str, scope: str = "transient") -> list:
+async def _clear_session_context(session_id: str, scope: str = "transient") -> list:
     """
     Clear session state based on scope.
     
@@ -81,7 +257,8 @@ def _clear_session_context(session_id: str, scope: str = "transient") -> list:
         print(f"DEBUG: Cleared ALL session context: {cleared}")
         
         # NEW: Clear session-scoped embeddings
-        memory_store.clear_session_embeddings(session_id)
+        if memory_store:
+            await memory_store.aio.clear_session_embeddings(session_id)
         cleared.append("session_embeddings")
         
     elif scope == "transient":
@@ -94,7 +271,8 @@ def _clear_session_context(session_id: str, scope: str = "transient") -> list:
         print(f"DEBUG: Cleared TRANSIENT session context: {cleared}")
         
         # NEW: Also clear session embeddings on transient cleanup
-        memory_store.clear_session_embeddings(session_id)
+        if memory_store:
+            await memory_store.aio.clear_session_embeddings(session_id)
         cleared.append("session_embeddings")
         
     elif scope == "ids_only":
@@ -110,63 +288,348 @@ def _clear_session_context(session_id: str, scope: str = "transient") -> list:
     return cleared
 
 
-def _extract_and_persist_ids(session_id: str, tool_name: str, tool_output: str):
+def _extract_and_persist_ids(session_id: str, tool_name: str, tool_output: str | ToolResult):
     """
     Extract IDs from tool output and persist to session state.
-    ID-AGNOSTIC: Automatically detects any field ending with '_id' or 'Id'.
-    Works for any agent/tool without hardcoded mappings.
+    ID-AGNOSTIC: Automatically detects any field ending with '_id' or 'Id'
+    (see ToolResult.ids). Works for any agent/tool without hardcoded mappings.
     """
     try:
-        parsed = json.loads(tool_output)
-        
-        ss = _get_session_state(session_id)
-        
-        def _extract_ids_recursive(data: Any, prefix: str = ""):
-            """Recursively extract ID fields from nested dictionaries and lists."""
-            
-            if isinstance(data, dict):
-                for key, value in data.items():
-                    # Check if this looks like an ID field
-                    is_id_field = (
-                        key.endswith("_id") or 
-                        key.endswith("Id") or 
-                        key.lower() in ["id", "uuid"]
-                    )
-                    
-                    if is_id_field and value is not None and value != "":
-                        # Store with original key (not prefixed) for easy access
-                        # We overwrite previous values, which effectively means "last seen ID wins"
-                        ss[key] = value
-                        print(f"DEBUG: Persisted {key}={value} to session state (from tool: {tool_name})")
-                    
-                    # Recurse into nested dicts
-                    elif isinstance(value, (dict, list)):
-                        _extract_ids_recursive(value, prefix=key)
-            
-            elif isinstance(data, list):
-                # If list has items, verify they are dicts or lists
-                # We prioritize the FIRST item for ID extraction if it's a single item list
-                # Or if it's a list of results, the first result usually contains the relevant context ID
-                if len(data) > 0:
-                    # Strategy: Always extract from the FIRST item deeply
-                    # This ensures if we get [Obj1, Obj2], we at least get Obj1's IDs.
-                    # This matches "Single Item Array" requirement perfectly.
-                    if isinstance(data[0], (dict, list)):
-                         _extract_ids_recursive(data[0], prefix=f"{prefix}[0]")
-
-        _extract_ids_recursive(parsed)
+        output = ToolResult.of(tool_output)
+        output.value  # Not JSON: report it like before
+        found = output.ids
+        for key, value in found.items():
+            print(f"DEBUG: Persisted {key}={value} to session state (from tool: {tool_name})")
+        if found:
+            _track_context_keys(session_id, list(found), values=found)
         
     except Exception as e:
         print(f"DEBUG: Could not extract IDs from tool output: {e}")
 
 
+# --- Bounded session context ---
+
+# Bytes each system prompt section added, across all turns in this process
+context_injection_stats = {"turns": 0, "sections": {}}
+_context_stats_lock = threading.Lock()
+
+
+def _context_score(entry, now: float) -> float:
+    last_set, uses = entry if entry else (now, 0)
+    return last_set + SESSION_CONTEXT_USE_BONUS_S * min(uses, 10)
+
+
+def _track_context_keys(session_id: str, keys: list, now: float | None = None, values: dict | None = None):
+    """
+    Record that keys were set/used this turn, then enforce the session's context budget.
+    `values` are stored into the session state first. State and context_meta
+    are read and written in one store transaction.
+    """
+    now = now or time.time()
+    state_key, meta_key = ("state", session_id), ("context_meta", session_id)
+    dropped: list[tuple[set, set]] = []
+
+    def apply(current):
+        state = {**(current[state_key] or {}), **(values or {})}
+        meta = {k: m for k, m in (current[meta_key] or {}).items() if k in state}
+        for k in state:
+            meta.setdefault(k, [now, 0])  # Keys set elsewhere start their clock when first seen
+        for k in keys:
+            meta[k] = [now, meta.get(k, [now, 0])[1] + 1]
+
+        managed = [k for k in state if k not in SESSION_CONTEXT_PINNED_KEYS]
+        stale = {k for k in managed if now - meta[k][0] > SESSION_CONTEXT_TTL_S}
+        ranked = sorted((k for k in managed if k not in stale), key=lambda k: _context_score(meta[k], now), reverse=True)
+        drop = stale | set(ranked[SESSION_CONTEXT_MAX_KEYS:])
+        dropped[:] = [(drop, stale)]
+        written = {meta_key: {k: m for k, m in meta.items() if k not in drop}}
+        if values or drop:
+            written[state_key] = {k: v for k, v in state.items() if k not in drop}
+        return written
+
+    get_session_store().update_many([state_key, meta_key], apply, {state_key: {}, meta_key: {}})
+    drop, stale = dropped[0]
+    if drop:
+        print(f"DEBUG: Evicted session context keys {sorted(drop)} ({len(stale & drop)} stale)")
+
+
+def _get_prompt_context(session_id: str, now: float | None = None) -> dict:
+    """
+    Session context for the system prompt: pinned keys first, then the best
+    ranked keys within budget. Stale keys are skipped even before the next
+    write evicts them; long values are truncated.
+    """
+    now = now or time.time()
+    store = get_session_store()
+    state = store.get("state", session_id, {}) or {}
+    meta = store.get("context_meta", session_id, {}) or {}
+
+    pinned = [k for k in state if k in SESSION_CONTEXT_PINNED_KEYS]
+    managed = [
+        k for k in state
+        if k not in SESSION_CONTEXT_PINNED_KEYS and not (k in meta and now - meta[k][0] > SESSION_CONTEXT_TTL_S)
+    ]
+    managed.sort(key=lambda k: _context_score(meta.get(k), now), reverse=True)
+
+    context = {}
+    for k in pinned + managed[:SESSION_CONTEXT_MAX_KEYS]:
+        value = state[k]
+        if not value or k in SESSION_CONTEXT_INTERNAL_KEYS:
+            continue
+        text = value if isinstance(value, str) else None
+        if text is None and not isinstance(value, (int, float, bool)):
+            text = json.dumps(value, separators=(",", ":"), default=str)
+            if len(text) <= SESSION_CONTEXT_VALUE_CHARS:
+                text = None  # Small structures stay structured
+        if text is not None and len(text) > SESSION_CONTEXT_VALUE_CHARS:
+            value = text[:SESSION_CONTEXT_VALUE_CHARS] + "…"
+        context[k] = value
+    return context
+
+
+def record_context_injection(sections: dict[str, int]):
+    """Account the bytes one turn's system prompt spent per section."""
+    with _context_stats_lock:
+        context_injection_stats["turns"] += 1
+        for name, size in sections.items():
+            entry = context_injection_stats["sections"].setdefault(name, {"total": 0, "max": 0, "last": 0})
+            entry["total"] += size
+            entry["max"] = max(entry["max"], size)
+            entry["last"] = size
+
+
+def context_injection_summary() -> dict:
+    with _context_stats_lock:
+        turns = context_injection_stats["turns"]
+        return {
+            "turns": turns,
+            "sections": {
+                name: {**entry, "mean": round(entry["total"] / turns, 1) if turns else 0}
+                for name, entry in context_injection_stats["sections"].items()
+            },
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return (len(text or "") + 3) // 4
+
+
+def _history_key(session_id: str, agent_id: str = None) -> str:
+    return f"{agent_id}_{session_id}" if agent_id else session_id
+
+
+def split_history(turns: list) -> tuple[list, list]:
+    """
+    Split turns (oldest first) into (to_fold, verbatim). Verbatim is the
+    newest HISTORY_VERBATIM_TURNS turns that fit HISTORY_TOKEN_BUDGET
+    (always at least the latest turn); everything older is folded.
+    """
+    used = 0
+    keep = 0
+    for turn in reversed(turns[-HISTORY_VERBATIM_TURNS:]):
+        used += estimate_tokens(turn.get("user", "")) + estimate_tokens(turn.get("assistant", ""))
+        if keep and used > HISTORY_TOKEN_BUDGET:
+            break
+        keep += 1
+    return turns[:len(turns) - keep], turns[len(turns) - keep:]
+
+
+def get_history_summary(session_id: str, agent_id: str = None) -> dict:
+    """Running summary of folded turns: {"summary", "turns_folded", "updated_at"} or {}."""
+    return get_session_store().get("history_summary", _history_key(session_id, agent_id), {})
+
+
 def get_recent_history_messages(session_id: str, agent_id: str = None):
     """Returns a list of message dicts for the chat API, scoped by agent."""
     messages = []
-    for turn in _get_conversation_history(session_id, agent_id):
+    summary = (get_history_summary(session_id, agent_id) or {}).get("summary")
+    if summary:
+        # A user/assistant pair keeps roles alternating for providers that require it
+        messages.append({"role": "user", "content": f"Summary of our earlier conversation:\n{summary}"})
+        messages.append({"role": "assistant", "content": "Understood, I'll keep that in mind."})
+    _, verbatim = split_history(list(_get_conversation_history(session_id, agent_id)))
+    budget_chars = HISTORY_TOKEN_BUDGET * 4
+    for turn in verbatim:
         messages.append({"role": "user", "content": turn['user']})
         # If tools were used, we should ideally represent them, but for now 
         # let's represent the final assistant response to keep context usage expected.
         # Future improvement: Store full turn history including tool_calls and tool_outputs.
-        messages.append({"role": "assistant", "content": turn['assistant']})
+        assistant = turn['assistant']
+        if len(assistant) > budget_chars:
+            # Only possible for the latest turn, which is kept even when over budget
+            assistant = assistant[:budget_chars] + "…"
+        messages.append({"role": "assistant", "content": assistant})
     return messages
+
+
+# --- Eviction ---
+
+# Process-local counters (each worker reports its own sweeps)
+eviction_stats = {"sweeps": 0, "idle": 0, "lru": 0, "bytes": 0, "embeddings_cleared": 0, "last_sweep_at": None}
+_eviction_lock = threading.Lock()
+
+
+def _eviction_limits() -> dict:
+    overrides = load_settings().get("session_eviction") or {}
+    limits = {
+        "idle_ttl_s": SESSION_IDLE_TTL_S,
+        "max_sessions": SESSION_MAX_COUNT,
+        "max_bytes": SESSION_MAX_BYTES,
+    }
+    for key in limits:
+        try:
+            if overrides.get(key) is not None:
+                limits[key] = float(overrides[key]) if key == "idle_ttl_s" else int(overrides[key])
+        except (TypeError, ValueError):
+            print(f"WARNING: Ignoring invalid session_eviction.{key}={overrides.get(key)!r}")
+    return limits
+
+
+def touch_session(session_id: str, now: float | None = None):
+    """Mark a session as used (called once per chat request)."""
+    now = now or time.time()
+    get_session_store().update(
+        "activity", session_id,
+        lambda a: {"created_at": (a or {}).get("created_at", now), "last_seen": now},
+        default={},
+    )
+
+
+def _owner(key: str, session_ids: set) -> str:
+    """Session a storage key belongs to: "<session>" or "<agent>_<session>"."""
+    if key in session_ids:
+        return key
+    for i, ch in enumerate(key):
+        if ch == "_" and key[i + 1:] in session_ids:
+            return key[i + 1:]
+    return key
+
+
+def session_usage(now: float | None = None, backfill: bool = False) -> dict[str, dict]:
+    """
+    Per-session footprint: {session_id: {"bytes", "keys", "last_seen"}}.
+    Read-only unless backfill: sessions with data but no activity record
+    (e.g. from before eviction existed) get last_seen=None. Eviction sweeps
+    pass backfill=True to stamp them as seen now, so they age out normally.
+    """
+    store = get_session_store()
+    now = now or time.time()
+    activity = {k: store.get("activity", k, {}) or {} for k in store.keys("activity")}
+    sizes = {ns: store.sizes(ns) for ns in SESSION_NAMESPACES}
+    session_ids = set(activity) | set(sizes["state"])
+    usage: dict[str, dict] = {}
+    for ns, ns_sizes in sizes.items():
+        for key, size in ns_sizes.items():
+            sid = _owner(key, session_ids)
+            entry = usage.setdefault(sid, {"bytes": 0, "keys": [], "last_seen": None})
+            entry["bytes"] += size
+            entry["keys"].append((ns, key))
+    for sid in set(usage) | set(activity):
+        entry = usage.setdefault(sid, {"bytes": 0, "keys": [], "last_seen": None})
+        last_seen = activity.get(sid, {}).get("last_seen")
+        if last_seen is None and backfill:
+            touch_session(sid, now)
+            last_seen = now
+        entry["last_seen"] = last_seen
+    return usage
+
+
+def evict_session(session_id: str, keys: list | None = None, reason: str = "manual") -> bool:
+    """Drop a session's short-term state and its session-scoped RAG collections."""
+    store = get_session_store()
+    if keys is None:
+        keys = session_usage().get(session_id, {}).get("keys", [])
+    for ns, key in keys:
+        store.delete(ns, key)
+    store.delete("activity", session_id)
+
+    cleared = 0
+    try:
+        import core.server as _server
+        if _server.memory_store:
+            cleared = _server.memory_store.clear_session_embeddings(session_id) or 0
+    except Exception as e:
+        print(f"Error clearing embeddings for evicted session {session_id}: {e}")
+    with _eviction_lock:
+        if reason in eviction_stats:
+            eviction_stats[reason] += 1
+        eviction_stats["embeddings_cleared"] += cleared
+    print(f"DEBUG: Evicted session {session_id} ({reason}, {len(keys)} keys, {cleared} RAG collections)")
+    return True
+
+
+def evict_sessions(now: float | None = None) -> list[tuple[str, str]]:
+    """
+    One eviction sweep. In order:
+        1. idle TTL — sessions not seen for idle_ttl_s
+        2. LRU count — oldest sessions beyond max_sessions
+        3. byte budget — oldest sessions until the total fits max_bytes
+    Steps 2 and 3 skip sessions seen within SESSION_EVICT_GRACE_S.
+    Returns [(session_id, reason)].
+    """
+    now = now or time.time()
+    limits = _eviction_limits()
+    usage = session_usage(now, backfill=True)
+    evicted: list[tuple[str, str]] = []
+
+    def _evict(sid: str, reason: str):
+        evict_session(sid, usage[sid]["keys"], reason)
+        evicted.append((sid, reason))
+        del usage[sid]
+
+    if limits["idle_ttl_s"] > 0:
+        for sid in [s for s, u in usage.items() if now - u["last_seen"] > limits["idle_ttl_s"]]:
+            _evict(sid, "idle")
+
+    candidates = sorted(
+        (s for s, u in usage.items() if now - u["last_seen"] > SESSION_EVICT_GRACE_S),
+        key=lambda s: usage[s]["last_seen"],
+    )
+    while candidates and limits["max_sessions"] > 0 and len(usage) > limits["max_sessions"]:
+        _evict(candidates.pop(0), "lru")
+    total = sum(u["bytes"] for u in usage.values())
+    while candidates and limits["max_bytes"] > 0 and total > limits["max_bytes"]:
+        sid = candidates.pop(0)
+        total -= usage[sid]["bytes"]
+        _evict(sid, "bytes")
+
+    with _eviction_lock:
+        eviction_stats["sweeps"] += 1
+        eviction_stats["last_sweep_at"] = now
+    return evicted
+
+
+def session_stats(top: int = 5) -> dict:
+    """Session count, approximate bytes (total, per namespace, largest sessions) and eviction counters."""
+    store = get_session_store()
+    usage = session_usage()
+    by_namespace = {ns: sum(store.sizes(ns).values()) for ns in SESSION_NAMESPACES}
+    largest = sorted(usage.items(), key=lambda item: item[1]["bytes"], reverse=True)[:top]
+    with _eviction_lock:
+        evictions = dict(eviction_stats)
+    return {
+        "sessions": len(usage),
+        "bytes": sum(by_namespace.values()),
+        "by_namespace": by_namespace,
+        "largest": [
+            {"session_id": sid, "bytes": u["bytes"], "keys": len(u["keys"]), "last_seen": u["last_seen"]}
+            for sid, u in largest
+        ],
+        "limits": _eviction_limits(),
+        "evictions": evictions,
+        "context_injection": context_injection_summary(),
+        "snapshot": store.snapshot_stats() if hasattr(store, "snapshot_stats") else None,
+    }
+
+
+async def session_janitor(interval_s: float = SESSION_EVICT_INTERVAL_S):
+    """Background task: run an eviction sweep every interval_s (started by the server lifespan)."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            evicted = await asyncio.to_thread(evict_sessions)
+            if evicted:
+                print(f"DEBUG: Session sweep evicted {len(evicted)} sessions")
+        except Exception as e:
+            print(f"Error evicting sessions: {e}")
@@ -0,0 +1,176 @@
+"""
+Crash-safe snapshots of the in-memory session store.
+
+The "memory" session backend loses every session on restart: histories,
+sticky context, last_report_context (which tells the prompt a report is
+already embedded). With settings.session_snapshots on, InMemorySessionStore
+journals its changes here and restores them after a restart.
+
+Files under data/session_snapshots/:
+
+    base.log     full snapshot, rewritten when the journal grows past
+                 SESSION_SNAPSHOT_COMPACT_BYTES
+    journal.log  changes since the base, appended every
+                 SESSION_SNAPSHOT_INTERVAL_S (only keys written since the
+                 last flush, each once)
+
+One record per line:
+
+    <crc32 hex>\t<op>\t<json namespace>\t<json key>\t<json value>\n
+
+op is P (put), D (delete) or C (clear namespace; a null namespace clears
+all). JSON escapes tabs and newlines, so the fields split cleanly. The
+checksum covers everything after the first tab. A torn or corrupt line is
+skipped.
+
+Startup only indexes the files (namespace, key -> file offset). Values are
+decoded when a session is first read, so restart time does not grow with
+the snapshot size.
+"""
+import os
+import json
+import zlib
+import threading
+from typing import Any
+
+from core.config import DATA_DIR
+
+SESSION_SNAPSHOT_DIR = os.path.join(DATA_DIR, "session_snapshots")
+SESSION_SNAPSHOT_INTERVAL_S = 15
+SESSION_SNAPSHOT_COMPACT_BYTES = 8 * 1024 * 1024
+
+
+def encode_record(op: str, namespace: str | None, key: str | None, value: Any = None) -> bytes:
+    body = "\t".join((op, json.dumps(namespace), json.dumps(key), json.dumps(value, default=str)))
+    data = body.encode("utf-8")
+    return b"%08x\t" % zlib.crc32(data) + data + b"\n"
+
+
+def decode_record(line: bytes) -> tuple[str, str | None, str | None, bytes] | None:
+    """(op, namespace, key, raw value JSON), or None if the line is torn or corrupt."""
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        crc, data = line[:-1].split(b"\t", 1)
+        if int(crc, 16) != zlib.crc32(data):
+            return None
+        op, namespace, key, raw = data.split(b"\t", 3)
+        return op.decode(), json.loads(namespace), json.loads(key), raw
+    except ValueError:
+        return None
+
+
+class SessionSnapshot:
+    """Append-only journal plus periodic base rewrite for one InMemorySessionStore."""
+
+    def __init__(self, path: str = SESSION_SNAPSHOT_DIR, interval_s: float = SESSION_SNAPSHOT_INTERVAL_S,
+                 compact_bytes: int = SESSION_SNAPSHOT_COMPACT_BYTES):
+        self.path = path
+        self.base_path = os.path.join(path, "base.log")
+        self.journal_path = os.path.join(path, "journal.log")
+        self.interval_s = interval_s
+        self.compact_bytes = compact_bytes
+        self.stats = {"indexed": 0, "restored": 0, "corrupt": 0, "flushes": 0, "records": 0, "bytes": 0, "compactions": 0}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._io_lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    # --- Restore ---
+
+    def scan(self) -> dict[str, dict[str, tuple[str, int, int]]]:
+        """Replay base then journal into {namespace: {key: (file, offset, length)}} without decoding values."""
+        index: dict[str, dict[str, tuple[str, int, int]]] = {}
+        for file_path in (self.base_path, self.journal_path):
+            if not os.path.exists(file_path):
+                continue
+            offset = 0
+            with open(file_path, "rb") as f:
+                for line in f:
+                    record = decode_record(line)
+                    if record is None:
+                        self.stats["corrupt"] += 1
+                    else:
+                        op, namespace, key, _ = record
+                        if op == "P":
+                            index.setdefault(namespace, {})[key] = (file_path, offset, len(line))
+                        elif op == "D":
+                            index.get(namespace, {}).pop(key, None)
+                        elif op == "C":
+                            if namespace is None:
+                                index.clear()
+                            else:
+                                index.pop(namespace, None)
+                    offset += len(line)
+        self.stats["indexed"] = sum(len(keys) for keys in index.values())
+        if self.stats["corrupt"]:
+            print(f"WARNING: Skipped {self.stats['corrupt']} corrupt session snapshot records")
+        return index
+
+    def read(self, location: tuple[str, int, int]) -> tuple[bool, Any]:
+        """Decode one indexed value: (ok, value)."""
+        file_path, offset, length = location
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                record = decode_record(f.read(length))
+            if record is None:
+                raise ValueError("checksum mismatch")
+            self.stats["restored"] += 1
+            return True, json.loads(record[3])
+        except Exception as e:
+            self.stats["corrupt"] += 1
+            print(f"WARNING: Could not restore session snapshot record at {file_path}:{offset}: {e}")
+            return False, None
+
+    # --- Persist ---
+
+    def append(self, records: list[bytes]):
+        if not records:
+            return
+        with self._io_lock:
+            with open(self.journal_path, "ab") as f:
+                for record in records:
+                    f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+        self.stats["flushes"] += 1
+        self.stats["records"] += len(records)
+        self.stats["bytes"] += sum(len(r) for r in records)
+
+    def needs_compaction(self) -> bool:
+        try:
+            return os.path.getsize(self.journal_path) > self.compact_bytes
+        except OSError:
+            return False
+
+    def rewrite(self, records: list[bytes]):
+        """Replace base with a full snapshot and start an empty journal."""
+        with self._io_lock:
+            tmp_path = f"{self.base_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                for record in records:
+                    f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.base_path)
+            open(self.journal_path, "wb").close()
+        self.stats["compactions"] += 1
+
+    # --- Background flushing ---
+
+    def start(self, store):
+        def run():
+            while not self._stop.wait(self.interval_s):
+                try:
+                    store.flush()
+                except Exception as e:
+                    print(f"Error writing session snapshot: {e}")
+
+        self._thread = threading.Thread(target=run, name="session-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
@@ -0,0 +1,362 @@
+"""
+Pluggable storage for short-term session state.
+
+core.session keeps conversation history, per-session context, the recent
+tool ring buffer and the active agent id here. Values are JSON-compatible
+and addressed by (namespace, key):
+
+    "history"      "<agent>_<session>" -> list of turns
+    "state"        "<session>"         -> dict of sticky context
+    "recent_tools" "<agent>_<session>" -> list of tool executions
+    "globals"      "active_agent_id"   -> str
+    "activity"     "<session>"         -> {"created_at", "last_seen"} (eviction)
+    "context_meta" "<session>"         -> {key: [last_set, uses]} (context budget)
+    "history_summary" "<agent>_<session>" -> running summary of folded turns
+
+Backends (settings.session_store):
+    "memory" (default) — process-local dicts; single worker only. With
+                         settings.session_snapshots, changes are journaled to
+                         data/session_snapshots/ and restored lazily after a
+                         restart (core.session_snapshot)
+    "sqlite"           — one WAL-mode SQLite file (data/sessions.db) shared by
+                         every uvicorn worker on the box, with a small
+                         per-process cache of values keyed by row version
+
+`update()` is an atomic read-modify-write of one key (BEGIN IMMEDIATE in
+SQLite), so concurrent requests on different workers never lose each
+other's writes to the same session. `update_many()` does the same for
+several keys in one transaction (e.g. a session's state and context_meta).
+"""
+import os
+import copy
+import json
+import time
+import secrets
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from core.config import DATA_DIR
+from core.session_snapshot import SessionSnapshot, encode_record
+
+SESSION_STORE_BACKENDS = ("memory", "sqlite")
+SESSION_DB_FILE = os.path.join(DATA_DIR, "sessions.db")
+SESSION_CACHE_SIZE = 512  # Decoded values kept per process by the SQLite backend
+# How long a write waits for another worker's transaction. Store calls run on the
+# event loop, so a long wait would stall every request of the waiting worker.
+SESSION_DB_BUSY_TIMEOUT_S = 2.0
+
+
+class SessionStore:
+    """Interface: JSON-compatible values addressed by (namespace, key)."""
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Return a private copy of the value (mutating it does not write back)."""
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """Atomically replace the value with fn(current or default); returns a copy of the new value."""
+        ck = (namespace, key)
+        return self.update_many([ck], lambda current: {ck: fn(current[ck])}, {ck: default})[ck]
+
+    def update_many(self, keys: list[tuple[str, str]], fn: Callable[[dict], dict], defaults: dict | None = None) -> dict:
+        """
+        Atomically read several values and write back fn's result.
+
+        fn gets {(namespace, key): current or defaults[(namespace, key)]} and
+        returns {(namespace, key): new value} for the keys to write (others are
+        left as they are). Returns copies of the written values.
+        """
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any):
+        self.update(namespace, key, lambda _: value)
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def clear(self, namespace: str | None = None):
+        raise NotImplementedError
+
+    def keys(self, namespace: str) -> list[str]:
+        raise NotImplementedError
+
+    def sizes(self, namespace: str) -> dict[str, int]:
+        """Approximate stored size in bytes (serialized JSON) of every key in the namespace."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist pending changes (no-op for stores that write through)."""
+
+    def close(self):
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local dicts (the original behaviour), optionally snapshotted to disk."""
+
+    def __init__(self, snapshot: SessionSnapshot | None = None):
+        self._data: dict[str, dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._snapshot = snapshot
+        # Restored from the snapshot but not decoded yet: {namespace: {key: location}}
+        self._unloaded: dict[str, dict[str, tuple]] = snapshot.scan() if snapshot else {}
+        # Changes since the last flush, in order: (namespace, key) -> "P" | "D"; (namespace, None) -> "C"
+        self._changes: OrderedDict[tuple, str] = OrderedDict()
+        self._flush_lock = threading.Lock()
+        if snapshot:
+            snapshot.start(self)
+
+    def _load(self, namespace, key):
+        location = self._unloaded.get(namespace, {}).pop(key, None)
+        if location is not None:
+            ok, value = self._snapshot.read(location)
+            if ok:
+                self._data.setdefault(namespace, {})[key] = value
+
+    def _changed(self, namespace, key, op="P"):
+        if self._snapshot:
+            self._changes[(namespace, key)] = op
+            self._changes.move_to_end((namespace, key))
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            self._load(namespace, key)
+            value = self._data.get(namespace, {}).get(key, default)
+            return copy.deepcopy(value)
+
+    def update_many(self, keys, fn, defaults=None):
+        defaults = defaults or {}
+        with self._lock:
+            current = {}
+            for namespace, key in keys:
+                self._load(namespace, key)
+                bucket = self._data.get(namespace, {})
+                current[(namespace, key)] = copy.deepcopy(bucket[key] if key in bucket else defaults.get((namespace, key)))
+            written = fn(current)
+            for (namespace, key), value in written.items():
+                self._data.setdefault(namespace, {})[key] = value
+                self._changed(namespace, key)
+            return copy.deepcopy(written)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._unloaded.get(namespace, {}).pop(key, None)
+            self._data.get(namespace, {}).pop(key, None)
+            self._changed(namespace, key, "D")
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+                self._unloaded.clear()
+                self._changes.clear()
+            else:
+                self._data.pop(namespace, None)
+                self._unloaded.pop(namespace, None)
+                for change in [c for c in self._changes if c[0] == namespace]:
+                    del self._changes[change]
+            self._changed(namespace, None, "C")
+
+    def keys(self, namespace):
+        with self._lock:
+            return list(self._data.get(namespace, {}).keys()) + list(self._unloaded.get(namespace, {}).keys())
+
+    def sizes(self, namespace):
+        with self._lock:
+            items = list(self._data.get(namespace, {}).items())
+            unloaded = {k: location[2] for k, location in self._unloaded.get(namespace, {}).items()}
+        return {**unloaded, **{k: len(json.dumps(v, default=str)) for k, v in items}}
+
+    def flush(self):
+        """Append changes since the last flush to the snapshot journal (compacting it when large)."""
+        if not self._snapshot:
+            return
+        with self._flush_lock:
+            with self._lock:
+                changes, self._changes = self._changes, OrderedDict()
+                records = []
+                for (namespace, key), op in changes.items():
+                    bucket = self._data.get(namespace, {})
+                    if op == "P" and key in bucket:
+                        records.append(encode_record("P", namespace, key, bucket[key]))
+                    elif op == "C":
+                        records.append(encode_record("C", namespace, None))
+                    else:
+                        records.append(encode_record("D", namespace, key))
+            self._snapshot.append(records)
+            if self._snapshot.needs_compaction():
+                with self._lock:
+                    # The rewrite moves every record, so decode what is still unloaded first
+                    for namespace in list(self._unloaded):
+                        for key in list(self._unloaded[namespace]):
+                            self._load(namespace, key)
+                    self._unloaded.clear()
+                    records = [
+                        encode_record("P", namespace, key, value)
+                        for namespace, bucket in self._data.items()
+                        for key, value in bucket.items()
+                    ]
+                    self._snapshot.rewrite(records)
+
+    def close(self):
+        if self._snapshot:
+            self._snapshot.stop()
+        self.flush()
+
+    def snapshot_stats(self) -> dict | None:
+        if not self._snapshot:
+            return None
+        with self._lock:
+            unloaded = sum(len(keys) for keys in self._unloaded.values())
+        return {**self._snapshot.stats, "unloaded": unloaded, "pending_changes": len(self._changes)}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a WAL-mode SQLite file, safe across processes.
+
+    Every write stamps the row with a random version. Reads send the cached
+    version along, and SQLite only returns (and we only decode) the value
+    when it changed.
+    """
+
+    def __init__(self, path: str = SESSION_DB_FILE, cache_size: int = SESSION_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._cache: OrderedDict[tuple[str, str], tuple[int, Any]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " version INTEGER NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; update() manages its own transaction
+            conn = sqlite3.connect(
+                self.path, timeout=SESSION_DB_BUSY_TIMEOUT_S, isolation_level=None, check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(SESSION_DB_BUSY_TIMEOUT_S * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def _cache_get(self, ck):
+        with self._cache_lock:
+            entry = self._cache.get(ck)
+            if entry is not None:
+                self._cache.move_to_end(ck)
+            return entry
+
+    def _cache_put(self, ck, version: int, value: Any):
+        with self._cache_lock:
+            self._cache[ck] = (version, value)
+            self._cache.move_to_end(ck)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, namespace: str | None = None, key: str | None = None):
+        with self._cache_lock:
+            if namespace is None:
+                self._cache.clear()
+            elif key is None:
+                for ck in [ck for ck in self._cache if ck[0] == namespace]:
+                    del self._cache[ck]
+            else:
+                self._cache.pop((namespace, key), None)
+
+    def get(self, namespace, key, default=None):
+        ck = (namespace, key)
+        cached = self._cache_get(ck)
+        row = self._conn().execute(
+            "SELECT version, CASE WHEN version = ? THEN NULL ELSE value END"
+            " FROM sessions WHERE namespace = ? AND key = ?",
+            (cached[0] if cached else None, namespace, key),
+        ).fetchone()
+        if row is None:
+            if cached:
+                self._cache_drop(namespace, key)
+            return copy.deepcopy(default)
+        version, raw = row
+        if raw is None:
+            return copy.deepcopy(cached[1])
+        value = json.loads(raw)
+        self._cache_put(ck, version, value)
+        return copy.deepcopy(value)
+
+    def update_many(self, keys, fn, defaults=None):
+        defaults = defaults or {}
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = {}
+            for namespace, key in keys:
+                row = conn.execute(
+                    "SELECT value FROM sessions WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                current[(namespace, key)] = json.loads(row[0]) if row else copy.deepcopy(defaults.get((namespace, key)))
+            written = {}
+            for (namespace, key), value in fn(current).items():
+                raw = json.dumps(value, default=str)
+                version = secrets.randbits(62)
+                conn.execute(
+                    "INSERT INTO sessions (namespace, key, value, version, updated_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET"
+                    " value = excluded.value, version = excluded.version, updated_at = excluded.updated_at",
+                    (namespace, key, raw, version, time.time()),
+                )
+                written[(namespace, key)] = (version, raw)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        result = {}
+        for ck, (version, raw) in written.items():
+            # Cache the value as stored (round-tripped), so readers see what other workers see
+            value = json.loads(raw)
+            self._cache_put(ck, version, value)
+            result[ck] = copy.deepcopy(value)
+        return result
+
+    def delete(self, namespace, key):
+        self._conn().execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (namespace, key))
+        self._cache_drop(namespace, key)
+
+    def clear(self, namespace=None):
+        if namespace is None:
+            self._conn().execute("DELETE FROM sessions")
+        else:
+            self._conn().execute("DELETE FROM sessions WHERE namespace = ?", (namespace,))
+        self._cache_drop(namespace)
+
+    def keys(self, namespace):
+        rows = self._conn().execute("SELECT key FROM sessions WHERE namespace = ?", (namespace,)).fetchall()
+        return [r[0] for r in rows]
+
+    def sizes(self, namespace):
+        rows = self._conn().execute(
+            "SELECT key, length(CAST(value AS BLOB)) FROM sessions WHERE namespace = ?", (namespace,)
+        ).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+
+def create_session_store(backend: str, path: str = SESSION_DB_FILE, snapshots: bool = False) -> SessionStore:
+    """
+    Instantiate a session store backend by name ("memory" | "sqlite").
+    `snapshots` journals the memory backend to disk (SQLite is durable already).
+    """
+    backend = (backend or "memory").strip().lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(path)
+    if backend != "memory":
+        print(f"WARNING: Unknown session store '{backend}', using in-memory sessions")
+    return InMemorySessionStore(SessionSnapshot() if snapshots else None)
@@ -0,0 +1,126 @@
+"""
+Parse-once envelope for tool outputs.
+
+ToolResult is a str carrying the parsed JSON (.value, cached), .size_bytes,
+.ids, and per-item text of a top-level list (.item_raw / .item_size).
+Handlers accept a ToolResult or a plain string (ToolResult.of).
+"""
+import json
+from typing import Any, Optional
+
+# Lists up to this long are serialized item by item so item sizes come for free;
+# past it, one json.dumps call is much faster than one per item
+ITEM_SPANS_MAX_ITEMS = 64
+_UNSET = object()
+
+
+class ToolResult(str):
+    """A tool's output text that parses itself as JSON at most once."""
+
+    def __new__(cls, raw: str = ""):
+        self = super().__new__(cls, raw)
+        self._value = _UNSET
+        self._error: Optional[str] = None
+        self._spans: Optional[list[tuple[int, int]]] = None  # Top-level list items: (start, end) in the text
+        self._ids: Optional[dict] = None
+        self._size_bytes: Optional[int] = None
+        return self
+
+    @classmethod
+    def of(cls, output) -> "ToolResult":
+        """output as a ToolResult (itself if it already is one)."""
+        if isinstance(output, cls):
+            return output
+        return cls(output if isinstance(output, str) else str(output))
+
+    @classmethod
+    def from_value(cls, value: Any, **dumps_kwargs) -> "ToolResult":
+        """Serialize an already-parsed value; .value is then that object, with nothing to parse."""
+        if isinstance(value, list) and len(value) <= ITEM_SPANS_MAX_ITEMS:
+            return cls.from_items(value, [json.dumps(item, **dumps_kwargs) for item in value])
+        result = cls(json.dumps(value, **dumps_kwargs))
+        result._value = value
+        return result
+
+    @classmethod
+    def from_items(cls, values: list, raws: list[str]) -> "ToolResult":
+        """A JSON list from items and their serialized text, formatted as json.dumps would."""
+        result = cls("[" + ", ".join(raws) + "]")
+        result._value = values
+        spans, pos = [], 1
+        for raw in raws:
+            spans.append((pos, pos + len(raw)))
+            pos += len(raw) + 2
+        result._spans = spans
+        return result
+
+    # --- Parsed view ---
+
+    @property
+    def is_json(self) -> bool:
+        try:
+            self.value
+            return True
+        except ValueError:
+            return False
+
+    @property
+    def value(self) -> Any:
+        """The output parsed as JSON. Raises ValueError if it is not JSON (the failure is cached too)."""
+        if self._value is _UNSET and self._error is None:
+            try:
+                self._value = json.loads(self)
+            except ValueError as e:
+                self._error = str(e)
+        if self._error is not None:
+            raise ValueError(self._error)
+        return self._value
+
+    @property
+    def size_bytes(self) -> int:
+        if self._size_bytes is None:
+            self._size_bytes = len(self) if self.isascii() else len(self.encode("utf-8"))
+        return self._size_bytes
+
+    def item_raw(self, index: int) -> str:
+        """JSON text of item index of a top-level list: sliced from the output when built by from_items."""
+        if self._spans is None:
+            return json.dumps(self.value[index])
+        start, end = self._spans[index]
+        return self[start:end]
+
+    def item_size(self, index: int) -> int:
+        """len(item_raw(index)), without slicing or serializing when the span is known."""
+        if self._spans is None:
+            return len(self.item_raw(index))
+        start, end = self._spans[index]
+        return end - start
+
+    @property
+    def ids(self) -> dict:
+        """ID fields in the output: keys ending in '_id'/'Id' or named id/uuid, last one seen wins.
+
+        Nested dicts are searched all the way down. For lists, only the first
+        item is searched (for a single-item result, or the top hit of several).
+        Empty if the output is not JSON.
+        """
+        if self._ids is None:
+            found = {}
+            try:
+                _find_ids(self.value, found)
+            except ValueError:
+                pass
+            self._ids = found
+        return self._ids
+
+
+def _find_ids(data: Any, found: dict):
+    if isinstance(data, dict):
+        for key, value in data.items():
+            is_id_field = key.endswith("_id") or key.endswith("Id") or key.lower() in ["id", "uuid"]
+            if is_id_field and value is not None and value != "":
+                found[key] = value
+            elif isinstance(value, (dict, list)):
+                _find_ids(value, found)
+    elif isinstance(data, list) and data and isinstance(data[0], (dict, list)):
+        _find_ids(data[0], found)
@@ -7,6 +7,8 @@ import time
 import datetime
 import zoneinfo
 
+from core.session import record_context_injection
+
 
 # System Prompt for Native Tool Calling (Personal Assistant)
 NATIVE_TOOL_SYSTEM_PROMPT = """You are a highly capable Personal Intelligent Assistant.
@@ -77,13 +79,18 @@ def build_virtual_tools():
     tools.append(VirtualTool(
         "query_past_conversations",
         "Search long-term conversation memory. Use this only when you need context from older sessions."
-        " Arguments: query (string), n_results (int, optional), scope ('all'|'session').",
+        " Arguments: query (string), n_results (int, optional), scope ('all'|'session'),"
+        " last_days (int, optional), since / until (ISO date, optional) to restrict by time."
+        " Recent memories are ranked higher.",
         {
             "type": "object",
             "properties": {
                 "query": {"type": "string"},
                 "n_results": {"type": "integer", "default": 5},
                 "scope": {"type": "string", "enum": ["all", "session"], "default": "all"},
+                "last_days": {"type": "integer", "description": "Only search memories from the last N days"},
+                "since": {"type": "string", "description": "ISO date/datetime lower bound, e.g. 2024-05-01"},
+                "until": {"type": "string", "description": "ISO date/datetime upper bound, e.g. 2024-05-31"},
             },
             "required": ["query"],
         },
@@ -233,7 +240,8 @@ async def aggregate_all_tools(agent_sessions, active_agent, custom_tools_list):
     return all_tools, tool_schema_map, ollama_tools, tools_json, allowed_tools
 
 
-def build_system_prompt(agent_system_template, tools_json, session_id, session_state_getter, memory_store, agent_id=None):
+def build_system_prompt(agent_system_template, tools_json, session_id, session_state_getter, memory_store, agent_id=None,
+                        recent_tools_getter=None, session_context_getter=None):
     """
     Construct the final system prompt with tool info, date/time, session context, 
     and recent tool outputs injected.
@@ -245,6 +253,10 @@ def build_system_prompt(agent_system_template, tools_json, session_id, session_s
         session_state_getter: Function that returns session state dict for a session_id
         memory_store: Memory store instance (or None)
         agent_id: Optional agent ID for scoping memory queries
+        recent_tools_getter: Optional function (session_id, agent_id) -> ordered recent
+            tool executions. When given, it replaces the memory_store lookup.
+        session_context_getter: Optional function (session_id) -> bounded, ranked context
+            dict to inject. Defaults to every non-empty session_state value.
     
     Returns:
         str: The fully constructed system prompt
@@ -260,6 +272,7 @@ def build_system_prompt(agent_system_template, tools_json, session_id, session_s
     system_prompt_text = system_prompt_text.replace("{current_date}", current_date)
     system_prompt_text = system_prompt_text.replace("{current_time}", current_time)
     system_prompt_text = system_prompt_text.replace("{timezone}", timezone)
+    injected = {"rag_context": 0, "session_context": 0, "recent_tools": 0}
     
     # --- DYNAMIC RAG INJECTION ---
     # If we have active embeddings, force the LLM to know about them
@@ -278,37 +291,47 @@ You have {last_report.get('row_count', 'some')} items of '{last_report.get('type
 4. **DO NOT RE-RUN TOOL FOR EXISTING DATA:** The data is already here. Only call tools if the user explicitly asks for NEW/DIFFERENT data (e.g., "refresh", "different date", "different query").
 """
             system_prompt_text += rag_context_msg
+            injected["rag_context"] = len(rag_context_msg.encode("utf-8"))
             print(f"DEBUG: 💉 Injected RAG context into system prompt")
     except Exception as e:
         print(f"DEBUG: Error injecting RAG prompt: {e}")
     
     # --- INJECT SESSION CONTEXT ---
-    active_ss = session_state_getter(session_id)
-    if active_ss:
-        valid_context = {k: v for k, v in active_ss.items() if v}
-        if valid_context:
-            context_str = json.dumps(valid_context, indent=2)
-            system_prompt_text += f"\n\n### CURRENT SESSION CONTEXT ###\nThe following variables are active in the current session. You can use these values for tool arguments (e.g., email_id) without asking the user:\n{context_str}\n"
+    if session_context_getter:
+        valid_context = session_context_getter(session_id)
+    else:
+        valid_context = {k: v for k, v in (session_state_getter(session_id) or {}).items() if v}
+    if valid_context:
+        context_str = json.dumps(valid_context, separators=(",", ":"), default=str)
+        context_msg = f"\n\n### CURRENT SESSION CONTEXT ###\nThe following variables are active in the current session. You can use these values for tool arguments (e.g., email_id) without asking the user:\n{context_str}\n"
+        system_prompt_text += context_msg
+        injected["session_context"] = len(context_msg.encode("utf-8"))
+        print(f"DEBUG: 💉 Injected {len(valid_context)} session context keys ({injected['session_context']} bytes)")
     
     # --- INJECT RECENT TOOL OUTPUTS ---
-    if memory_store:
+    if recent_tools_getter or memory_store:
         try:
-            recent_tools = memory_store.get_session_tool_outputs(
-                session_id=session_id,
-                n_results=5,
-                agent_id=agent_id
-            )
+            if recent_tools_getter:
+                # In-process ring buffer, oldest → newest
+                documents = [entry["document"] for entry in recent_tools_getter(session_id, agent_id)]
+            else:
+                recent_tools = memory_store.get_session_tool_outputs(
+                    session_id=session_id,
+                    n_results=5,
+                    agent_id=agent_id
+                )
+                documents = (recent_tools or {}).get('documents') or []
             
-            if recent_tools and recent_tools.get('documents'):
+            if documents:
                 tools_summary = "\n".join([
                     f"- {doc}" 
-                    for doc in recent_tools['documents']
+                    for doc in documents
                 ])
                 
-                system_prompt_text += f"""
+                recent_msg = f"""
 
 ### RECENT TOOL EXECUTIONS ###
-The following tools were executed recently in this session. Use the output values (especially IDs) from these tools:
+The following tools were executed recently in this session (oldest first). Use the output values (especially IDs) from these tools:
 {tools_summary}
 
 ### SESSION LIFECYCLE MANAGEMENT ###
@@ -319,7 +342,11 @@ Examples:
 - User: "Check a different date" → clear_session_context(scope="ids_only")  
 - User: "Start over" → clear_session_context(scope="all")
 """
+                system_prompt_text += recent_msg
+                injected["recent_tools"] = len(recent_msg.encode("utf-8"))
         except Exception as e:
             print(f"DEBUG: Error injecting tool history: {e}")
-    
+
+    injected["system_prompt"] = len(system_prompt_text.encode("utf-8"))
+    record_context_injection(injected)
     return system_prompt_text
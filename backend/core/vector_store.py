@@ -0,0 +1,957 @@
+"""
+Vector store backends behind MemoryStore.
+
+MemoryStore talks to a small, Chroma-shaped interface:
+
+    store.get_or_create_collection(name) / get_collection / create_collection
+    store.list_collections()   -> objects with a `.name`
+    store.list_collection_names()  (does not open the collections)
+    store.delete_collection(name)
+    store.close()
+    collection.add(ids, embeddings, documents, metadatas)
+    collection.query(query_embeddings, n_results, where=None, include=None)
+    collection.get(ids=None, where=None, limit=None, offset=None, include=None)
+    collection.delete(ids)
+    collection.count()
+
+Backends:
+    "chroma" — chromadb.PersistentClient (default; what existing data lives in)
+    "local"  — in-process NumPy store. Flat normalized dot-product search for
+               small collections, an hnswlib index once a collection grows past
+               HNSW_MIN_ITEMS (if hnswlib is installed; built in a background
+               thread, flat search until it is ready). Vectors are persisted
+               in memory-mapped .npy files, records in an append-only JSONL log.
+               Optionally compressed (int8 and/or truncated search vectors,
+               exact re-ranking); see LocalCollection.
+
+Distances returned by the local backend are cosine distances (1 - cos).
+"""
+import os
+import re
+import json
+import shutil
+import threading
+from typing import Any
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+VECTOR_BACKENDS = ("chroma", "local")
+
+HNSW_MIN_ITEMS = 5000      # Switch from flat search to HNSW at this size
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 64
+HNSW_SAVE_EVERY = 500      # Persist the HNSW index after this many incremental adds
+HNSW_BUILD_CHUNK = 2000    # Rows read (under the collection lock) per step of a background build
+INITIAL_CAPACITY = 256     # Rows preallocated in each .npy array; doubles on demand
+
+# Optional compression (local backend): {"quantization": "none" | "int8",
+# "truncate_dim": 0 (off) or N, "keep_exact": True}
+QUANTIZATION_MODES = ("none", "int8")
+RERANK_OVERFETCH = 4       # Candidates re-scored against exact vectors, per requested result
+SCAN_CHUNK = 256           # Rows of int8 codes dequantized at a time during a flat scan
+ARRAY_NAMES = ("vectors", "codes", "scales")
+COMPACT_SUFFIX = ".compact"  # Staged replacement files written by compact()
+COMPACT_MARKER = "compact.json"  # Present once every staged file is complete: roll forward on load
+
+# Collection names follow Chroma's rules; they are also directory names under the store path
+COLLECTION_NAME_RE = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9._-]{1,510})[A-Za-z0-9]$")
+
+
+class VectorCollection:
+    """Interface for a named set of (id, embedding, document, metadata) records."""
+
+    name: str
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        raise NotImplementedError
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        raise NotImplementedError
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        raise NotImplementedError
+
+    def delete(self, ids=None):
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+class VectorStore:
+    """Interface for a collection registry. Mirrors the chromadb client subset we use."""
+
+    def get_or_create_collection(self, name: str) -> VectorCollection:
+        raise NotImplementedError
+
+    def get_collection(self, name: str) -> VectorCollection:
+        raise NotImplementedError
+
+    def create_collection(self, name: str) -> VectorCollection:
+        raise NotImplementedError
+
+    def list_collections(self) -> list:
+        raise NotImplementedError
+
+    def list_collection_names(self) -> list[str]:
+        return [c.name for c in self.list_collections()]
+
+    def delete_collection(self, name: str):
+        raise NotImplementedError
+
+    def close(self):
+        """Release the store's files; collections it handed out stop accepting calls."""
+
+
+# ============================================================================
+# CHROMA BACKEND
+# ============================================================================
+
+class ChromaVectorStore(VectorStore):
+    """Thin adapter over chromadb.PersistentClient. Collections are Chroma's own."""
+
+    def __init__(self, path: str):
+        import chromadb  # Heavy import — only paid when this backend is selected
+
+        self.client = chromadb.PersistentClient(path=path)
+
+    def get_or_create_collection(self, name: str):
+        return self.client.get_or_create_collection(name=name)
+
+    def get_collection(self, name: str):
+        return self.client.get_collection(name)
+
+    def create_collection(self, name: str):
+        return self.client.create_collection(name=name)
+
+    def list_collections(self) -> list:
+        return self.client.list_collections()
+
+    def delete_collection(self, name: str):
+        self.client.delete_collection(name)
+
+    def close(self):
+        pass  # chromadb shares one system per path within a process, so a new client does not race this one
+
+
+# ============================================================================
+# LOCAL (NUMPY / HNSW) BACKEND
+# ============================================================================
+
+def _match_where(metadata: dict, where: dict | None) -> bool:
+    """Evaluate the Chroma `where` subset we use: equality, $and/$or, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin."""
+    if not where:
+        return True
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(_match_where(metadata, c) for c in cond):
+                return False
+            continue
+        if key == "$or":
+            if not any(_match_where(metadata, c) for c in cond):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(cond, dict):
+            if value != cond:
+                return False
+            continue
+        for op, target in cond.items():
+            try:
+                if op == "$eq" and not value == target:
+                    return False
+                if op == "$ne" and not value != target:
+                    return False
+                if op == "$in" and value not in target:
+                    return False
+                if op == "$nin" and value in target:
+                    return False
+                if op == "$gt" and not (value is not None and value > target):
+                    return False
+                if op == "$gte" and not (value is not None and value >= target):
+                    return False
+                if op == "$lt" and not (value is not None and value < target):
+                    return False
+                if op == "$lte" and not (value is not None and value <= target):
+                    return False
+            except TypeError:
+                # Comparing incompatible types (e.g. legacy string timestamps) never matches
+                return False
+    return True
+
+
+def normalize_compression(compression: dict | None) -> dict:
+    """Fill in defaults for a compression config ({"quantization", "truncate_dim", "keep_exact"})."""
+    cfg = dict(compression or {})
+    quantization = str(cfg.get("quantization") or "none").strip().lower()
+    if quantization not in QUANTIZATION_MODES:
+        print(f"WARNING: Unknown quantization '{quantization}', storing float32")
+        quantization = "none"
+    try:
+        truncate_dim = max(int(cfg.get("truncate_dim") or 0), 0)
+    except (TypeError, ValueError):
+        truncate_dim = 0
+    return {
+        "quantization": quantization,
+        "truncate_dim": truncate_dim,
+        "keep_exact": bool(cfg.get("keep_exact", True)),
+    }
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class LocalCollection(VectorCollection):
+    """
+    NumPy-backed collection.
+
+    On disk (one directory per collection):
+        config.json   — {"dim", "compression"}; recorded on the first add and
+                        authoritative from then on
+        vectors.npy   — float32 [capacity, dim] memmap of L2-normalized vectors
+                        (omitted for compressed collections with keep_exact=False)
+        codes.npy     — compressed search vectors [capacity, search_dim]: int8
+                        codes, or float32 when only truncating
+        scales.npy    — float32 [capacity] per-row int8 dequantization scales
+        records.jsonl — append-only log of {"id", "row", "document", "metadata"}
+                        and {"id", "deleted": true} tombstones
+        hnsw.bin      — saved HNSW index (labels are rows); reconciled with the
+                        record log on load, so a stale file only costs a catch-up
+        compact.json  — only during compact(): names the staged *.compact files
+                        to move into place (finished on load after a crash)
+
+    The HNSW index is loaded or built by a background thread that only takes
+    the lock to read a chunk of vectors and to swap the finished index in;
+    queries use flat search until then.
+
+    Compressed collections search codes.npy (truncated to `truncate_dim` and/or
+    int8-quantized) and re-rank the best n_results * RERANK_OVERFETCH candidates
+    against the exact float vectors, which are only read for those rows.
+    """
+
+    def __init__(self, name: str, path: str, compression: dict | None = None):
+        self.name = name
+        self.path = path
+        self._lock = threading.RLock()
+        self._config_path = os.path.join(path, "config.json")
+        self._records_path = os.path.join(path, "records.jsonl")
+        self._hnsw_path = os.path.join(path, "hnsw.bin")
+        self._compact_marker = os.path.join(path, COMPACT_MARKER)
+
+        self.compression = normalize_compression(compression)
+        self._dim: int | None = None
+        self._arrays: dict[str, np.ndarray] = {}  # "vectors" | "codes" | "scales" -> memmap
+        self._rows = 0                            # rows [0, self._rows) are written
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: list[str] = []                 # row -> id
+        self._documents: list[str | None] = []    # row -> document
+        self._metadatas: list[dict] = []          # row -> metadata
+        self._row_of: dict[str, int] = {}         # id -> live row
+        self._hnsw = None
+        self._hnsw_unsaved = 0
+        self._hnsw_builder: threading.Thread | None = None
+        self._hnsw_generation = 0                 # Bumped when rows are renumbered; stale builds are dropped
+        self._closed = False
+
+        os.makedirs(path, exist_ok=True)
+        self._load_config(compression)
+        self._load()
+
+    # ── persistence ──
+
+    def _array_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.npy")
+
+    def _load_config(self, requested: dict | None):
+        recorded = None
+        if os.path.exists(self._config_path):
+            try:
+                with open(self._config_path, "r") as f:
+                    cfg = json.load(f)
+                recorded = normalize_compression(cfg.get("compression"))
+                self._dim = cfg.get("dim")
+            except Exception as e:
+                print(f"WARNING: Unreadable config for collection '{self.name}': {e}")
+        elif os.path.exists(self._array_path("vectors")):
+            recorded = normalize_compression(None)  # Written before compression existed
+        if recorded is None:
+            return  # New collection: use the requested settings
+        if requested is not None and normalize_compression(requested) != recorded:
+            print(
+                f"WARNING: Collection '{self.name}' keeps its recorded compression {recorded} "
+                f"(requested {normalize_compression(requested)}); re-create it to change"
+            )
+        self.compression = recorded
+
+    def _save_config(self):
+        tmp_path = self._config_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self._dim, "compression": self.compression}, f)
+        os.replace(tmp_path, self._config_path)
+
+    def _load(self):
+        self._recover_compaction()
+        for name in ARRAY_NAMES:
+            if os.path.exists(self._array_path(name)):
+                self._arrays[name] = np.load(self._array_path(name), mmap_mode="r+")
+        if self._dim is None and "vectors" in self._arrays:
+            self._dim = int(self._arrays["vectors"].shape[1])
+        if not os.path.exists(self._records_path):
+            return
+        with open(self._records_path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    # A torn final line after a crash; everything before it is intact
+                    continue
+                if rec.get("deleted"):
+                    row = self._row_of.pop(rec["id"], None)
+                    if row is not None:
+                        self._alive[row] = False
+                    continue
+                row = rec["row"]
+                self._ensure_row_slots(row + 1)
+                self._ids[row] = rec["id"]
+                self._documents[row] = rec.get("document")
+                self._metadatas[row] = rec.get("metadata") or {}
+                self._alive[row] = True
+                self._row_of[rec["id"]] = row
+                self._rows = max(self._rows, row + 1)
+
+    def _ensure_row_slots(self, n: int):
+        """Make rows [0, n) addressable. _alive grows by doubling (only its first _rows entries are meaningful)."""
+        missing = n - len(self._ids)
+        if missing > 0:
+            self._ids.extend([""] * missing)
+            self._documents.extend([None] * missing)
+            self._metadatas.extend({} for _ in range(missing))
+        if self._alive.shape[0] < n:
+            alive = np.zeros(max(n, 2 * self._alive.shape[0], INITIAL_CAPACITY), dtype=bool)
+            alive[: self._alive.shape[0]] = self._alive
+            self._alive = alive
+
+    def _ensure_capacity(self, needed_rows: int, dim: int):
+        """Grow (double) every memory-mapped array so it holds `needed_rows`."""
+        if self._dim is None:
+            self._dim = dim
+            self._save_config()
+        elif dim != self._dim:
+            raise ValueError(
+                f"Embedding dimension {dim} does not match collection '{self.name}' dimension {self._dim}"
+            )
+        for name, (dtype, tail) in self._array_specs().items():
+            current = self._arrays.get(name)
+            capacity = 0 if current is None else current.shape[0]
+            if needed_rows <= capacity:
+                continue
+            new_capacity = max(INITIAL_CAPACITY, capacity)
+            while new_capacity < needed_rows:
+                new_capacity *= 2
+            path = self._array_path(name)
+            tmp_path = path + ".tmp"
+            grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(new_capacity,) + tail)
+            if current is not None and self._rows:
+                grown[: self._rows] = current[: self._rows]
+            grown.flush()
+            del grown, current
+            self._arrays.pop(name, None)
+            os.replace(tmp_path, path)
+            self._arrays[name] = np.load(path, mmap_mode="r+")
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError(f"Collection '{self.name}' is closed")
+
+    def close(self):
+        """Save the index, flush and drop the memmaps; any later call raises ValueError."""
+        with self._lock:
+            if self._closed:
+                return
+            if self._hnsw_unsaved:
+                self._save_hnsw()
+            self._discard_hnsw()
+            for array in self._arrays.values():
+                array.flush()
+            self._arrays = {}
+            self._closed = True
+
+    def _append_records(self, records: list[dict]):
+        with open(self._records_path, "a") as f:
+            for rec in records:
+                f.write(json.dumps(rec, default=str) + "\n")
+
+    # ── compression ──
+
+    def _search_dim(self) -> int:
+        truncate_dim = self.compression["truncate_dim"]
+        return truncate_dim if truncate_dim and truncate_dim < self._dim else self._dim
+
+    def _is_compressed(self) -> bool:
+        return self.compression["quantization"] != "none" or self._search_dim() < self._dim
+
+    def _array_specs(self) -> dict[str, tuple]:
+        """Arrays this collection stores: name -> (dtype, per-row shape)."""
+        specs = {}
+        compressed = self._is_compressed()
+        if not compressed or self.compression["keep_exact"]:
+            specs["vectors"] = (np.float32, (self._dim,))
+        if compressed:
+            int8 = self.compression["quantization"] == "int8"
+            specs["codes"] = (np.int8 if int8 else np.float32, (self._search_dim(),))
+            if int8:
+                specs["scales"] = (np.float32, ())
+        return specs
+
+    def _to_search_space(self, vectors: np.ndarray) -> np.ndarray:
+        """Truncate normalized vectors to the search dimension (Matryoshka-style) and re-normalize."""
+        search_dim = self._search_dim()
+        if search_dim >= vectors.shape[1]:
+            return vectors
+        head = vectors[:, :search_dim]
+        norms = np.linalg.norm(head, axis=1, keepdims=True)
+        return (head / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+    def _encode(self, vectors: np.ndarray) -> dict[str, np.ndarray]:
+        """Turn normalized float32 vectors into the per-array rows to write."""
+        specs = self._array_specs()
+        encoded = {}
+        if "vectors" in specs:
+            encoded["vectors"] = vectors
+        if "codes" in specs:
+            search = self._to_search_space(vectors)
+            if "scales" in specs:
+                # Symmetric per-row scalar quantization: max |x| maps to 127
+                scales = np.abs(search).max(axis=1) / 127.0
+                scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+                encoded["codes"] = np.clip(np.rint(search / scales[:, None]), -127, 127).astype(np.int8)
+                encoded["scales"] = scales
+            else:
+                encoded["codes"] = search
+        return encoded
+
+    def _search_vectors(self, rows) -> np.ndarray:
+        """Float32 vectors in search space (dequantized codes when compressed) for `rows`."""
+        if not self._is_compressed():
+            return np.asarray(self._arrays["vectors"][rows])
+        codes = np.asarray(self._arrays["codes"][rows], dtype=np.float32)
+        if "scales" in self._arrays:
+            codes *= np.asarray(self._arrays["scales"][rows])[:, None]
+        return codes
+
+    def _scan(self, q: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """Scores of `q` against `rows` (or every written row) in search space."""
+        n = self._rows if rows is None else len(rows)
+        matrix = self._arrays["codes"] if self._is_compressed() else self._arrays["vectors"]
+        if matrix.dtype == np.float32:
+            return np.asarray(matrix[:n] if rows is None else matrix[rows]) @ q
+
+        # int8 codes: dequantize into a small reused buffer that stays in cache
+        scales = self._arrays["scales"]
+        sims = np.empty(n, dtype=np.float32)
+        buf = np.empty((min(SCAN_CHUNK, n), matrix.shape[1]), dtype=np.float32)
+        for lo in range(0, n, SCAN_CHUNK):
+            hi = min(lo + SCAN_CHUNK, n)
+            idx = slice(lo, hi) if rows is None else rows[lo:hi]
+            block = buf[: hi - lo]
+            np.copyto(block, matrix[idx], casting="unsafe")
+            sims[lo:hi] = (block @ q) * scales[idx]
+        return sims
+
+    def _rerank(self, rows: np.ndarray, approx: np.ndarray, q: np.ndarray, k: int):
+        """Best k of the candidate rows, re-scored exactly when exact vectors are kept."""
+        exact = self._arrays.get("vectors")
+        if self._is_compressed() and exact is not None:
+            scores = np.asarray(exact[rows]) @ q
+        else:
+            scores = approx
+        top = _top_k(scores, k)
+        return rows[top], 1.0 - scores[top].astype(np.float64)
+
+    def storage_info(self) -> dict:
+        """Compression settings and per-vector storage cost of this collection."""
+        specs = self._array_specs() if self._dim else {}
+        bytes_per_vector = {
+            name: int(np.dtype(dtype).itemsize * int(np.prod(tail)))
+            for name, (dtype, tail) in specs.items()
+        }
+        searched = "codes" if "codes" in specs else "vectors"
+        return {
+            "name": self.name,
+            "count": self.count(),
+            "dim": self._dim,
+            "search_dim": self._search_dim() if self._dim else None,
+            "compression": dict(self.compression),
+            "bytes_per_vector": bytes_per_vector,
+            # What a full scan touches (codes + scales, or the float vectors)
+            "scan_bytes_per_vector": bytes_per_vector.get(searched, 0) + bytes_per_vector.get("scales", 0),
+        }
+
+    # ── index ──
+
+    def _live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self._alive[: self._rows])
+
+    def _get_hnsw(self):
+        """The HNSW index if it is ready; otherwise None, starting a background build once the collection is large enough."""
+        if self._hnsw is not None or hnswlib is None or self._dim is None or len(self._row_of) < HNSW_MIN_ITEMS:
+            return self._hnsw
+        if self._hnsw_builder is None:
+            self._hnsw_builder = threading.Thread(
+                target=self._build_hnsw, args=(self._hnsw_generation,), name=f"hnsw-{self.name}", daemon=True,
+            )
+            self._hnsw_builder.start()
+        return None
+
+    def wait_for_index(self, timeout: float | None = None) -> bool:
+        """Block until a pending HNSW build finishes (starting one if due). True if the index is in use."""
+        with self._lock:
+            self._get_hnsw()
+            builder = self._hnsw_builder
+        if builder is not None:
+            builder.join(timeout)
+        return self._hnsw is not None
+
+    def _build_hnsw(self, generation: int):
+        """Background thread: load hnsw.bin (or start empty), add the missing rows, then swap the index in."""
+        try:
+            with self._lock:
+                if generation != self._hnsw_generation:
+                    return
+                dim, max_elements = self._search_dim(), max(self._rows * 2, 1024)
+            index = self._read_hnsw(dim, max_elements)
+            loaded = index is not None
+            if index is None:
+                index = hnswlib.Index(space="ip", dim=dim)
+                index.init_index(max_elements=max_elements, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+
+            with self._lock:
+                if generation != self._hnsw_generation:
+                    return
+                missing = self._unindexed_rows(index)
+            for lo in range(0, len(missing), HNSW_BUILD_CHUNK):
+                with self._lock:
+                    if generation != self._hnsw_generation:
+                        return
+                    rows = missing[lo: lo + HNSW_BUILD_CHUNK]
+                    rows = rows[self._alive[rows]]
+                    vectors = self._search_vectors(rows)
+                if index.get_current_count() + len(rows) > index.get_max_elements():
+                    index.resize_index(max(index.get_max_elements() * 2, index.get_current_count() + len(rows)))
+                index.add_items(vectors, rows)
+
+            with self._lock:
+                if generation != self._hnsw_generation:
+                    return
+                caught_up = self._catch_up_hnsw(index)
+                index.set_ef(HNSW_EF_SEARCH)
+                self._hnsw = index
+                self._save_hnsw()
+                if loaded:
+                    print(f"DEBUG: Loaded HNSW index for '{self.name}' (+{len(missing) + caught_up} caught up)")
+                else:
+                    print(f"DEBUG: Built HNSW index for '{self.name}' ({len(self._row_of)} vectors)")
+        except Exception as e:
+            print(f"WARNING: Could not build HNSW index for '{self.name}': {e}")
+        finally:
+            with self._lock:
+                if generation == self._hnsw_generation:
+                    self._hnsw_builder = None
+
+    def _read_hnsw(self, dim: int, max_elements: int):
+        """The saved hnsw.bin as it is on disk, or None if there is none (or it is unreadable)."""
+        if not os.path.exists(self._hnsw_path):
+            return None
+        try:
+            index = hnswlib.Index(space="ip", dim=dim)
+            index.load_index(self._hnsw_path, max_elements=max_elements, allow_replace_deleted=False)
+            return index
+        except Exception as e:
+            print(f"WARNING: Discarding HNSW index for '{self.name}': {e}")
+            return None
+
+    def _unindexed_rows(self, index) -> np.ndarray:
+        """Live rows the index does not contain (call under the lock)."""
+        indexed = np.asarray(index.get_ids_list(), dtype=np.int64)
+        in_index = np.zeros(self._rows, dtype=bool)
+        in_index[indexed[indexed < self._rows]] = True
+        return np.flatnonzero(self._alive[: self._rows] & ~in_index)
+
+    def _catch_up_hnsw(self, index) -> int:
+        """Bring index in line with the rows as they are now (call under the lock). Returns rows added."""
+        if self._rows > index.get_max_elements():
+            index.resize_index(self._rows * 2)
+        missing = self._unindexed_rows(index)
+        if len(missing):
+            index.add_items(self._search_vectors(missing), missing)
+        indexed = np.asarray(index.get_ids_list(), dtype=np.int64)
+        live = np.zeros(max(self._rows, int(indexed.max()) + 1) if len(indexed) else 0, dtype=bool)
+        live[: self._rows] = self._alive[: self._rows]
+        for row in indexed[~live[indexed]]:
+            try:
+                index.mark_deleted(int(row))
+            except RuntimeError:
+                pass  # Already marked
+        return len(missing)
+
+    def _discard_hnsw(self):
+        """Drop the index and abandon any build in progress (rows are about to be renumbered or removed)."""
+        with self._lock:
+            self._hnsw = None
+            self._hnsw_builder = None
+            self._hnsw_generation += 1
+
+    def _save_hnsw(self):
+        if self._hnsw is None:
+            return
+        try:
+            tmp_path = self._hnsw_path + ".tmp"
+            self._hnsw.save_index(tmp_path)
+            os.replace(tmp_path, self._hnsw_path)
+            self._hnsw_unsaved = 0
+        except Exception as e:
+            print(f"WARNING: Could not save HNSW index for '{self.name}': {e}")
+
+    # ── API ──
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError("embeddings must be a list of vectors, one per id")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+
+        with self._lock:
+            self._check_open()
+            # Re-adding an id replaces the old record
+            replaced = [i for i in ids if i in self._row_of]
+            if replaced:
+                self.delete(ids=replaced)
+
+            start = self._rows
+            self._ensure_capacity(start + len(ids), vectors.shape[1])
+            self._write_rows(start, self._encode(vectors), ids, documents, metadatas)
+
+            if self._hnsw is not None:
+                if self._rows > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(self._rows * 2)
+                new_rows = np.arange(start, self._rows)
+                self._hnsw.add_items(self._search_vectors(new_rows), new_rows)
+                self._hnsw_unsaved += len(ids)
+                if self._hnsw_unsaved >= HNSW_SAVE_EVERY:
+                    self._save_hnsw()
+            else:
+                self._get_hnsw()  # Start building once the collection is large enough
+
+    def _write_rows(self, start: int, encoded: dict[str, np.ndarray], ids, documents, metadatas):
+        """Write encoded arrays and records for rows [start, start + len(ids))."""
+        end = start + len(ids)
+        for name, values in encoded.items():
+            self._arrays[name][start:end] = values
+            self._arrays[name].flush()
+
+        records = []
+        self._ensure_row_slots(end)
+        for offset, doc_id in enumerate(ids):
+            row = start + offset
+            self._ids[row] = doc_id
+            self._documents[row] = documents[offset]
+            self._metadatas[row] = metadatas[offset] or {}
+            self._alive[row] = True
+            self._row_of[doc_id] = row
+            records.append({"id": doc_id, "row": row, "document": documents[offset], "metadata": metadatas[offset] or {}})
+        self._rows = end
+        self._append_records(records)
+
+    def delete(self, ids=None):
+        if not ids:
+            return
+        with self._lock:
+            self._check_open()
+            tombstones = []
+            for doc_id in ids:
+                row = self._row_of.pop(doc_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                tombstones.append({"id": doc_id, "deleted": True})
+                if self._hnsw is not None:
+                    self._hnsw.mark_deleted(row)
+            self._append_records(tombstones)
+
+            # Reclaim space once most rows are dead
+            if self._rows > INITIAL_CAPACITY and len(self._row_of) * 2 < self._rows:
+                self.compact()
+
+    def _select_rows(self, where: dict | None) -> np.ndarray:
+        rows = self._live_rows()
+        if where:
+            rows = np.array([r for r in rows if _match_where(self._metadatas[r], where)], dtype=np.int64)
+        return rows
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None):
+        include = include or ["documents", "metadatas", "distances"]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+
+        out: dict[str, Any] = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        with self._lock:
+            self._check_open()
+            if self._dim is not None and queries.shape[1] != self._dim:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match collection '{self.name}' dimension {self._dim}"
+                )
+            index = None if where else self._get_hnsw()
+            # Unfiltered flat search scans the contiguous prefix of the memmap (no gather copy)
+            # and masks dead rows; filtered search gathers only the matching rows.
+            rows = None if index is not None or not where else self._select_rows(where)
+            available = len(self._row_of) if rows is None else len(rows)
+            k = min(n_results, available)
+            fetch = min(k * RERANK_OVERFETCH, available) if self._dim and self._is_compressed() else k
+
+            for q in queries:
+                if k <= 0:
+                    top_rows, top_dist = np.zeros(0, dtype=np.int64), np.zeros(0)
+                else:
+                    q_search = self._to_search_space(q[None, :])[0]
+                    if index is not None:
+                        labels, dists = index.knn_query(q_search, k=fetch)
+                        candidates, approx = labels[0].astype(np.int64), 1.0 - dists[0]
+                    elif rows is None:
+                        sims = self._scan(q_search)
+                        sims[~self._alive[: self._rows]] = -np.inf
+                        candidates = _top_k(sims, fetch)
+                        approx = sims[candidates]
+                    else:
+                        sims = self._scan(q_search, rows)
+                        top = _top_k(sims, fetch)
+                        candidates, approx = rows[top], sims[top]
+                    top_rows, top_dist = self._rerank(candidates, approx, q, k)
+
+                out["ids"].append([self._ids[r] for r in top_rows])
+                out["documents"].append([self._documents[r] for r in top_rows])
+                out["metadatas"].append([self._metadatas[r] for r in top_rows])
+                out["distances"].append(top_dist.tolist())
+
+        for key in ("documents", "metadatas", "distances"):
+            if key not in include:
+                out[key] = None
+        return out
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            self._check_open()
+            if ids is not None:
+                rows = [self._row_of[i] for i in ids if i in self._row_of]
+                rows = [r for r in rows if _match_where(self._metadatas[r], where)]
+            else:
+                rows = self._select_rows(where).tolist()
+            # Rows come back in insertion order, so offset paging is stable
+            if offset:
+                rows = rows[offset:]
+            if limit is not None:
+                rows = rows[:limit]
+            out: dict[str, Any] = {
+                "ids": [self._ids[r] for r in rows],
+                "documents": [self._documents[r] for r in rows] if "documents" in include else None,
+                "metadatas": [self._metadatas[r] for r in rows] if "metadatas" in include else None,
+            }
+            if "embeddings" in include:
+                if not rows:
+                    out["embeddings"] = np.zeros((0, 0), dtype=np.float32)
+                elif "vectors" in self._arrays:
+                    out["embeddings"] = np.asarray(self._arrays["vectors"][rows])
+                else:
+                    # Exact vectors were not kept: best available is the search-space vector
+                    out["embeddings"] = self._search_vectors(np.asarray(rows))
+        return out
+
+    def compact(self):
+        """
+        Rewrite the files without deleted rows (arrays and record log).
+
+        The compacted files are staged next to the originals (*.compact); once
+        all are written, compact.json marks them complete and they are moved
+        into place. A crash before the marker leaves the old files untouched,
+        one after it is rolled forward by the next load.
+        """
+        with self._lock:
+            self._check_open()
+            rows = self._live_rows()
+            capacity = INITIAL_CAPACITY
+            while capacity < len(rows):
+                capacity *= 2
+            staged = []
+            for name, arr in self._arrays.items():
+                tmp_path = self._array_path(name) + COMPACT_SUFFIX
+                out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=arr.dtype, shape=(capacity,) + arr.shape[1:])
+                out[: len(rows)] = arr[rows]
+                out.flush()
+                del out
+                staged.append(os.path.basename(self._array_path(name)))
+            with open(self._records_path + COMPACT_SUFFIX, "w") as f:
+                for new_row, row in enumerate(rows):
+                    rec = {"id": self._ids[row], "row": new_row, "document": self._documents[row], "metadata": self._metadatas[row]}
+                    f.write(json.dumps(rec, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append(os.path.basename(self._records_path))
+
+            # Rows are renumbered: the index goes before anything is replaced
+            self._discard_hnsw()
+            if os.path.exists(self._hnsw_path):
+                os.remove(self._hnsw_path)
+            tmp_marker = self._compact_marker + ".tmp"
+            with open(tmp_marker, "w") as f:
+                json.dump({"files": staged}, f)
+            os.replace(tmp_marker, self._compact_marker)
+
+            ids = [self._ids[r] for r in rows]
+            documents = [self._documents[r] for r in rows]
+            metadatas = [self._metadatas[r] for r in rows]
+            self._arrays = {}  # Release the memmaps before their files are replaced
+            self._recover_compaction()
+            for name in ARRAY_NAMES:
+                if os.path.exists(self._array_path(name)):
+                    self._arrays[name] = np.load(self._array_path(name), mmap_mode="r+")
+            self._rows, self._alive = 0, np.zeros(0, dtype=bool)
+            self._ids, self._documents, self._metadatas, self._row_of = [], [], [], {}
+            self._ensure_row_slots(len(ids))
+            self._ids[: len(ids)], self._documents[: len(ids)], self._metadatas[: len(ids)] = ids, documents, metadatas
+            self._alive[: len(ids)] = True
+            self._row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+            self._rows = len(ids)
+
+    def _recover_compaction(self):
+        """Move staged compaction files into place if compact.json says they are complete; drop them otherwise."""
+        staged = set()
+        if os.path.exists(self._compact_marker):
+            try:
+                with open(self._compact_marker, "r") as f:
+                    staged = set(json.load(f).get("files", []))
+            except Exception as e:
+                print(f"WARNING: Unreadable compaction marker for '{self.name}': {e}")
+        for name in [n for n in os.listdir(self.path) if n.endswith(COMPACT_SUFFIX)]:
+            final = name[: -len(COMPACT_SUFFIX)]
+            if final in staged:
+                os.replace(os.path.join(self.path, name), os.path.join(self.path, final))
+            else:
+                os.remove(os.path.join(self.path, name))
+        if os.path.exists(self._compact_marker):
+            os.remove(self._compact_marker)
+
+
+class LocalVectorStore(VectorStore):
+    """Directory-per-collection registry for LocalCollection."""
+
+    def __init__(self, path: str, compression: dict | None = None):
+        self.path = path
+        # Applied to collections created from now on; existing ones keep their recorded settings
+        self.compression = compression
+        os.makedirs(path, exist_ok=True)
+        self._collections: dict[str, LocalCollection] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _collection_path(self, name: str) -> str:
+        """Directory of a collection; raises ValueError for names that are not valid collection names."""
+        if not isinstance(name, str) or not COLLECTION_NAME_RE.match(name) or ".." in name:
+            raise ValueError(
+                f"Invalid collection name {name!r}: expected 3-512 characters from [A-Za-z0-9._-], "
+                "starting and ending with a letter or digit, without '..'"
+            )
+        root = os.path.realpath(self.path)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.dirname(path) != root:
+            raise ValueError(f"Invalid collection name {name!r}: resolves outside the vector store")
+        return path
+
+    def get_or_create_collection(self, name: str) -> LocalCollection:
+        path = self._collection_path(name)
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Vector store {self.path} is closed")
+            if name not in self._collections:
+                self._collections[name] = LocalCollection(name, path, self.compression)
+            return self._collections[name]
+
+    def get_collection(self, name: str) -> LocalCollection:
+        if name not in self._collections and not os.path.isdir(self._collection_path(name)):
+            raise ValueError(f"Collection {name} does not exist.")
+        return self.get_or_create_collection(name)
+
+    def create_collection(self, name: str) -> LocalCollection:
+        if name in self._collections or os.path.isdir(self._collection_path(name)):
+            raise ValueError(f"Collection {name} already exists.")
+        return self.get_or_create_collection(name)
+
+    def list_collections(self) -> list:
+        return [self.get_or_create_collection(n) for n in self.list_collection_names()]
+
+    def list_collection_names(self) -> list[str]:
+        """Names of the collections on disk, without loading any of them."""
+        names = set(self._collections)
+        for d in os.listdir(self.path):
+            try:
+                if os.path.isdir(self._collection_path(d)):
+                    names.add(d)
+            except ValueError:
+                pass  # Not a collection directory (or a link out of the store)
+        return sorted(names)
+
+    def delete_collection(self, name: str):
+        path = self._collection_path(name)
+        with self._lock:
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._discard_hnsw()
+            if not os.path.isdir(path):
+                raise ValueError(f"Collection {name} does not exist.")
+            shutil.rmtree(path)
+
+    def close(self):
+        """Close every open collection, so a new store on this path is the only writer."""
+        with self._lock:
+            self._closed = True
+            collections, self._collections = list(self._collections.values()), {}
+        for collection in collections:
+            collection.close()
+
+
+def create_vector_store(backend: str, path: str, compression: dict | None = None) -> VectorStore:
+    """Instantiate a vector store backend by name ("chroma" | "local")."""
+    backend = (backend or "chroma").strip().lower()
+    if backend == "local":
+        return LocalVectorStore(path, compression)
+    if backend != "chroma":
+        print(f"WARNING: Unknown vector backend '{backend}', falling back to chroma")
+    try:
+        store = ChromaVectorStore(path)
+    except ImportError:
+        print("WARNING: chromadb is not installed, using the local vector backend")
+        return LocalVectorStore(path, compression)
+    if compression and normalize_compression(compression) != normalize_compression(None):
+        print("WARNING: Vector compression is only supported by the local backend; storing float32 in Chroma")
+    return store
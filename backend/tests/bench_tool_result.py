@@ -0,0 +1,123 @@
+"""
+Benchmark: post-processing a multi-MB tool output, re-parsed per handler vs ToolResult.
+
+"report" follows a custom report tool through the chat loop:
+  before: json.dumps of the response, json.loads in _extract_and_persist_ids
+          and again for the report, json.dumps per report to measure it, and
+          json.dumps of the context-safe output
+  after:  ToolResult.from_value once; IDs, item sizes and kept reports come
+          from the envelope
+"mcp" follows an MCP tool's JSON output:
+  before: json.loads in the chat loop, _extract_and_persist_ids,
+          add_tool_execution, and summarize_tool_execution for the blob
+          summary and the recent-executions buffer
+  after:  one parse, shared by all of them
+
+Usage:
+    python tests/bench_tool_result.py [--mb 2 8 32] [--repeat 3]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.tool_result import ToolResult
+from core.memory_policy import summarize_tool_execution
+
+REPORT_SIZE_THRESHOLD = 30000
+SUMMARY = {"report": "summary", "row_count": 0, "columns": []}
+
+
+def _rows(target_bytes: int) -> list[dict]:
+    row = {"facility_id": "F-001", "date": "2024-01-01", "metric": "throughput", "value": 42.5, "note": "ok " * 10}
+    count = max(1, target_bytes // len(json.dumps(row)))
+    return [{**row, "row": i} for i in range(count)]
+
+
+def _report_response(size_mb: float) -> list[dict]:
+    """Three reports: two large (summarized) and one that fits in context."""
+    big = int(size_mb * 1024 * 1024 / 2)
+    return [
+        {"report": "daily", "data": _rows(big)},
+        {"report": "weekly", "data": _rows(big)},
+        {"report": "totals", "data": _rows(10000)},
+    ]
+
+
+def report_before(json_resp):
+    raw_output = json.dumps(json_resp)
+    json.loads(raw_output)                    # _extract_and_persist_ids
+    parsed_output = json.loads(raw_output)    # report handling
+    context_safe = []
+    for report_obj in parsed_output:
+        too_large = len(json.dumps(report_obj)) > REPORT_SIZE_THRESHOLD
+        context_safe.append(SUMMARY if too_large else report_obj)
+    return json.dumps(context_safe)
+
+
+def report_after(json_resp):
+    raw_output = ToolResult.from_value(json_resp)
+    raw_output.ids                             # _extract_and_persist_ids
+    parsed_output = raw_output.value
+    context_safe = []
+    for idx, report_obj in enumerate(parsed_output):
+        too_large = raw_output.item_size(idx) > REPORT_SIZE_THRESHOLD
+        context_safe.append(SUMMARY if too_large else report_obj)
+    return ToolResult.from_items(context_safe, [
+        raw_output.item_raw(i) if item is parsed_output[i] else json.dumps(item)
+        for i, item in enumerate(context_safe)
+    ])
+
+
+def mcp_before(text):
+    json.loads(text)                                # chat loop intents
+    json.loads(text)                                # _extract_and_persist_ids
+    json.loads(text)                                # add_tool_execution ID metadata
+    summarize_tool_execution("report", {}, text)    # blob summary
+    summarize_tool_execution("report", {}, text)    # recent tool executions
+
+
+def mcp_after(text):
+    output = ToolResult(text)
+    output.value
+    output.ids
+    output.value
+    summarize_tool_execution("report", {}, output)
+    summarize_tool_execution("report", {}, output)
+
+
+def _time_ms(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, nargs="+", default=[2, 8, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<8} {'MB':>6} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for size_mb in args.mb:
+        json_resp = _report_response(size_mb)
+        assert json.loads(report_after(json_resp)) == json.loads(report_before(json_resp))
+        before = _time_ms(report_before, json_resp, args.repeat)
+        after = _time_ms(report_after, json_resp, args.repeat)
+        print(f"{'report':<8} {size_mb:>6g} {before:>10.1f} {after:>9.1f} {before / after:>7.1f}x")
+
+        text = json.dumps({"report_id": "R-1", "rows": _rows(int(size_mb * 1024 * 1024))})
+        before = _time_ms(mcp_before, text, args.repeat)
+        after = _time_ms(mcp_after, text, args.repeat)
+        print(f"{'mcp':<8} {size_mb:>6g} {before:>10.1f} {after:>9.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: add/query latency of the vector store backends.
+
+Compares Chroma against the local NumPy backend in flat mode and in HNSW mode
+on random vectors. Single-record adds mirror how MemoryStore writes memories.
+
+Usage:
+    python tests/bench_vector_store.py [--dim 1024] [--sizes 500 5000 20000]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.vector_store as vs
+
+
+def _bench(make_store, size, dim, n_adds=100, n_queries=100):
+    rng = np.random.default_rng(0)
+    base = rng.normal(size=(size, dim)).astype(np.float32)
+    extra = rng.normal(size=(n_adds, dim)).astype(np.float32)
+    queries = rng.normal(size=(n_queries, dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        coll = make_store(tmp).get_or_create_collection("bench")
+        # Bulk load in batches (Chroma caps batch size)
+        for start in range(0, size, 1000):
+            end = min(start + 1000, size)
+            coll.add(
+                ids=[f"b{i}" for i in range(start, end)],
+                embeddings=base[start:end].tolist(),
+                documents=[f"doc {i}" for i in range(start, end)],
+                metadatas=[{"session_id": f"s{i % 10}", "timestamp": float(i)} for i in range(start, end)],
+            )
+
+        t0 = time.perf_counter()
+        for i in range(n_adds):
+            coll.add(
+                ids=[f"x{i}"], embeddings=[extra[i].tolist()],
+                documents=[f"extra {i}"], metadatas=[{"session_id": "s0", "timestamp": float(size + i)}],
+            )
+        add_ms = (time.perf_counter() - t0) * 1000 / n_adds
+
+        # The HNSW index builds in the background; time how long until queries use it
+        t0 = time.perf_counter()
+        if hasattr(coll, "wait_for_index"):
+            coll.wait_for_index()
+        index_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        coll.query(query_embeddings=[queries[0].tolist()], n_results=5)
+        first_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        for q in queries:
+            coll.query(query_embeddings=[q.tolist()], n_results=5)
+        query_ms = (time.perf_counter() - t0) * 1000 / n_queries
+
+        t0 = time.perf_counter()
+        for q in queries:
+            coll.query(query_embeddings=[q.tolist()], n_results=5, where={"session_id": "s3"})
+        filtered_ms = (time.perf_counter() - t0) * 1000 / n_queries
+
+    return add_ms, index_ms, first_ms, query_ms, filtered_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 20000])
+    args = parser.parse_args()
+
+    backends = {}
+    try:
+        import chromadb  # noqa: F401
+        backends["chroma"] = vs.ChromaVectorStore
+    except ImportError:
+        print("chromadb not installed — skipping Chroma")
+    backends["local-flat"] = vs.LocalVectorStore
+    if vs.hnswlib is not None:
+        backends["local-hnsw"] = vs.LocalVectorStore
+    else:
+        print("hnswlib not installed — skipping HNSW")
+
+    print(f"dim={args.dim}")
+    print(f"{'backend':<12} {'size':>7} {'add ms':>9} {'index ms':>9} {'1st query':>10} {'query ms':>9} {'filtered':>9}")
+    for size in args.sizes:
+        for name, factory in backends.items():
+            vs.HNSW_MIN_ITEMS = 0 if name == "local-hnsw" else 10**12
+            add_ms, index_ms, first_ms, query_ms, filtered_ms = _bench(factory, size, args.dim)
+            print(f"{name:<12} {size:>7} {add_ms:>9.3f} {index_ms:>9.1f} {first_ms:>10.2f} {query_ms:>9.3f} {filtered_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+from contextlib import AsyncExitStack
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.agent_pool import AgentPool
+from core.lazy_agent import LazyAgentSession
+from core.mcp_client import MCPClientManager
+from tests.test_mcp_startup import SERVER_SCRIPT, _params
+
+
+def _pid(result) -> str:
+    return result.content[0].text.split(":")[1]
+
+
+def test_concurrent_calls_spread_over_workers():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "agent.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            manifests = os.path.join(tmp, "manifests")
+            # Write the manifest, so the pool's workers start lazily
+            first = LazyAgentSession("fixture", script, _params(script, TOOL="slow"), manifest_dir=manifests)
+            assert await first.prepare()
+            await first.stop()
+
+            pool = AgentPool("fixture", [
+                LazyAgentSession("fixture", script, _params(script, TOOL="slow"), manifest_dir=manifests)
+                for _ in range(2)
+            ])
+            try:
+                assert await pool.prepare() and not pool.running
+                assert [t.name for t in (await pool.list_tools()).tools] == ["slow"]
+
+                # One call at a time: only one worker is spawned
+                await pool.call_tool("slow", {})
+                await pool.call_tool("slow", {})
+                assert [w.running for w in pool.workers] == [True, False]
+
+                # Two concurrent blocking calls run in two processes, not one after the other
+                # (serially they would take 4 s; the margin covers spawning the second worker)
+                started = time.perf_counter()
+                results = await asyncio.gather(*(pool.call_tool("slow", {"delay": 2}) for _ in range(2)))
+                assert time.perf_counter() - started < 3.5
+                assert len({_pid(r) for r in results}) == 2
+
+                # More calls than workers: the excess queues, and the metrics show it
+                await asyncio.gather(*(pool.call_tool("slow", {"delay": 0.3}) for _ in range(4)))
+                status = pool.status()
+                assert status["peak_in_flight"] == 4 and status["queued_calls"] == 2
+                assert status["in_flight"] == 0 and status["queue_depth"] == 0
+                assert [w["routed_calls"] for w in status["workers"]] == [5, 3]
+            finally:
+                await pool.stop()
+            assert not pool.running
+
+    asyncio.run(run())
+
+
+def test_without_manifest_only_the_first_worker_starts():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "agent.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            manifests = os.path.join(tmp, "manifests")
+            # No manifest yet, and lazy_agents off: still one process until calls overlap
+            pool = AgentPool("fixture", [
+                LazyAgentSession("fixture", script, _params(script, TOOL="slow"), lazy=False, manifest_dir=manifests)
+                for _ in range(3)
+            ])
+            try:
+                assert await pool.prepare()
+                assert [w.running for w in pool.workers] == [True, False, False]
+                assert all([t.name for t in w.tools] == ["slow"] for w in pool.workers)
+                assert pool.workers[1].timeline["status"] == "deferred"
+
+                await asyncio.gather(*(pool.call_tool("slow", {"delay": 0.3}) for _ in range(2)))
+                assert [w.running for w in pool.workers] == [True, True, False]
+            finally:
+                await pool.stop()
+
+    asyncio.run(run())
+
+
+def test_external_server_workers():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            async with AsyncExitStack() as stack:
+                manager = MCPClientManager(stack)
+                manager.servers_config = [
+                    {"name": "ext", "command": sys.executable, "args": [script], "env": {"TOOL": "ext_tool"}, "workers": 2},
+                ]
+                sessions = await manager.connect_all()
+                pool = sessions["ext"]
+                assert isinstance(pool, AgentPool) and len(pool.workers) == 2
+                assert [t.name for t in manager.connections["ext"].tools] == ["ext_tool"]
+                results = await asyncio.gather(*(pool.call_tool("ext_tool", {"delay": 0.5}) for _ in range(2)))
+                assert len({_pid(r) for r in results}) == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_spread_over_workers()
+    test_without_manifest_only_the_first_worker_starts()
+    test_external_server_workers()
+    print("✅ Agent pool tests passed")
@@ -0,0 +1,120 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.blob_store import BlobStore
+from core.memory import MemoryStore, BLOB_THRESHOLD_CHARS
+from core.memory_policy import OUTPUT_SUMMARY_MARKER
+
+
+def _embed(text):
+    return [float((hash(text) >> i) % 7 + 1) for i in range(8)]
+
+
+def _blob_files(root: str) -> list[str]:
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def test_blobs_are_scoped_to_the_store_and_removed_with_their_records():
+    with tempfile.TemporaryDirectory() as tmp_a, tempfile.TemporaryDirectory() as tmp_b:
+        store_a = MemoryStore(storage_path=tmp_a, embed_fn=_embed, backend="local")
+        store_b = MemoryStore(storage_path=tmp_b, embed_fn=_embed, backend="local")
+        assert store_a.blob_store.root == os.path.join(tmp_a, "blobs")
+
+        big = "row " * BLOB_THRESHOLD_CHARS
+        store_a.add_tool_execution("s1", "report", {}, big + "a", policy="embed")
+        store_a.add_tool_execution("s1", "report", {}, big + "a", policy="store")  # Same blob, second record
+        store_b.add_tool_execution("s1", "report", {}, big + "b", policy="embed")
+        assert len(_blob_files(store_a.blob_store.root)) == 1
+        assert len(_blob_files(store_b.blob_store.root)) == 1
+
+        # Clearing one store leaves the other's blobs alone
+        assert store_a.clear_memory()
+        assert _blob_files(store_a.blob_store.root) == []
+        assert len(_blob_files(store_b.blob_store.root)) == 1
+
+        # Dropping a collection removes blobs only it referenced
+        store_b.add_tool_execution("s1", "report", {}, big + "c", policy="store")
+        store_b.write_collection = store_b.client.get_or_create_collection("chat_history_v9")
+        store_b.add_tool_execution("s1", "report", {}, big + "c", policy="embed")
+        store_b.add_tool_execution("s1", "report", {}, big + "d", policy="embed")
+        assert len(_blob_files(store_b.blob_store.root)) == 3
+        store_b.write_collection = store_b.collection
+        store_b._drop_collection("chat_history_v9")
+        assert len(_blob_files(store_b.blob_store.root)) == 2  # "c" is still referenced from tool_log
+
+
+def test_put_get_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        blobs = BlobStore(tmp)
+        text = "naïve résumé " * 500
+        ref = blobs.put(text)
+        assert ref.startswith("sha256:") and len(ref) == len("sha256:") + 64
+        assert blobs.put(text) == ref  # Content-addressed: stored once
+        assert len(_blob_files(tmp)) == 1
+        assert blobs.get(ref) == text
+        assert blobs.delete(ref) and blobs.get(ref) is None
+        assert not blobs.delete(ref)
+
+
+def test_threshold_boundary():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(storage_path=tmp, embed_fn=_embed, backend="local")
+        at_threshold = "x" * BLOB_THRESHOLD_CHARS
+        store.add_tool_execution("s1", "at", {}, at_threshold, policy="store")
+        store.add_tool_execution("s1", "over", {}, at_threshold + "y", policy="store")
+
+        metas = {m["tool_name"]: m for m in store.log_collection.get(include=["metadatas"])["metadatas"]}
+        assert "blob_ref" not in metas["at"]
+        assert metas["over"]["output_chars"] == BLOB_THRESHOLD_CHARS + 1
+        assert store.blob_store.get(metas["over"]["blob_ref"]) == at_threshold + "y"
+
+
+def _store_with_blob(tmp: str):
+    store = MemoryStore(storage_path=tmp, embed_fn=_embed, backend="local")
+    output = '{"report_id": "R-1", "rows": "' + "row " * BLOB_THRESHOLD_CHARS + '"}'
+    store.add_tool_execution("s1", "report", {"day": 1}, output, policy="embed")
+    ref = store.collection.get(include=["metadatas"])["metadatas"][0]["blob_ref"]
+    return store, output, ref
+
+
+def test_query_rehydrates_blob_ref():
+    with tempfile.TemporaryDirectory() as tmp:
+        store, output, _ = _store_with_blob(tmp)
+        stored = store.collection.get(include=["documents"])["documents"][0]
+        assert OUTPUT_SUMMARY_MARKER in stored and len(stored) < len(output)
+
+        memories = store.query_memory("report R-1", n_results=1)
+        assert memories == [f'tool: Tool: report\nArguments: {{"day": 1}}\nOutput: {output}']
+
+
+def test_missing_or_corrupt_blob_falls_back_to_summary():
+    with tempfile.TemporaryDirectory() as tmp:
+        store, output, ref = _store_with_blob(tmp)
+        stored = store.collection.get(include=["documents"])["documents"][0]
+        (path,) = [os.path.join(d, n) for d, _, names in os.walk(store.blob_store.root) for n in names]
+
+        with open(path, "wb") as f:
+            f.write(b"not a compressed blob")
+        assert store.blob_store.get(ref) is None
+        assert store.query_memory("report R-1", n_results=1) == [f"tool: {stored}"]
+
+        os.remove(path)
+        assert store.blob_store.get(ref) is None
+        assert store.query_memory("report R-1", n_results=1) == [f"tool: {stored}"]
+
+        # Malformed refs never resolve to a path
+        assert store.blob_store.get("sha256:../../etc/passwd") is None
+        assert store.blob_store.get("md5:" + "0" * 64) is None
+
+
+if __name__ == "__main__":
+    test_blobs_are_scoped_to_the_store_and_removed_with_their_records()
+    test_put_get_round_trip()
+    test_threshold_boundary()
+    test_query_rehydrates_blob_ref()
+    test_missing_or_corrupt_blob_falls_back_to_summary()
+    print("✅ Blob store tests passed")
@@ -0,0 +1,171 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+from datetime import timedelta
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.deadlines import Deadline, ToolTimeoutError, call_tool_with_deadline, stream_until_disconnect, tool_timeout_s
+from core.mcp_client import MCPServerConnection
+from tests.test_mcp_startup import SERVER_SCRIPT, _params
+
+
+def test_timeout_precedence():
+    settings = {"tool_timeouts": {"visit_page": 90, "sql": 20}}
+    assert tool_timeout_s("visit_page", "browser", settings) == 90
+    assert tool_timeout_s("run_sql_query", "sql", settings) == 20
+    assert tool_timeout_s("visit_page", "browser") == 45
+    assert tool_timeout_s("search_web", "browser") == 30
+    assert tool_timeout_s("anything", "ext_mcp_x") == 120
+
+
+def test_timed_out_call_is_cancelled_on_the_server():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            marker = os.path.join(tmp, "cancelled")
+            connection = MCPServerConnection("fixture", _params(script, TOOL="t", CANCEL_MARKER=marker))
+            assert await connection.start()
+            try:
+                settings = {"tool_timeouts": {"t": 0.5}}
+                started = time.perf_counter()
+                try:
+                    await call_tool_with_deadline(connection, "fixture", "t", {"wait": 30}, Deadline(60), settings)
+                    assert False, "expected a timeout"
+                except ToolTimeoutError as e:
+                    assert "tool timeout" in str(e)
+                assert time.perf_counter() - started < 2
+                for _ in range(40):
+                    if os.path.exists(marker):
+                        break
+                    await asyncio.sleep(0.05)
+                assert os.path.exists(marker) and connection.stats["cancelled_calls"] == 1
+
+                # The request deadline caps the tool's own timeout
+                try:
+                    await call_tool_with_deadline(connection, "fixture", "t", {"wait": 30}, Deadline(0.3))
+                    assert False, "expected a timeout"
+                except ToolTimeoutError as e:
+                    assert "request deadline" in str(e)
+
+                # The session is still usable afterwards
+                result = await call_tool_with_deadline(connection, "fixture", "t", {}, Deadline(60))
+                assert not result.isError
+            finally:
+                await connection.stop()
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_of_concurrent_calls():
+    """The cancellation carries the request id of the call that was cancelled, not a neighbour's."""
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            marker = os.path.join(tmp, "cancelled_")
+            connection = MCPServerConnection("fixture", _params(script, TOOL="t", CANCEL_MARKER=marker))
+            assert await connection.start()
+            try:
+                calls = {
+                    tag: asyncio.create_task(connection.call_tool("t", {"wait": wait, "tag": tag}))
+                    for tag, wait in (("a", 1), ("b", 30), ("c", 1))
+                }
+                await asyncio.sleep(0.3)
+                calls["b"].cancel()
+                for tag in ("a", "c"):
+                    result = await calls[tag]
+                    assert not result.isError, result
+                try:
+                    await calls["b"]
+                    assert False, "expected cancellation"
+                except asyncio.CancelledError:
+                    pass
+                for _ in range(40):
+                    if os.path.exists(marker + "b"):
+                        break
+                    await asyncio.sleep(0.05)
+                assert sorted(os.listdir(tmp)) == ["cancelled_b", "server.py"]
+            finally:
+                await connection.stop()
+
+    asyncio.run(run())
+
+
+def test_disconnect_cancels_in_flight_work():
+    class FakeRequest:
+        def __init__(self):
+            self.gone = False
+
+        async def is_disconnected(self):
+            return self.gone
+
+    async def run():
+        request = FakeRequest()
+        progress = []
+
+        async def events():
+            yield "status"
+            try:
+                await asyncio.sleep(30)  # A long LLM or tool call
+                progress.append("finished")
+            except asyncio.CancelledError:
+                progress.append("cancelled")
+                raise
+            yield "never"
+
+        received = []
+        started = time.perf_counter()
+
+        async def consume():
+            async for event in stream_until_disconnect(request, events(), poll_s=0.05):
+                received.append(event)
+                request.gone = True
+
+        await consume()
+        assert received == ["status"] and progress == ["cancelled"]
+        assert time.perf_counter() - started < 2
+
+    asyncio.run(run())
+
+
+def test_timeout_without_request_id_skips_the_cancel_notice():
+    """A ClientSession without the private _request_id counter still times out, just without notifications/cancelled."""
+    class _SessionWithoutCounter:
+        def __init__(self):
+            self.notifications = []
+
+        async def call_tool(self, name, arguments, *args, **kwargs):
+            await asyncio.sleep(30)
+
+        async def send_notification(self, notification):
+            self.notifications.append(notification)
+
+    async def run():
+        connection = MCPServerConnection("fixture", _params("unused.py"))
+        session = _SessionWithoutCounter()
+        started = time.perf_counter()
+        try:
+            await connection._call_tool(session, "t", {}, timedelta(seconds=0.2))
+            assert False, "expected a timeout"
+        except TimeoutError:
+            pass
+        assert time.perf_counter() - started < 2
+        assert session.notifications == [] and connection.stats["cancelled_calls"] == 1
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_timeout_precedence()
+    test_timed_out_call_is_cancelled_on_the_server()
+    test_cancelling_one_of_concurrent_calls()
+    test_disconnect_cancels_in_flight_work()
+    test_timeout_without_request_id_skips_the_cancel_notice()
+    print("✅ Deadline tests passed")
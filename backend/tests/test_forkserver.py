@@ -0,0 +1,267 @@
+import sys
+import os
+import time
+import signal
+import socket
+import asyncio
+import subprocess
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import StdioServerParameters
+
+from core.forkserver import ForkServer, fork_server_supported
+from core.mcp_client import MCPServerConnection
+from tests.test_mcp_startup import SERVER_SCRIPT, _params
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env(**extra) -> dict:
+    return {**os.environ, "PYTHONPATH": BACKEND_ROOT, **extra}
+
+
+def _forked_params(fork_server: ForkServer, script: str, **env) -> StdioServerParameters:
+    return StdioServerParameters(command=sys.executable, args=fork_server.launcher_args(script), env=_env(**env))
+
+
+def _ppid(pid: int) -> int:
+    with open(f"/proc/{pid}/stat") as f:
+        return int(f.read().rsplit(")", 1)[1].split()[1])
+
+
+def _memory_kb(pid: int) -> tuple[int, int]:
+    """(RSS, PSS) of a process in kB; PSS splits shared pages between the processes that map them."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def _launcher_pids(sock_path: str) -> list[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        if b"launch" in args and sock_path.encode() in args:
+            pids.append(int(entry))
+    return pids
+
+
+def _write_script(tmp: str) -> str:
+    script = os.path.join(tmp, "server.py")
+    with open(script, "w") as f:
+        f.write(SERVER_SCRIPT)
+    return script
+
+
+def test_agent_runs_forked_from_fork_server():
+    if not fork_server_supported():
+        return
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = _write_script(tmp)
+            fork_server = ForkServer(env=_env(), sock_path=os.path.join(tmp, "fs.sock"))
+            fork_server.start()
+            try:
+                connection = MCPServerConnection("forked", _forked_params(fork_server, script, TOOL="forked_tool"), timeout_s=30)
+                assert await connection.start(), connection.error
+                assert [t.name for t in connection.tools] == ["forked_tool"]
+                result = await connection.call_tool("forked_tool", {})
+                pid = int(result.content[0].text.split(":")[1])
+                assert _ppid(pid) == fork_server.process.pid
+
+                # Closing the session ends the agent and its launcher
+                await connection.stop()
+                for _ in range(50):
+                    if not os.path.exists(f"/proc/{pid}") and not _launcher_pids(fork_server.sock_path):
+                        break
+                    await asyncio.sleep(0.1)
+                assert not os.path.exists(f"/proc/{pid}")
+                assert not _launcher_pids(fork_server.sock_path)
+            finally:
+                fork_server.stop()
+
+    asyncio.run(run())
+
+
+def test_killed_launcher_takes_agent_down():
+    if not fork_server_supported():
+        return
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = _write_script(tmp)
+            fork_server = ForkServer(env=_env(), sock_path=os.path.join(tmp, "fs.sock"))
+            fork_server.start()
+            try:
+                connection = MCPServerConnection("forked", _forked_params(fork_server, script, TOOL="forked_tool"), timeout_s=30)
+                assert await connection.start(), connection.error
+                pid = int((await connection.call_tool("forked_tool", {})).content[0].text.split(":")[1])
+                for launcher in _launcher_pids(fork_server.sock_path):
+                    os.kill(launcher, signal.SIGKILL)
+                for _ in range(50):
+                    if not os.path.exists(f"/proc/{pid}"):
+                        break
+                    await asyncio.sleep(0.1)
+                assert not os.path.exists(f"/proc/{pid}")
+                await connection.stop()
+            finally:
+                fork_server.stop()
+
+    asyncio.run(run())
+
+
+def test_launcher_falls_back_without_fork_server():
+    if not fork_server_supported():
+        return
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = _write_script(tmp)
+            fork_server = ForkServer(env=_env(), sock_path=os.path.join(tmp, "missing.sock"))  # Never started
+            connection = MCPServerConnection("plain", _forked_params(fork_server, script, TOOL="plain_tool"), timeout_s=30)
+            assert await connection.start(), connection.error
+            result = await connection.call_tool("plain_tool", {})
+            assert result.content[0].text.startswith("plain_tool:")
+            await connection.stop()
+
+    asyncio.run(run())
+
+
+def test_socket_is_private_and_launcher_checks_the_server():
+    if not fork_server_supported():
+        return
+
+    fork_server = ForkServer(env=_env())
+    sock_dir = os.path.dirname(fork_server.sock_path)
+    assert os.stat(sock_dir).st_mode & 0o777 == 0o700
+    fork_server.start()
+    try:
+        for _ in range(300):
+            if os.path.exists(fork_server.sock_path):
+                break
+            time.sleep(0.05)
+        assert os.stat(fork_server.sock_path).st_mode & 0o777 == 0o600
+    finally:
+        fork_server.stop()
+    assert not os.path.exists(sock_dir)
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = _write_script(tmp)
+            # Something other than the fork server listens on the socket
+            impostor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            impostor.bind(os.path.join(tmp, "fs.sock"))
+            impostor.listen(1)
+            sleeper = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+            try:
+                fork_server = ForkServer(env=_env(), sock_path=os.path.join(tmp, "fs.sock"))
+                params = StdioServerParameters(
+                    command=sys.executable, env=_env(TOOL="plain_tool"),
+                    args=fork_server.launcher_args(script)[:5] + [str(sleeper.pid), script],
+                )
+                connection = MCPServerConnection("checked", params, timeout_s=30)
+                assert await connection.start(), connection.error
+                pid = int((await connection.call_tool("plain_tool", {})).content[0].text.split(":")[1])
+                assert _ppid(pid) != sleeper.pid
+                await connection.stop()
+
+                # The launcher hung up without sending its stdio
+                impostor.settimeout(1)
+                conn, _ = impostor.accept()
+                msg, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+                assert msg == b"" and fds == []
+                conn.close()
+            finally:
+                sleeper.kill()
+                sleeper.wait()
+                impostor.close()
+
+    asyncio.run(run())
+
+
+def test_fork_server_spawn_time_and_memory():
+    """Benchmark: spawn time per agent and total memory of N agents, plain spawn vs fork server."""
+    if not fork_server_supported() or not os.path.exists("/proc/self/smaps_rollup"):
+        return
+    n = 4
+
+    async def spawn_all(make_params):
+        connections, spawn_ms = [], []
+        for i in range(n):
+            connection = MCPServerConnection(f"agent{i}", make_params(f"tool{i}"), timeout_s=60)
+            started = time.perf_counter()
+            assert await connection.start(), connection.error
+            spawn_ms.append((time.perf_counter() - started) * 1000)
+            connections.append(connection)
+        pids = []
+        for i, connection in enumerate(connections):
+            result = await connection.call_tool(f"tool{i}", {})
+            pids.append(int(result.content[0].text.split(":")[1]))
+        return connections, spawn_ms, pids
+
+    def total_kb(pids):
+        rss = pss = 0
+        for pid in pids:
+            r, p = _memory_kb(pid)
+            rss, pss = rss + r, pss + p
+        return rss, pss
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = _write_script(tmp)
+
+            connections, plain_ms, pids = await spawn_all(lambda tool: _params(script, TOOL=tool, PYTHONPATH=BACKEND_ROOT))
+            plain_rss, plain_pss = total_kb(pids)
+            for connection in connections:
+                await connection.stop()
+
+            fork_server = ForkServer(env=_env(), sock_path=os.path.join(tmp, "fs.sock"))
+            fork_server.start()
+            try:
+                # Wait for the preload, so the timings below are steady-state spawns (restarts, pool workers)
+                warmup = MCPServerConnection("warmup", _forked_params(fork_server, script, TOOL="warmup"), timeout_s=60)
+                assert await warmup.start(), warmup.error
+                await warmup.stop()
+
+                connections, forked_ms, pids = await spawn_all(lambda tool: _forked_params(fork_server, script, TOOL=tool))
+                # Everything the fork server adds: the server itself, the agents and their launchers
+                forked_rss, forked_pss = total_kb([fork_server.process.pid, *pids, *_launcher_pids(fork_server.sock_path)])
+                for connection in connections:
+                    await connection.stop()
+            finally:
+                fork_server.stop()
+
+        mean = lambda values: sum(values) / len(values)
+        print(f"  spawn per agent: plain {mean(plain_ms):.0f} ms, fork server {mean(forked_ms):.0f} ms")
+        print(f"  {n} agents, total RSS: plain {plain_rss / 1024:.1f} MB, fork server {forked_rss / 1024:.1f} MB")
+        print(f"  {n} agents, total PSS: plain {plain_pss / 1024:.1f} MB, fork server {forked_pss / 1024:.1f} MB")
+        assert mean(forked_ms) < mean(plain_ms)
+        assert forked_pss < plain_pss
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_agent_runs_forked_from_fork_server()
+    test_killed_launcher_takes_agent_down()
+    test_launcher_falls_back_without_fork_server()
+    test_socket_is_private_and_launcher_checks_the_server()
+    test_fork_server_spawn_time_and_memory()
+    print("✅ Fork server tests passed")
@@ -0,0 +1,80 @@
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_store import InMemorySessionStore
+from core.session import (
+    set_session_store, _get_conversation_history, get_recent_history_messages, get_history_summary,
+    split_history, HISTORY_VERBATIM_TURNS, HISTORY_TOKEN_BUDGET,
+)
+from core.history_compactor import compact_history, build_summary_prompt
+
+
+def test_split_history_respects_turns_and_tokens():
+    turns = [{"user": f"u{i}", "assistant": "short"} for i in range(HISTORY_VERBATIM_TURNS + 3)]
+    to_fold, verbatim = split_history(turns)
+    assert len(verbatim) == HISTORY_VERBATIM_TURNS and len(to_fold) == 3
+
+    # A long answer pushes older turns out of the verbatim window
+    turns[-2]["assistant"] = "x" * (HISTORY_TOKEN_BUDGET * 4)
+    to_fold, verbatim = split_history(turns)
+    assert verbatim == turns[-1:]
+
+    # The latest turn is always kept, even alone over budget
+    _, verbatim = split_history(turns[:-1])
+    assert verbatim == turns[-2:-1]
+
+
+def test_compaction_folds_old_turns_into_summary():
+    set_session_store(InMemorySessionStore())
+    calls = []
+
+    async def fake_summarize(previous, turns, settings):
+        calls.append((previous, [t["user"] for t in turns]))
+        return f"{previous} | " + ", ".join(t["user"] for t in turns)
+
+    try:
+        history = _get_conversation_history("s1", "a1")
+        for i in range(HISTORY_VERBATIM_TURNS + 1):
+            history.append({"user": f"u{i}", "assistant": f"a{i}"})
+        # A single turn waiting is not worth a model call
+        assert asyncio.run(compact_history("s1", "a1", {}, fake_summarize)) == 0
+
+        history.append({"user": f"u{HISTORY_VERBATIM_TURNS + 1}", "assistant": "last"})
+        assert asyncio.run(compact_history("s1", "a1", {}, fake_summarize)) == 2
+        assert calls == [("", ["u0", "u1"])]
+        assert len(_get_conversation_history("s1", "a1")) == HISTORY_VERBATIM_TURNS
+        assert get_history_summary("s1", "a1")["turns_folded"] == 2
+
+        messages = get_recent_history_messages("s1", "a1")
+        assert "u0, u1" in messages[0]["content"] and messages[1]["role"] == "assistant"
+        assert [m["role"] for m in messages] == ["user", "assistant"] * (HISTORY_VERBATIM_TURNS + 1)
+        assert messages[-1]["content"] == "last"
+
+        # A failed summary leaves the raw turns in place
+        history = _get_conversation_history("s1", "a1")
+        for i in range(2):
+            history.append({"user": f"v{i}", "assistant": "b"})
+
+        async def failing(previous, turns, settings):
+            return None
+
+        assert asyncio.run(compact_history("s1", "a1", {}, failing)) == 0
+        assert len(_get_conversation_history("s1", "a1")) == HISTORY_VERBATIM_TURNS + 2
+    finally:
+        set_session_store(None)
+
+
+def test_summary_prompt_clips_long_turns():
+    prompt = build_summary_prompt("earlier", [{"user": "hi", "assistant": "y" * 10000}])
+    assert prompt.startswith("Existing summary:\nearlier") and len(prompt) < 2500
+
+
+if __name__ == "__main__":
+    test_split_history_respects_turns_and_tokens()
+    test_compaction_folds_old_turns_into_summary()
+    test_summary_prompt_clips_long_turns()
+    print("✅ History compactor tests passed")
@@ -0,0 +1,144 @@
+import sys
+import os
+import time
+import asyncio
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.inprocess_agent import InProcessAgentSession
+from core.mcp_client import MCPServerConnection
+from core.server import AGENTS, _agent_server_params
+
+FORM_ARGS = {"fields": [{"label": "Email", "type": "email"}, {"label": "Size", "type": "options", "options": ["S", "M"]}]}
+
+
+def test_in_process_matches_stdio_and_is_faster():
+    async def run():
+        agent = InProcessAgentSession("collect_data", AGENTS["collect_data"])
+        assert await agent.prepare()
+        assert [t.name for t in (await agent.list_tools()).tools] == ["collect_data"]
+
+        stdio = MCPServerConnection("collect_data", _agent_server_params(AGENTS["collect_data"]))
+        assert await stdio.start()
+        try:
+            local = await agent.call_tool("collect_data", FORM_ARGS)
+            remote = await stdio.session.call_tool("collect_data", FORM_ARGS)
+            assert local.content[0].text == remote.content[0].text and not local.isError
+
+            # Same validation as over stdio
+            invalid = await agent.call_tool("collect_data", {"fields": "nope"})
+            assert invalid.isError and "validation" in invalid.content[0].text.lower()
+
+            n = 50
+            started = time.perf_counter()
+            for _ in range(n):
+                await agent.call_tool("collect_data", FORM_ARGS)
+            local_ms = (time.perf_counter() - started) * 1000 / n
+            started = time.perf_counter()
+            for _ in range(n):
+                await stdio.session.call_tool("collect_data", FORM_ARGS)
+            remote_ms = (time.perf_counter() - started) * 1000 / n
+            print(f"collect_data call: in-process {local_ms:.3f} ms, stdio {remote_ms:.3f} ms")
+            assert local_ms * 3 < remote_ms
+        finally:
+            await stdio.stop()
+
+    asyncio.run(run())
+
+
+def test_time_and_personal_details_load_in_process():
+    async def run():
+        for name in ("time", "personal_details"):
+            agent = InProcessAgentSession(name, AGENTS[name])
+            assert await agent.prepare(), agent.error
+            assert agent.tools and agent.status()["in_process"]
+        result = await agent.call_tool("get_personal_details", {})
+        assert not result.isError
+
+    asyncio.run(run())
+
+
+def test_server_does_not_validate_again():
+    """Pins the private mcp.server.lowlevel.Server._tool_cache that InProcessAgentSession relies on."""
+    import mcp.server.lowlevel.server as server_module
+
+    class _CountingJsonschema:
+        def __init__(self, real):
+            self.real = real
+            self.validations = 0
+
+        def validate(self, instance, schema, *args, **kwargs):
+            if schema:
+                self.validations += 1
+            return self.real.validate(instance, schema, *args, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self.real, name)
+
+    async def run():
+        agent = InProcessAgentSession("collect_data", AGENTS["collect_data"])
+        assert await agent.prepare(), agent.error
+        assert isinstance(getattr(agent.server, "_tool_cache", None), dict), \
+            "mcp Server._tool_cache is gone: update InProcessAgentSession._compile_validators"
+        cached = await agent.server._get_cached_tool_definition("collect_data")
+        assert cached is not None and cached.inputSchema == {}
+
+        counting = _CountingJsonschema(server_module.jsonschema)
+        server_module.jsonschema = counting
+        try:
+            result = await agent.call_tool("collect_data", FORM_ARGS)
+            invalid = await agent.call_tool("collect_data", {"fields": "nope"})
+        finally:
+            server_module.jsonschema = counting.real
+        assert not result.isError and invalid.isError
+        assert counting.validations == 0
+        # The tool list clients see keeps the real schema
+        assert (await agent.list_tools()).tools[0].inputSchema["properties"]
+
+    asyncio.run(run())
+
+
+def test_unrecognised_tool_cache_falls_back_to_server_validation():
+    """A different mcp Server cache is left alone; the handler validates as it normally would."""
+    import core.inprocess_agent as inprocess_module
+
+    class _OtherCache(dict):
+        """Still a dict, but holding entries the session does not know how to rewrite."""
+
+        def __setitem__(self, name, tool):
+            super().__setitem__(name, (tool, time.time()))
+
+        def get(self, name, default=None):
+            entry = super().get(name)
+            return entry[0] if entry else default
+
+    real_load = inprocess_module.load_agent_server
+
+    def load_with_other_cache(name, script_path):
+        server = real_load(name, script_path)
+        server._tool_cache = _OtherCache()
+        return server
+
+    async def run():
+        inprocess_module.load_agent_server = load_with_other_cache
+        try:
+            agent = InProcessAgentSession("collect_data_other_cache", AGENTS["collect_data"])
+            assert await agent.prepare(), agent.error
+        finally:
+            inprocess_module.load_agent_server = real_load
+        cached = await agent.server._get_cached_tool_definition("collect_data")
+        assert cached.inputSchema["properties"]
+        result = await agent.call_tool("collect_data", FORM_ARGS)
+        invalid = await agent.call_tool("collect_data", {"fields": "nope"})
+        assert not result.isError and invalid.isError
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_in_process_matches_stdio_and_is_faster()
+    test_time_and_personal_details_load_in_process()
+    test_server_does_not_validate_again()
+    test_unrecognised_tool_cache_falls_back_to_server_validation()
+    print("✅ In-process agent tests passed")
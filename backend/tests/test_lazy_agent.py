@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.lazy_agent import LazyAgentSession, load_tool_manifest, code_hash
+from tests.test_mcp_startup import SERVER_SCRIPT, _params
+
+
+def test_manifest_defers_spawn_until_first_call():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "agent.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            manifests = os.path.join(tmp, "manifests")
+            params = _params(script, TOOL="do_thing")
+
+            # No manifest yet: spawned at startup, and the manifest is written
+            first = LazyAgentSession("fixture", script, params, manifest_dir=manifests)
+            assert await first.prepare() and first.running
+            await first.stop()
+            assert [t.name for t in load_tool_manifest("fixture", script, manifests)] == ["do_thing"]
+
+            # Next start: tools come from the manifest, no process until call_tool
+            agent = LazyAgentSession("fixture", script, params, manifest_dir=manifests, idle_shutdown_s=1)
+            started = time.perf_counter()
+            assert await agent.prepare()
+            assert time.perf_counter() - started < 0.1 and not agent.running
+            assert [t.name for t in (await agent.list_tools()).tools] == ["do_thing"]
+
+            result = await agent.call_tool("do_thing", {})
+            first_pid = result.content[0].text.split(":")[1]
+            assert agent.running and agent.stats["spawns"] == 1
+
+            # Idle shutdown, then a transparent respawn on the next call
+            await asyncio.sleep(2.5)
+            assert not agent.running and agent.stats["idle_shutdowns"] == 1
+            result = await agent.call_tool("do_thing", {})
+            assert result.content[0].text.split(":")[1] != first_pid
+            assert agent.stats["spawns"] == 2
+            await agent.stop()
+
+            # Changing the agent code invalidates the manifest
+            with open(script, "a") as f:
+                f.write("\n# changed\n")
+            assert load_tool_manifest("fixture", script, manifests) is None
+
+    asyncio.run(run())
+
+
+def test_manifest_hash_covers_local_imports():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "helpers"))
+        files = {
+            "agent.py": "import json\nimport helper_mod\nfrom helpers import tools\n\ndef run():\n    from core import config\n",
+            "helper_mod.py": "VALUE = 1\n",
+            "helpers/__init__.py": "",
+            "helpers/tools.py": "from .schema import SCHEMA\n",
+            "helpers/schema.py": "SCHEMA = {}\n",
+            "unrelated.py": "X = 1\n",
+        }
+        for name, body in files.items():
+            with open(os.path.join(tmp, name), "w") as f:
+                f.write(body)
+        script = os.path.join(tmp, "agent.py")
+        baseline = code_hash(script)
+
+        with open(os.path.join(tmp, "unrelated.py"), "a") as f:
+            f.write("X = 2\n")
+        assert code_hash(script) == baseline
+
+        # Direct, package and relative (second-level) imports all count
+        for name in ("helper_mod.py", "helpers/tools.py", "helpers/schema.py"):
+            with open(os.path.join(tmp, name), "a") as f:
+                f.write("# changed\n")
+            changed = code_hash(script)
+            assert changed != baseline, name
+            baseline = changed
+
+
+def test_stale_manifest_is_replaced_by_the_live_tool_list():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "agent.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            manifests = os.path.join(tmp, "manifests")
+            first = LazyAgentSession("fixture", script, _params(script, TOOL="do_thing"), manifest_dir=manifests)
+            assert await first.prepare()
+            await first.stop()
+
+            # Same code hash, different tools (e.g. a change the hash cannot see)
+            agent = LazyAgentSession("fixture", script, _params(script, TOOL="renamed"), manifest_dir=manifests)
+            assert await agent.prepare() and not agent.running
+            assert [t.name for t in agent.tools] == ["do_thing"]
+            result = await agent.call_tool("renamed", {})
+            assert result.content[0].text.startswith("renamed:")
+            assert [t.name for t in agent.tools] == ["renamed"]
+            assert [t.name for t in load_tool_manifest("fixture", script, manifests)] == ["renamed"]
+            await agent.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_manifest_defers_spawn_until_first_call()
+    test_manifest_hash_covers_local_imports()
+    test_stale_manifest_is_replaced_by_the_live_tool_list()
+    print("✅ Lazy agent tests passed")
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import socket
+import asyncio
+import subprocess
+from contextlib import AsyncExitStack
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.agent_pool import AgentPool
+from core.mcp_client import MCPClientManager
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIME_AGENT = os.path.join(BACKEND_ROOT, "agents", "time.py")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(port: int, transport: str = "http") -> subprocess.Popen:
+    """Run the time agent over HTTP on localhost, as it would run on another node."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "core.mcp_http", TIME_AGENT, "--port", str(port), "--transport", transport],
+        cwd=BACKEND_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("agent HTTP server did not start")
+
+
+def test_agent_over_streamable_http_with_reconnect():
+    async def run():
+        port = _free_port()
+        process = _serve(port)
+        try:
+            async with AsyncExitStack() as stack:
+                manager = MCPClientManager(stack)
+                manager.servers_config = [{
+                    "name": "time_remote", "url": f"http://127.0.0.1:{port}/mcp", "transport": "http",
+                    "workers": 2, "health_check_s": 0.5,
+                }]
+                sessions = await manager.connect_all()
+                pool = sessions["time_remote"]
+                assert isinstance(pool, AgentPool)
+                assert "get_datetime" in [t.name for t in pool.tools]
+                # Both sessions share one HTTP client (and its keep-alive connections)
+                assert pool.workers[0].params is pool.workers[1].params is manager.remote_params["time_remote"]
+
+                results = await asyncio.gather(*(pool.call_tool("get_datetime", {}) for _ in range(4)))
+                assert all(not r.isError and r.content[0].text for r in results)
+
+                # The remote node goes away and comes back: the sessions reconnect
+                process.terminate()
+                process.wait(timeout=10)
+                restarted = _serve(port)
+                try:
+                    for _ in range(100):
+                        if all(w.stats["restarts"] >= 1 and w.running for w in pool.workers):
+                            break
+                        await asyncio.sleep(0.1)
+                    assert all(w.stats["restarts"] >= 1 for w in pool.workers)
+                    result = await pool.call_tool("get_datetime", {})
+                    assert not result.isError
+                finally:
+                    restarted.terminate()
+                    restarted.wait(timeout=10)
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+    asyncio.run(run())
+
+
+def test_agent_over_sse():
+    async def run():
+        port = _free_port()
+        process = _serve(port, "sse")
+        try:
+            async with AsyncExitStack() as stack:
+                manager = MCPClientManager(stack)
+                manager.servers_config = [{"name": "time_sse", "url": f"http://127.0.0.1:{port}/sse", "transport": "sse"}]
+                sessions = await manager.connect_all()
+                result = await sessions["time_sse"].call_tool("get_datetime", {})
+                assert not result.isError
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_agent_over_streamable_http_with_reconnect()
+    test_agent_over_sse()
+    print("✅ MCP HTTP transport tests passed")
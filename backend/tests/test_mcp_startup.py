@@ -0,0 +1,128 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+from contextlib import AsyncExitStack
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import StdioServerParameters
+
+from core.mcp_client import MCPServerConnection, MCPClientManager, StartupTimeline
+
+# Minimal stdio MCP server; SLEEP stands in for heavy imports at agent startup
+SERVER_SCRIPT = '''
+import os, sys, time, asyncio
+time.sleep(float(os.environ.get("SLEEP", "0")))
+if os.environ.get("CRASH"):
+    sys.exit(1)
+from mcp.server import Server
+from mcp.server.stdio import stdio_server
+from mcp.types import Tool, TextContent
+
+server = Server("fixture")
+
+@server.list_tools()
+async def list_tools():
+    return [Tool(name=os.environ["TOOL"], description="fixture", inputSchema={"type": "object"})]
+
+@server.call_tool()
+async def call_tool(name, arguments):
+    time.sleep(float(arguments.get("delay", 0)))  # Blocking, like the agents' sync tool code
+    if arguments.get("crash"):
+        os._exit(1)
+    if arguments.get("wait"):
+        try:
+            await asyncio.sleep(float(arguments["wait"]))
+        except asyncio.CancelledError:
+            open(os.environ["CANCEL_MARKER"] + arguments.get("tag", ""), "w").close()  # notifications/cancelled reached the handler
+            raise
+    return [TextContent(type="text", text=f"{name}:{os.getpid()}")]
+
+async def main():
+    async with stdio_server() as (read, write):
+        await server.run(read, write, server.create_initialization_options())
+
+asyncio.run(main())
+'''
+
+
+def _params(script: str, **env) -> StdioServerParameters:
+    return StdioServerParameters(command=sys.executable, args=[script], env={**os.environ, **env})
+
+
+def test_servers_start_concurrently_with_isolated_failures():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+
+            timeline = StartupTimeline()
+            specs = {
+                "a": (_params(script, TOOL="tool_a", SLEEP="1"), 20),
+                "b": (_params(script, TOOL="tool_b", SLEEP="1"), 20),
+                "slow": (_params(script, TOOL="tool_slow", SLEEP="30"), 3),
+                "broken": (_params(script, TOOL="x", CRASH="1"), 20),
+            }
+            connections = {
+                name: MCPServerConnection(name, params, timeout_s=timeout,
+                                          timeline=timeline.server(name, "native"), clock=timeline)
+                for name, (params, timeout) in specs.items()
+            }
+            started = time.perf_counter()
+            results = await asyncio.gather(*(c.start() for c in connections.values()))
+            elapsed = time.perf_counter() - started
+            try:
+                assert results == [True, True, False, False]
+                # Concurrent: bounded by the slow server's timeout, not the sum of startups
+                assert elapsed < 10, elapsed
+                assert [t.name for t in connections["a"].tools] == ["tool_a"]
+                assert "timed out" in connections["slow"].error
+
+                snapshot = {e["name"]: e for e in timeline.snapshot()["servers"]}
+                assert snapshot["a"]["status"] == "ready" and snapshot["a"]["tools"] == 1
+                assert snapshot["a"]["initialize_ms"] >= 900 and snapshot["a"]["list_tools_ms"] is not None
+                assert snapshot["slow"]["status"] == "failed" and snapshot["broken"]["status"] == "failed"
+
+                # A live connection still serves calls while others failed
+                result = await connections["b"].session.list_tools()
+                assert result.tools[0].name == "tool_b"
+            finally:
+                await asyncio.gather(*(c.stop() for c in connections.values()))
+            assert connections["a"].session is None
+
+    asyncio.run(run())
+
+
+def test_manager_connects_and_removes_external_servers():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            async with AsyncExitStack() as stack:
+                manager = MCPClientManager(stack, StartupTimeline())
+                manager.servers_config = [
+                    {"name": "one", "command": sys.executable, "args": [script], "env": {"TOOL": "one_tool"}},
+                    {"name": "two", "command": sys.executable, "args": [script], "env": {"TOOL": "x", "CRASH": "1"}},
+                ]
+                sessions = await manager.connect_all()
+                assert list(sessions) == ["one"]
+                assert [t.name for t in manager.connections["one"].tools] == ["one_tool"]
+                assert manager.timeline.servers["ext_mcp_two"]["status"] == "failed"
+
+                manager.servers_config = manager.servers_config[:1]
+                manager.save_servers = lambda: None
+                await manager.remove_server("one")
+                assert "one" not in manager.sessions and "one" not in manager.connections
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_servers_start_concurrently_with_isolated_failures()
+    test_manager_connects_and_removes_external_servers()
+    print("✅ MCP startup tests passed")
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.mcp_client import MCPServerConnection
+from tests.test_mcp_startup import SERVER_SCRIPT, _params
+
+
+def _pid(result) -> int:
+    return int(result.content[0].text.split(":")[1])
+
+
+async def _wait_until(predicate, timeout_s: float = 15):
+    deadline = time.perf_counter() + timeout_s
+    while not predicate():
+        assert time.perf_counter() < deadline, "timed out waiting"
+        await asyncio.sleep(0.05)
+
+
+def test_crashed_and_hung_servers_restart():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            connection = MCPServerConnection("fixture", _params(script, TOOL="t"),
+                                             health_check_s=0.5, ping_timeout_s=1, backoff_s=0.1)
+            assert await connection.start()
+            try:
+                first_pid = _pid(await connection.call_tool("t", {}))
+
+                # Crash: the call fails fast, so do calls while the restart is in progress
+                started = time.perf_counter()
+                try:
+                    await connection.call_tool("t", {"crash": True})
+                    assert False, "expected the call to fail"
+                except Exception as e:
+                    assert "closed" in str(e).lower() or "went down" in str(e)
+                try:
+                    await connection.call_tool("t", {})
+                    assert False, "expected the call to fail"
+                except RuntimeError:
+                    pass
+                assert time.perf_counter() - started < 2
+
+                await _wait_until(lambda: connection.stats["restarts"] == 1 and connection.running)
+                second_pid = _pid(await connection.call_tool("t", {}))
+                assert second_pid != first_pid
+
+                # Hung: no ping reply, the process is replaced and the stuck call released
+                started = time.perf_counter()
+                try:
+                    await connection.call_tool("t", {"delay": 60})
+                    assert False, "expected the call to fail"
+                except RuntimeError:
+                    pass
+                assert time.perf_counter() - started < 10
+                assert connection.stats["health_failures"] >= 1
+                await _wait_until(lambda: connection.stats["restarts"] == 2 and connection.running)
+                assert _pid(await connection.call_tool("t", {})) not in (first_pid, second_pid)
+            finally:
+                await connection.stop()
+
+            # Removal kills the process
+            try:
+                os.kill(second_pid, 0)
+                assert False, "old process still running"
+            except ProcessLookupError:
+                pass
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_crashed_and_hung_servers_restart()
+    print("✅ MCP supervision tests passed")
@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory_executor import AsyncMemoryStore, MemoryExecutor, LatencyHistogram
+
+
+class _SlowStore:
+    """Records how many calls overlap, per operation kind."""
+
+    def __init__(self):
+        self.active = {"read": 0, "write": 0}
+        self.peak = {"read": 0, "write": 0}
+        self.lock = threading.Lock()
+
+    def _work(self, kind):
+        with self.lock:
+            self.active[kind] += 1
+            self.peak[kind] = max(self.peak[kind], self.active[kind])
+        time.sleep(0.05)
+        with self.lock:
+            self.active[kind] -= 1
+
+    def query_memory(self, query, n_results=5):
+        self._work("read")
+        return [query]
+
+    def add_memory(self, role, content, metadata=None):
+        self._work("write")
+
+
+def test_reads_overlap_writes_serialize_loop_stays_free():
+    store = _SlowStore()
+    executor = MemoryExecutor(max_workers=4)
+    aio = AsyncMemoryStore(store, executor)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        results = await asyncio.gather(
+            *[aio.query_memory(f"q{i}") for i in range(3)],
+            *[aio.add_memory("user", f"m{i}") for i in range(3)],
+        )
+        tick_task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(main())
+    assert results[:3] == [["q0"], ["q1"], ["q2"]]
+    assert store.peak["read"] > 1       # Reads ran concurrently
+    assert store.peak["write"] == 1     # Writes to chat_history ran one at a time
+    assert ticks > 5                    # The event loop kept running meanwhile
+
+    stats = executor.stats()["operations"]
+    assert stats["add_memory"]["latency"]["count"] == 3
+    assert stats["query_memory"]["latency"]["p50_ms"] >= 50
+    executor.shutdown()
+
+
+class _SessionStore:
+    def __init__(self):
+        self.cleared = []
+
+    def clear_session_embeddings(self, session_id):
+        self.cleared.append((session_id, threading.current_thread() is threading.main_thread()))
+        return 1
+
+
+def test_clear_session_context_runs_off_the_loop():
+    import core.server as _server
+    from core.session_store import InMemorySessionStore
+    from core.session import set_session_store, _clear_session_context, _get_session_state
+
+    store = _SessionStore()
+    executor = MemoryExecutor(max_workers=2)
+    saved = _server.memory_store
+    _server.memory_store = type("_Wrapped", (), {"aio": AsyncMemoryStore(store, executor)})()
+    set_session_store(InMemorySessionStore())
+    try:
+        _get_session_state("s1").update(facility_id="F1", order_id="o1")
+        cleared = asyncio.run(_clear_session_context("s1", "transient"))
+        assert cleared == ["order_id", "session_embeddings"]
+        assert store.cleared == [("s1", False)]  # On the executor, not the event loop thread
+        assert asyncio.run(_clear_session_context("s1", "ids_only")) == ["facility_id"]
+        assert len(store.cleared) == 1
+    finally:
+        _server.memory_store = saved
+        set_session_store(None)
+        executor.shutdown()
+
+
+def test_latency_histogram_quantiles():
+    hist = LatencyHistogram()
+    for ms in [0.5] * 90 + [30] * 9 + [20000]:
+        hist.observe(ms)
+    snap = hist.snapshot()
+    assert snap["count"] == 100 and snap["p50_ms"] == 1.0 and snap["p95_ms"] == 50.0
+    assert snap["p99_ms"] == 50.0 and snap["max_ms"] == 20000
+    assert snap["buckets"]["inf"] == 1
+
+
+if __name__ == "__main__":
+    test_reads_overlap_writes_serialize_loop_stays_free()
+    test_clear_session_context_runs_off_the_loop()
+    test_latency_histogram_quantiles()
+    print("✅ Memory executor tests passed")
@@ -0,0 +1,111 @@
+import sys
+import os
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import MemoryStore
+from core.memory_policy import (
+    INGEST_EMBED, INGEST_STORE, INGEST_SUMMARIZE, INGEST_SKIP,
+    merge_ingestion_overrides, resolve_ingestion_policy,
+)
+from core.session_store import InMemorySessionStore
+from core.session import set_session_store, _get_recent_tool_executions
+
+
+class _CountingEmbedder:
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, text):
+        self.texts.append(text)
+        return [float((hash(text) >> i) % 7 + 1) for i in range(8)]
+
+
+def test_policy_precedence():
+    # Built-in defaults
+    assert resolve_ingestion_policy("get_datetime") == INGEST_STORE
+    assert resolve_ingestion_policy("collect_data") == INGEST_SKIP
+    assert resolve_ingestion_policy("unknown_tool") == INGEST_EMBED
+
+    settings = {"memory_ingestion_policy": {"*": INGEST_STORE, "search_web": INGEST_SKIP, "get_datetime": INGEST_EMBED}}
+    agent = {"memory_policy": {"search_web": INGEST_EMBED, "parse_pdf": "bogus"}}
+    overrides = merge_ingestion_overrides(settings, agent)
+
+    # Per-agent beats settings-wide, settings-wide beats the defaults
+    assert resolve_ingestion_policy("search_web", overrides) == INGEST_EMBED
+    assert resolve_ingestion_policy("get_datetime", overrides) == INGEST_EMBED
+    # Wildcard covers tools without their own override
+    assert resolve_ingestion_policy("unknown_tool", overrides) == INGEST_STORE
+    # Unknown policy names fall back to the default for the tool
+    assert resolve_ingestion_policy("parse_pdf", overrides) == INGEST_SUMMARIZE
+
+    # Missing sections
+    assert merge_ingestion_overrides({}, None) == {}
+    assert merge_ingestion_overrides({"memory_ingestion_policy": None}, {"memory_policy": {"a": INGEST_SKIP}}) == {"a": INGEST_SKIP}
+
+
+def test_store_and_skip_paths():
+    with tempfile.TemporaryDirectory() as tmp:
+        embedder = _CountingEmbedder()
+        store = MemoryStore(storage_path=tmp, embed_fn=embedder, backend="local")
+        output = '{"order_id": "o1", "status": "shipped", "customer": {"details": {"customer_id": "c9"}}, "session_id": "other"}'
+
+        assert store.add_tool_execution("s1", "get_order", {}, output, policy=INGEST_SKIP) == INGEST_SKIP
+        assert store.collection.count() == 0 and store.log_collection.count() == 0
+
+        # store: kept for session lookups without an embedding call
+        assert store.add_tool_execution("s1", "get_order", {"id": 1}, output, policy=INGEST_STORE) == INGEST_STORE
+        assert embedder.texts == []
+        assert store.collection.count() == 0
+        logged = store.log_collection.get(include=["documents", "metadatas"])
+        assert logged["documents"] == ['Tool: get_order\nArguments: {"id": 1}\nOutput: ' + output]
+        meta = logged["metadatas"][0]
+        assert meta["role"] == "tool" and meta["type"] == "tool_execution"
+        assert meta["session_id"] == "s1" and meta["order_id"] == "o1"
+        assert meta["customer_id"] == "c9"  # Same nesting rules as ToolResult.ids
+
+        # embed / summarize go to the searchable collection
+        store.add_tool_execution("s1", "get_order", {}, output, policy=INGEST_EMBED)
+        store.add_tool_execution("s1", "search_web", {"q": "x"}, output, policy=INGEST_SUMMARIZE)
+        assert store.collection.count() == 2
+        assert len(embedder.texts) == 2 and "Output summary: " in embedder.texts[1]
+
+        # No policy given: the tool's default applies
+        assert store.add_tool_execution("s1", "collect_data", {}, "{}") == INGEST_SKIP
+        assert store.ingestion_stats[INGEST_SKIP] == 2
+        assert store.ingestion_stats[INGEST_STORE] == 1
+
+
+def test_chat_records_under_agent_override():
+    from core.routes.chat import _record_tool_execution
+
+    set_session_store(InMemorySessionStore())
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = MemoryStore(storage_path=tmp, embed_fn=_CountingEmbedder(), backend="local")
+            overrides = merge_ingestion_overrides(
+                {"memory_ingestion_policy": {"*": INGEST_STORE}},
+                {"memory_policy": {"noisy_tool": INGEST_SKIP}},
+            )
+            stats = {}
+            for tool_name in ("noisy_tool", "get_order"):
+                asyncio.run(_record_tool_execution(
+                    store, stats, overrides,
+                    session_id="s1", tool_name=tool_name, tool_args={}, tool_output='{"ok": true}',
+                ))
+            assert stats == {INGEST_SKIP: 1, INGEST_STORE: 1}
+            assert store.log_collection.count() == 1
+            # Skipped executions stay out of the recent-tools buffer too
+            assert [r["tool_name"] for r in _get_recent_tool_executions("s1")] == ["get_order"]
+    finally:
+        set_session_store(None)
+
+
+if __name__ == "__main__":
+    test_policy_precedence()
+    test_store_and_skip_paths()
+    test_chat_records_under_agent_override()
+    print("✅ Memory ingestion tests passed")
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import MemoryStore, RECENCY_HALF_LIFE_S
+
+
+def test_recent_memory_outranks_slightly_closer_old_memory():
+    now = time.time()
+    distances = [0.40, 0.45, 0.90]
+    metadatas = [
+        {"role": "user", "timestamp": now - 60 * 24 * 3600},  # two months old, closest
+        {"role": "user", "timestamp": now - 3600},            # an hour old
+        {"role": "user", "timestamp": now},                   # brand new but unrelated
+    ]
+    order = MemoryStore._recency_rank(distances, metadatas, RECENCY_HALF_LIFE_S, now=now)
+    assert order == [1, 2, 0]
+
+
+def test_legacy_string_timestamps_keep_floor_weight():
+    now = time.time()
+    distances = [0.10, 0.10]
+    metadatas = [
+        {"role": "user", "timestamp": "1700000000.0"},  # pre-migration dummy value
+        {"role": "user", "timestamp": now},
+    ]
+    order = MemoryStore._recency_rank(distances, metadatas, RECENCY_HALF_LIFE_S, now=now)
+    assert order == [1, 0]
+
+
+def test_bare_until_date_excludes_next_midnight():
+    from datetime import datetime
+    from core.routes.chat import _parse_memory_time_range
+    from core.vector_store import _match_where
+
+    since, until = _parse_memory_time_range({"since": "2024-03-01", "until": "2024-03-01"})
+    start = datetime.fromisoformat("2024-03-01").timestamp()
+    next_midnight = datetime.fromisoformat("2024-03-02").timestamp()
+    assert since == start
+    where = {"timestamp": {"$lte": until}}
+    assert _match_where({"timestamp": next_midnight - 1}, where)
+    assert not _match_where({"timestamp": next_midnight}, where)
+
+    # A full datetime is used as given
+    assert _parse_memory_time_range({"until": "2024-03-01T12:00:00"})[1] == datetime.fromisoformat("2024-03-01T12:00:00").timestamp()
+
+
+if __name__ == "__main__":
+    test_recent_memory_outranks_slightly_closer_old_memory()
+    test_legacy_string_timestamps_keep_floor_weight()
+    test_bare_until_date_excludes_next_midnight()
+    print("✅ Recency ranking tests passed")
@@ -0,0 +1,111 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import MemoryStore
+from core.memory_policy import INGEST_SUMMARIZE, summarize_tool_execution
+
+
+def _embedder(dim, broken=False):
+    def embed(text):
+        if broken:
+            return None
+        return [float((hash(text) >> i) % 7 + 1) for i in range(dim)]
+    return embed
+
+
+def test_model_change_reindexes_into_new_collection():
+    with tempfile.TemporaryDirectory() as tmp:
+        ms = MemoryStore(storage_path=tmp, embed_fn=_embedder(8), backend="local")
+        ms.bind_embedding_space("test:a")
+        for i in range(250):
+            ms.add_memory("user", f"memory number {i}", {"session_id": "s1"})
+
+        # New model with a different dimension; the first attempt fails (provider down)
+        ms.set_embedder("b", _embedder(12, broken=True))
+        ms.bind_embedding_space("test:b")
+        ms.reindex_job.join(10)
+        progress = ms.reindex_progress()
+        assert progress["migration"]["status"] == "failed"
+        assert progress["active"] == "chat_history"
+
+        # New memories are written in the new space meanwhile
+        ms.set_embedder("b", _embedder(12))
+        ms.add_memory("user", "written during the migration", {"session_id": "s1"})
+
+        assert ms.resume_reindex()
+        ms.reindex_job.join(10)
+        progress = ms.reindex_progress()
+        assert progress["active"] == "chat_history_v1" and progress["migration"] is None
+        assert progress["last_migration"]["migrated"] == 250
+        assert ms.collection.count() == 251
+        assert ms.query_memory("memory number 3", n_results=1, recency_half_life=None)
+
+        # The switch is persisted: a restart reads the new collection, no new job
+        reopened = MemoryStore(storage_path=tmp, embed_fn=_embedder(12), backend="local")
+        reopened.bind_embedding_space("test:b")
+        assert reopened.collection.name == "chat_history_v1" and reopened.reindex_job is None
+
+
+def test_same_dimension_migration_queries_the_new_space():
+    with tempfile.TemporaryDirectory() as tmp:
+        ms = MemoryStore(storage_path=tmp, embed_fn=_embedder(8), backend="local")
+        ms.bind_embedding_space("test:a")
+        for i in range(20):
+            ms.add_memory("user", f"old memory {i}")
+
+        # Same dimension, different model: nothing raises if the old collection is queried
+        ms.set_embedder("b", _embedder(8, broken=True))
+        ms.bind_embedding_space("test:b")
+        ms.reindex_job.join(10)
+        assert ms.reindex_progress()["migration"]["status"] == "failed"
+        ms.set_embedder("b", _embedder(8))
+        ms.add_memory("user", "written during the migration")
+
+        assert ms.query_memory("old memory 3", n_results=5, recency_half_life=None) == ["user: written during the migration"]
+
+        # Switching back to the old model reads the old collection again
+        ms.set_embedder("a", _embedder(8))
+        ms.bind_embedding_space("test:a")
+        assert ms.query_memory("old memory 3", n_results=1, recency_half_life=None) == ["user: old memory 3"]
+
+
+class _RecordingEmbedder:
+    def __init__(self, dim):
+        self.dim = dim
+        self.texts = []
+
+    def __call__(self, text):
+        self.texts.append(text)
+        return _embedder(self.dim)(text)
+
+
+def test_reindex_embeds_the_ingest_text():
+    with tempfile.TemporaryDirectory() as tmp:
+        ms = MemoryStore(storage_path=tmp, embed_fn=_embedder(8), backend="local")
+        ms.bind_embedding_space("test:a")
+        output = '{"order_id": "o1", "notes": "' + "long text " * 100 + '"}'
+        ms.add_tool_execution("s1", "search_web", {"q": "x"}, output, policy=INGEST_SUMMARIZE)
+        ms.add_memory("user", "plain memory")
+        summary = summarize_tool_execution("search_web", {"q": "x"}, output)
+
+        embedder = _RecordingEmbedder(12)
+        ms.set_embedder("b", embedder)
+        ms.bind_embedding_space("test:b")
+        ms.reindex_job.join(10)
+        assert ms.collection.name == "chat_history_v1"
+        # The summary that was embedded at ingest, not the full stored document
+        assert sorted(embedder.texts) == sorted([summary, "plain memory"])
+        stored = ms.collection.get(include=["documents", "metadatas"])
+        docs = dict(zip(stored["documents"], stored["metadatas"]))
+        assert "plain memory" in docs and "embed_text" not in docs["plain memory"]
+
+
+if __name__ == "__main__":
+    test_model_change_reindexes_into_new_collection()
+    test_same_dimension_migration_queries_the_new_space()
+    test_reindex_embeds_the_ingest_text()
+    print("✅ Memory re-index tests passed")
@@ -0,0 +1,124 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+import subprocess
+
+import uvicorn
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.memory import MemoryStore
+from core.memory_client import RemoteMemoryStore
+from core.memory_service import create_app
+
+
+def _embed(text):
+    return [float(len(text) % 5 + 1), float(text.count("a") + 1), 1.0, float(sum(map(ord, text)) % 11 + 1)]
+
+
+def _serve(app, uds):
+    server = uvicorn.Server(uvicorn.Config(app, uds=uds, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if server.started:
+            return server, thread
+        time.sleep(0.02)
+    raise RuntimeError("memory service did not start")
+
+
+def test_remote_store_round_trip_and_batching():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(storage_path=os.path.join(tmp, "store"), embed_fn=_embed, backend="local")
+        app = create_app(store)
+        server, thread = _serve(app, os.path.join(tmp, "memory.sock"))
+        try:
+            remote = RemoteMemoryStore(f"unix://{os.path.join(tmp, 'memory.sock')}")
+            remote.add_memory("user", "alpha banana", {"session_id": "s1"})
+            assert remote.query_memory("alpha banana", n_results=1) == ["user: alpha banana"]
+            assert remote.ingestion_stats == dict(store.ingestion_stats)
+
+            async def turn():
+                await asyncio.gather(
+                    remote.aio.add_memory("user", "question", metadata={"session_id": "s1"}),
+                    remote.aio.add_memory("assistant", "answer", metadata={"session_id": "s1"}),
+                )
+                return await remote.aio.query_memory("question", n_results=5)
+
+            batches_before = app.state.batches
+            memories = asyncio.run(turn())
+            # Both writes went out in one RPC
+            assert app.state.batches - batches_before == 2
+            assert "user: question" in memories and "assistant: answer" in memories
+
+            # Unknown methods fail on the client; service errors fall back like MemoryStore
+            assert remote._call("drop_everything") is None
+        finally:
+            server.should_exit = True
+            thread.join(5)
+
+
+def test_unreachable_service_falls_back():
+    remote = RemoteMemoryStore("unix:///nonexistent/memory.sock", timeout=1)
+    assert remote.query_memory("anything") == []
+    assert asyncio.run(remote.aio.query_memory("anything")) == []
+
+
+class _SlowRemoteStore:
+    """Remote-store stand-in whose RPCs block like a slow memory service."""
+
+    backend = "remote"
+
+    @property
+    def ingestion_stats(self):
+        time.sleep(0.2)
+        return {"embed": 1}
+
+    def service_stats(self):
+        time.sleep(0.2)
+        return {"batches": 1}
+
+
+def test_memory_stats_route_does_not_block_the_loop():
+    import core.server as server
+    from core.routes.data import get_memory_stats
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        stats = await get_memory_stats()
+        tick_task.cancel()
+        return stats, ticks
+
+    previous, server.memory_store = server.memory_store, _SlowRemoteStore()
+    try:
+        stats, ticks = asyncio.run(run())
+    finally:
+        server.memory_store = previous
+    assert stats["ingestion"] == {"embed": 1} and stats["service"] == {"batches": 1}
+    assert ticks >= 20  # The loop kept running through both 0.2 s RPCs
+
+
+def test_client_does_not_import_the_store():
+    backend_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, core.memory_client; assert 'core.memory' not in sys.modules, 'core.memory imported'"
+    subprocess.run([sys.executable, "-c", code], cwd=backend_root, check=True)
+
+
+if __name__ == "__main__":
+    test_remote_store_round_trip_and_batching()
+    test_unreachable_service_falls_back()
+    test_memory_stats_route_does_not_block_the_loop()
+    test_client_does_not_import_the_store()
+    print("✅ Memory service tests passed")
@@ -0,0 +1,75 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.routes.settings import _init_memory_store, _refresh_memory_store
+
+
+def _settings(**overrides):
+    settings = {"mode": "local", "model": "llama3", "vector_backend": "local", "vector_compression": {}}
+    settings.update(overrides)
+    return settings
+
+
+def test_unrelated_setting_keeps_store_and_embedder():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _init_memory_store(_settings(), storage_path=tmp)
+        embedder = store._embedder
+        refreshed = _refresh_memory_store(store, _settings(google_maps_api_key="abc", show_browser=True), storage_path=tmp)
+        assert refreshed is store
+        assert refreshed._embedder is embedder
+
+
+def test_provider_change_swaps_embedder_in_place():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _init_memory_store(_settings(), storage_path=tmp)
+        client = store.client
+        refreshed = _refresh_memory_store(store, _settings(mode="bedrock", embedding_model="amazon.titan-embed-text-v2:0"), storage_path=tmp)
+        assert refreshed is store and refreshed.client is client
+        model, embed_fn = refreshed._embedder
+        assert embed_fn is not None
+
+        refreshed = _refresh_memory_store(store, _settings(model="mistral"), storage_path=tmp)
+        assert refreshed is store and refreshed._embedder == ("mistral", None)
+
+
+def test_compression_change_applies_in_place():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _init_memory_store(_settings(), storage_path=tmp)
+        refreshed = _refresh_memory_store(store, _settings(vector_compression={"quantization": "int8"}), storage_path=tmp)
+        assert refreshed is store
+        # Only collections created from now on pick it up
+        assert store.client.get_or_create_collection("new_collection").compression["quantization"] == "int8"
+        assert store.collection.compression["quantization"] == "none"
+
+
+def test_storage_change_closes_old_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _init_memory_store(_settings(), storage_path=tmp)
+        store.collection.add(ids=["a"], embeddings=[[1.0, 0.0]], documents=["a"], metadatas=[{}])
+        collection = store.collection
+
+        refreshed = _refresh_memory_store(store, _settings(vector_backend="chroma"), storage_path=tmp)
+        assert refreshed is not store and refreshed.backend == "chroma"
+        # The old store can no longer write to its files
+        try:
+            collection.add(ids=["b"], embeddings=[[0.0, 1.0]], documents=["b"], metadatas=[{}])
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        try:
+            store.client.get_or_create_collection("chat_history")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_unrelated_setting_keeps_store_and_embedder()
+    test_provider_change_swaps_embedder_in_place()
+    test_compression_change_applies_in_place()
+    test_storage_change_closes_old_store()
+    print("✅ Memory settings refresh tests passed")
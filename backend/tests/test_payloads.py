@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp import types
+
+from core.mcp_client import MCPServerConnection
+from core.payloads import PAYLOAD_DIR_ENV, ToolOutput, payload_content, read_tool_output
+from core.tool_result import ToolResult
+from tests.test_mcp_startup import _params
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Returns SIZE characters of report text, offloaded by core.payloads when MCP_PAYLOAD_DIR is set
+SERVER_SCRIPT = '''
+import os, asyncio
+from mcp.server import Server
+from mcp.server.stdio import stdio_server
+from mcp.types import Tool
+from core.payloads import payload_content
+
+server = Server("payloads")
+
+@server.list_tools()
+async def list_tools():
+    return [Tool(name="report", description="fixture", inputSchema={"type": "object"})]
+
+@server.call_tool()
+async def call_tool(name, arguments):
+    line = "| 2024-01-01 | Facility Ω | 42.0 | ok |\\n"
+    return payload_content(line * (int(arguments["size"]) // len(line)))
+
+async def main():
+    async with stdio_server() as (read, write):
+        await server.run(read, write, server.create_initialization_options())
+
+asyncio.run(main())
+'''
+
+
+def _result(content) -> types.CallToolResult:
+    return types.CallToolResult(content=content)
+
+
+def test_large_output_goes_through_a_payload_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        text = "row ü\n" * 20000
+        os.environ.pop(PAYLOAD_DIR_ENV, None)
+        assert payload_content(text)[0].text == text  # Not spawned by the orchestrator: inline
+
+        os.environ[PAYLOAD_DIR_ENV] = tmp
+        try:
+            assert payload_content("small")[0].text == "small"
+            handle = payload_content(text)
+        finally:
+            os.environ.pop(PAYLOAD_DIR_ENV)
+        assert len(handle[0].text) < 1000 and os.listdir(tmp)
+
+        output = ToolOutput.from_result(_result(handle), root=tmp)
+        assert output.out_of_band and output.size_bytes == len(text.encode("utf-8"))
+        decoded = output.result()
+        assert isinstance(decoded, ToolResult) and decoded == text
+        output.release()
+        assert os.listdir(tmp) == [] and decoded == text
+
+        inline = read_tool_output(_result([types.TextContent(type="text", text='{"order_id": "o1"}')]), root=tmp)
+        assert isinstance(inline, ToolResult) and inline.ids == {"order_id": "o1"}
+
+        # Handles pointing outside the payload directory are not followed
+        rogue = '{"payload_ref": {"path": "/etc/passwd", "bytes": 1}}'
+        assert read_tool_output(_result([types.TextContent(type="text", text=rogue)]), root=tmp) == rogue
+
+
+def test_out_of_band_transfer_beats_the_pipe():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            script = os.path.join(tmp, "server.py")
+            with open(script, "w") as f:
+                f.write(SERVER_SCRIPT)
+            payload_dir = os.path.join(tmp, "payloads")
+            env = {"TOOL": "report", "PYTHONPATH": BACKEND_ROOT}
+            inline = MCPServerConnection("inline", _params(script, **env))
+            offloaded = MCPServerConnection("offloaded", _params(script, **env, **{PAYLOAD_DIR_ENV: payload_dir}))
+            assert all(await asyncio.gather(inline.start(), offloaded.start()))
+            try:
+                size = 8 * 1024 * 1024
+                timings = {}
+                for connection in (inline, offloaded):
+                    await connection.call_tool("report", {"size": 1024})  # Warm up
+                    started = time.perf_counter()
+                    for _ in range(3):
+                        text = read_tool_output(await connection.call_tool("report", {"size": size}), root=payload_dir)
+                    timings[connection.name] = (time.perf_counter() - started) / 3 * 1000
+                    assert len(text) > size * 0.9 and "Facility Ω" in text
+                print(f"8 MB tool output: inline {timings['inline']:.0f} ms, out-of-band {timings['offloaded']:.0f} ms")
+                assert timings["offloaded"] < timings["inline"]
+                assert os.listdir(payload_dir) == []  # Released after reading
+            finally:
+                await asyncio.gather(inline.stop(), offloaded.stop())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_large_output_goes_through_a_payload_file()
+    test_out_of_band_transfer_beats_the_pipe()
+    print("✅ Payload tests passed")
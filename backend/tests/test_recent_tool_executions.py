@@ -0,0 +1,51 @@
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session import (
+    set_session_store, _get_session_state, _get_recent_tool_executions, _record_recent_tool_execution,
+    RECENT_TOOL_EXECUTIONS_MAX,
+)
+from core.session_store import InMemorySessionStore
+from core.tools import build_system_prompt
+
+
+def test_ring_buffer_keeps_latest_in_order():
+    set_session_store(InMemorySessionStore())
+    try:
+        for i in range(RECENT_TOOL_EXECUTIONS_MAX + 2):
+            _record_recent_tool_execution("s1", "list_emails", {"page": i}, json.dumps({"email_id": f"e{i}"}), agent_id="a1")
+
+        entries = list(_get_recent_tool_executions("s1", "a1"))
+        assert len(entries) == RECENT_TOOL_EXECUTIONS_MAX
+        assert '"e2"' in entries[0]["document"]
+        assert f'"e{RECENT_TOOL_EXECUTIONS_MAX + 1}"' in entries[-1]["document"]
+        # Other agents in the same session are isolated
+        assert len(_get_recent_tool_executions("s1", "a2")) == 0
+    finally:
+        set_session_store(None)
+
+
+def test_prompt_uses_ring_buffer_without_memory_store():
+    set_session_store(InMemorySessionStore())
+    try:
+        _record_recent_tool_execution("s2", "read_email", {"email_id": "x1"}, '{"subject": "Hello"}')
+        _record_recent_tool_execution("s2", "draft_email", {"to": "a@b.c"}, '{"draft_id": "d9"}')
+
+        prompt = build_system_prompt(
+            "{tools_json}", "[]", "s2", _get_session_state, None,
+            recent_tools_getter=_get_recent_tool_executions,
+        )
+        assert "RECENT TOOL EXECUTIONS" in prompt
+        assert prompt.index("read_email") < prompt.index("draft_email")
+    finally:
+        set_session_store(None)
+
+
+if __name__ == "__main__":
+    test_ring_buffer_keeps_latest_in_order()
+    test_prompt_uses_ring_buffer_without_memory_store()
+    print("✅ Recent tool execution tests passed")
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import time
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_store import InMemorySessionStore
+from core.session import (
+    set_session_store, _get_session_state, _apply_sticky_args, _extract_and_persist_ids,
+    _track_context_keys, _get_prompt_context, context_injection_summary,
+    SESSION_CONTEXT_MAX_KEYS, SESSION_CONTEXT_TTL_S, SESSION_CONTEXT_VALUE_CHARS,
+)
+from core.tools import build_system_prompt
+
+
+def test_context_is_bounded_and_ranked():
+    set_session_store(InMemorySessionStore())
+    try:
+        _get_session_state("s1")["facility_id"] = "F1"
+        # A key that keeps being used outranks newer one-off arguments
+        _apply_sticky_args("s1", "lookup", {"email_id": "e1"})
+        for i in range(SESSION_CONTEXT_MAX_KEYS + 5):
+            _apply_sticky_args("s1", "search", {f"arg_{i}": i + 1})
+            if i % 4 == 0:
+                _apply_sticky_args("s1", "lookup", {"email_id": "e1"})
+
+        state = _get_session_state("s1")
+        assert len(state) == SESSION_CONTEXT_MAX_KEYS + 1  # Budget plus the pinned facility_id
+        assert state["facility_id"] == "F1" and state["email_id"] == "e1"
+        assert "arg_0" not in state and f"arg_{SESSION_CONTEXT_MAX_KEYS + 4}" in state
+
+        # IDs from one tool output land in a single write and are tracked too
+        _extract_and_persist_ids("s1", "get_order", json.dumps({"order_id": "o7", "items": [{"sku_id": "k1"}]}))
+        assert _get_session_state("s1")["order_id"] == "o7"
+        assert len(_get_session_state("s1")) == SESSION_CONTEXT_MAX_KEYS + 1
+
+        # Stale keys are skipped in the prompt and evicted on the next write
+        later = time.time() + SESSION_CONTEXT_TTL_S + 1
+        assert _get_prompt_context("s1", now=later) == {"facility_id": "F1"}
+        _track_context_keys("s1", ["note"], now=later)
+        assert set(_get_session_state("s1")) == {"facility_id"}
+    finally:
+        set_session_store(None)
+
+
+def test_prompt_context_is_compact_and_measured():
+    set_session_store(InMemorySessionStore())
+    try:
+        ss = _get_session_state("s2")
+        ss["facility_id"] = "F2"
+        ss["last_report_context"] = {"type": "emails", "row_count": 3, "timestamp": time.time()}
+        _apply_sticky_args("s2", "draft", {"body": "x" * 1000})
+
+        context = _get_prompt_context("s2")
+        assert "last_report_context" not in context
+        assert len(context["body"]) == SESSION_CONTEXT_VALUE_CHARS + 1
+
+        turns = context_injection_summary()["turns"]
+        prompt = build_system_prompt("{tools_json}", "[]", "s2", _get_session_state, None,
+                                     session_context_getter=_get_prompt_context)
+        assert json.dumps(context, separators=(",", ":")) in prompt
+        summary = context_injection_summary()
+        assert summary["turns"] == turns + 1
+        assert summary["sections"]["session_context"]["last"] > 0
+        assert summary["sections"]["system_prompt"]["last"] == len(prompt.encode("utf-8"))
+    finally:
+        set_session_store(None)
+
+
+if __name__ == "__main__":
+    test_context_is_bounded_and_ranked()
+    test_prompt_context_is_compact_and_measured()
+    print("✅ Session context tests passed")
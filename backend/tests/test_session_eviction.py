@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.server as _server
+import core.session as session
+from core.session_store import SQLiteSessionStore, InMemorySessionStore
+from core.session import (
+    set_session_store, touch_session, evict_sessions, session_stats,
+    _get_session_state, _get_conversation_history, _record_recent_tool_execution,
+)
+
+
+class FakeMemoryStore:
+    def __init__(self):
+        self.cleared = []
+
+    def clear_session_embeddings(self, session_id):
+        self.cleared.append(session_id)
+        return 1
+
+
+def _fill(session_id, now, turns=2):
+    touch_session(session_id, now)
+    _get_session_state(session_id)["facility_id"] = "F1"
+    for i in range(turns):
+        _get_conversation_history(session_id, "agent_a").append({"user": f"u{i}" * 50, "assistant": "ok"})
+    _record_recent_tool_execution(session_id, "lookup", {"id": 1}, "{}", "agent_a")
+
+
+def _run_eviction_checks():
+    memory = FakeMemoryStore()
+    saved = (_server.memory_store, session.SESSION_MAX_COUNT, session.SESSION_MAX_BYTES)
+    _server.memory_store = memory
+    try:
+        now = time.time()
+        _fill("stale", now - session.SESSION_IDLE_TTL_S - 10)
+        _fill("old", now - 600)
+        _fill("mid", now - 300)
+        _fill("fresh", now)
+
+        stats = session_stats()
+        assert stats["sessions"] == 4 and stats["bytes"] > 0
+        assert {e["session_id"] for e in stats["largest"]} == {"stale", "old", "mid", "fresh"}
+
+        # Idle TTL first, then LRU down to max_sessions; cascades to the RAG collections
+        session.SESSION_MAX_COUNT = 2
+        evicted = evict_sessions(now)
+        assert evicted == [("stale", "idle"), ("old", "lru")]
+        assert memory.cleared == ["stale", "old"]
+        assert _get_session_state("stale") == {} and len(_get_conversation_history("old", "agent_a")) == 0
+        assert _get_session_state("mid") == {"facility_id": "F1"}
+
+        # Byte budget: the recently seen session survives even when over budget
+        session.SESSION_MAX_COUNT = 100
+        session.SESSION_MAX_BYTES = 1
+        assert evict_sessions(now) == [("mid", "bytes")]
+        assert session_stats()["sessions"] == 1
+        assert len(_get_conversation_history("fresh", "agent_a")) == 2
+    finally:
+        _server.memory_store, session.SESSION_MAX_COUNT, session.SESSION_MAX_BYTES = saved
+
+
+def test_eviction_in_memory():
+    set_session_store(InMemorySessionStore())
+    try:
+        _run_eviction_checks()
+    finally:
+        set_session_store(None)
+
+
+def test_eviction_sqlite():
+    with tempfile.TemporaryDirectory() as tmp:
+        set_session_store(SQLiteSessionStore(os.path.join(tmp, "sessions.db")))
+        try:
+            _run_eviction_checks()
+        finally:
+            set_session_store(None)
+
+
+def test_stats_do_not_write_activity():
+    store = InMemorySessionStore()
+    set_session_store(store)
+    try:
+        now = time.time()
+        # Data from before eviction existed: no activity records
+        _get_session_state("legacy")["facility_id"] = "F1"
+        _get_conversation_history("legacy", "agent_a").append({"user": "u", "assistant": "ok"})
+        _get_conversation_history("orphan", "agent_a").append({"user": "u", "assistant": "ok"})
+
+        stats = session_stats()
+        assert {e["session_id"]: e["last_seen"] for e in stats["largest"]} == {"legacy": None, "agent_a_orphan": None}
+        assert store.keys("activity") == []
+
+        # The janitor's sweep backfills them, so they age out from now on
+        assert evict_sessions(now) == []
+        assert sorted(store.keys("activity")) == ["agent_a_orphan", "legacy"]
+        assert session_stats()["largest"][0]["last_seen"] == now
+    finally:
+        set_session_store(None)
+
+
+if __name__ == "__main__":
+    test_eviction_in_memory()
+    test_eviction_sqlite()
+    test_stats_do_not_write_activity()
+    print("✅ Session eviction tests passed")
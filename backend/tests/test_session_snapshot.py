@@ -0,0 +1,78 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_store import InMemorySessionStore
+from core.session_snapshot import SessionSnapshot
+
+
+def _store(path, **kwargs):
+    # Long interval: the tests flush explicitly
+    return InMemorySessionStore(SessionSnapshot(path, interval_s=3600, **kwargs))
+
+
+def test_restart_restores_sessions_lazily():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp)
+        store.set("state", "s1", {"facility_id": "F1", "last_report_context": {"type": "emails", "collection": "session_s1_emails_1"}})
+        store.update("history", "a1_s1", lambda l: l + [{"user": "hi", "assistant": "hello"}], default=[])
+        store.set("state", "s2", {"x": 1})
+        store.delete("state", "s2")
+        store.set("recent_tools", "a1_s1", [{"tool_name": "t"}])
+        store.clear("recent_tools")
+        store.close()
+
+        restored = _store(tmp)
+        assert sorted(restored.keys("state")) == ["s1"] and restored.keys("recent_tools") == []
+        # Nothing is decoded until a session is read
+        assert restored.snapshot_stats()["restored"] == 0 and restored.sizes("state")["s1"] > 0
+        assert restored.get("state", "s1")["last_report_context"]["collection"] == "session_s1_emails_1"
+        assert restored.get("history", "a1_s1") == [{"user": "hi", "assistant": "hello"}]
+        assert restored.snapshot_stats()["restored"] == 2
+
+        # Updates to a restored key build on the restored value
+        restored.update("state", "s1", lambda d: {**d, "order_id": "o1"}, default={})
+        restored.close()
+        assert _store(tmp).get("state", "s1")["order_id"] == "o1"
+
+
+def test_torn_journal_tail_is_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp)
+        store.set("state", "s1", {"n": 1})
+        store.flush()
+        store.set("state", "s1", {"n": 2})
+        store.close()
+        with open(os.path.join(tmp, "journal.log"), "r+b") as f:
+            data = f.read()
+            f.seek(0)
+            f.write(data[:-5])  # Crash in the middle of the last record
+            f.truncate()
+
+        restored = _store(tmp)
+        assert restored.get("state", "s1") == {"n": 1}
+        assert restored.snapshot_stats()["corrupt"] == 1
+
+
+def test_compaction_rewrites_base():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(tmp, compact_bytes=512)
+        for i in range(20):
+            store.set("state", f"s{i}", {"payload": "x" * 50})
+            store.flush()
+        assert store.snapshot_stats()["compactions"] >= 1
+        assert os.path.getsize(os.path.join(tmp, "journal.log")) < 512
+        store.close()
+
+        restored = _store(tmp)
+        assert len(restored.keys("state")) == 20 and restored.get("state", "s19") == {"payload": "x" * 50}
+
+
+if __name__ == "__main__":
+    test_restart_restores_sessions_lazily()
+    test_torn_journal_tail_is_skipped()
+    test_compaction_rewrites_base()
+    print("✅ Session snapshot tests passed")
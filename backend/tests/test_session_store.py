@@ -0,0 +1,121 @@
+import sys
+import os
+import tempfile
+import threading
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_store import SQLiteSessionStore, InMemorySessionStore, SESSION_DB_BUSY_TIMEOUT_S
+from core.session import (
+    set_session_store, get_session_store, configure_session_store,
+    _get_session_state, _get_conversation_history, conversation_histories,
+    _extract_and_persist_ids, HISTORY_MAX_TURNS,
+)
+
+
+def test_sqlite_updates_are_atomic_across_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        # Two store instances on one file stand in for two uvicorn workers
+        workers = [SQLiteSessionStore(path), SQLiteSessionStore(path)]
+
+        def bump(store):
+            for _ in range(50):
+                store.update("state", "s1", lambda d: {**d, "n": d.get("n", 0) + 1}, default={})
+
+        threads = [threading.Thread(target=bump, args=(workers[i % 2],)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert workers[0].get("state", "s1") == {"n": 200}
+
+        # A cached value is refreshed when another worker writes
+        assert workers[1].get("state", "s1") == {"n": 200}
+        workers[0].set("state", "s1", {"n": 0})
+        assert workers[1].get("state", "s1") == {"n": 0}
+        workers[0].clear("state")
+        assert workers[1].get("state", "s1", {}) == {}
+
+
+def test_session_views_write_through():
+    for store in (InMemorySessionStore(), None):
+        with tempfile.TemporaryDirectory() as tmp:
+            set_session_store(store or SQLiteSessionStore(os.path.join(tmp, "sessions.db")))
+            ss = _get_session_state("s1")
+            ss["facility_id"] = "F1"
+            ss.update(order_id=7)
+            del ss["facility_id"]
+            assert _get_session_state("s1") == {"order_id": 7}
+
+            for i in range(HISTORY_MAX_TURNS + 3):
+                _get_conversation_history("s1", "a1").append({"user": f"u{i}", "assistant": f"a{i}"})
+            history = _get_conversation_history("s1", "a1")
+            assert len(history) == HISTORY_MAX_TURNS and history[-1]["user"] == f"u{HISTORY_MAX_TURNS + 2}"
+
+            assert "a1_s1" in conversation_histories
+            conversation_histories.clear()
+            assert len(_get_conversation_history("s1", "a1")) == 0
+    set_session_store(None)
+
+
+def test_context_write_is_one_transaction():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+        conn = store._conn()
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == int(SESSION_DB_BUSY_TIMEOUT_S * 1000)
+        statements = []
+        conn.set_trace_callback(statements.append)
+        set_session_store(store)
+        try:
+            _extract_and_persist_ids("s1", "get_order", '{"order_id": "o1", "user": {"user_id": "u1"}}')
+            assert [q for q in statements if q.startswith("BEGIN")] == ["BEGIN IMMEDIATE"]
+            assert store.get("state", "s1") == {"order_id": "o1", "user_id": "u1"}
+            assert sorted(store.get("context_meta", "s1")) == ["order_id", "user_id"]
+        finally:
+            conn.set_trace_callback(None)
+            set_session_store(None)
+
+
+def test_update_many_on_both_backends():
+    with tempfile.TemporaryDirectory() as tmp:
+        for store in (InMemorySessionStore(), SQLiteSessionStore(os.path.join(tmp, "sessions.db"))):
+            store.set("state", "s1", {"a": 1})
+            written = store.update_many(
+                [("state", "s1"), ("context_meta", "s1")],
+                lambda cur: {("context_meta", "s1"): {k: len(cur[("context_meta", "s1")]) for k in cur[("state", "s1")]}},
+                {("context_meta", "s1"): {}},
+            )
+            assert written == {("context_meta", "s1"): {"a": 0}}
+            assert store.get("state", "s1") == {"a": 1} and store.get("context_meta", "s1") == {"a": 0}
+            try:
+                store.update_many([("state", "s1")], lambda cur: 1 / 0)
+                assert False, "expected ZeroDivisionError"
+            except ZeroDivisionError:
+                pass
+            assert store.get("state", "s1") == {"a": 1}
+
+
+def test_unconfigured_store_stays_in_memory():
+    set_session_store(None)
+    try:
+        store = get_session_store()
+        # No snapshot journal (and no background flush thread) unless the server configured one
+        assert isinstance(store, InMemorySessionStore) and store._snapshot is None
+        _get_session_state("s1")["order_id"] = "o1"
+        assert get_session_store() is store
+
+        configured = configure_session_store({"session_store": "memory", "session_snapshots": False})
+        assert get_session_store() is configured and configured is not store
+    finally:
+        set_session_store(None)
+
+
+if __name__ == "__main__":
+    test_sqlite_updates_are_atomic_across_workers()
+    test_session_views_write_through()
+    test_context_write_is_one_transaction()
+    test_update_many_on_both_backends()
+    test_unconfigured_store_stays_in_memory()
+    print("✅ Session store tests passed")
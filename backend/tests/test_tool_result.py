@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.tool_result as tool_result
+from core.tool_result import ToolResult
+from core.memory_policy import summarize_tool_execution
+from core.session_store import InMemorySessionStore
+from core.session import set_session_store, _get_session_state, _extract_and_persist_ids, _record_recent_tool_execution
+
+
+class _CountingJson:
+    """Stands in for the json module in core.tool_result and counts loads calls."""
+
+    def __init__(self):
+        self.loads_calls = 0
+
+    def loads(self, text):
+        self.loads_calls += 1
+        return json.loads(text)
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+def test_output_is_parsed_once_across_handlers():
+    counting = _CountingJson()
+    tool_result.json = counting
+    set_session_store(InMemorySessionStore())
+    try:
+        output = ToolResult(json.dumps({"order_id": "o1", "rows": [{"text": "x" * 300}] * 20}))
+        assert output == json.dumps({"order_id": "o1", "rows": [{"text": "x" * 300}] * 20})
+
+        assert output.value["order_id"] == "o1"
+        _extract_and_persist_ids("s1", "get_order", output)
+        summarize_tool_execution("get_order", {}, output)
+        _record_recent_tool_execution("s1", "get_order", {}, output)
+        assert counting.loads_calls == 1
+        assert _get_session_state("s1")["order_id"] == "o1"
+
+        # Plain strings still work everywhere
+        _extract_and_persist_ids("s1", "get_user", json.dumps({"user": {"user_id": "u2"}}))
+        assert _get_session_state("s1")["user_id"] == "u2"
+    finally:
+        tool_result.json = json
+        set_session_store(None)
+
+
+def test_non_json_output():
+    output = ToolResult("plain text result")
+    assert not output.is_json
+    assert output.ids == {}
+    try:
+        output.value
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert summarize_tool_execution("t", {}, output).endswith("plain text result")
+
+
+def test_ids_match_first_item_and_nested_rules():
+    output = ToolResult(json.dumps([
+        {"id": 1, "details": {"facility_id": "F1", "empty_id": ""}, "others": [{"deep_id": "d"}, {"skip_id": "s"}]},
+        {"second_id": "never"},
+    ]))
+    assert output.ids == {"id": 1, "facility_id": "F1", "deep_id": "d"}
+
+
+def test_items_reuse_serialized_text():
+    reports = [{"report": "a", "data": [{"v": "é"}] * 3}, {"report": "b", "data": []}, "text", 4]
+    output = ToolResult.from_value(reports)
+    assert output == json.dumps(reports)
+    assert output.size_bytes == len(json.dumps(reports).encode("utf-8"))
+    for i, item in enumerate(reports):
+        assert output.item_raw(i) == json.dumps(item)
+        assert output.item_size(i) == len(json.dumps(item))
+
+    kept = [reports[0], {"summary": True}]
+    rebuilt = ToolResult.from_items(kept, [output.item_raw(0), json.dumps(kept[1])])
+    assert rebuilt == json.dumps(kept) and rebuilt.value is kept
+
+    # Parsed from text (or too many items to track): item text is serialized on demand
+    parsed = ToolResult(json.dumps(reports))
+    assert parsed.item_size(0) == len(json.dumps(reports[0]))
+    long_list = ToolResult.from_value(list(range(tool_result.ITEM_SPANS_MAX_ITEMS + 1)))
+    assert long_list == json.dumps(list(range(tool_result.ITEM_SPANS_MAX_ITEMS + 1)))
+    assert long_list.item_raw(3) == "3"
+
+
+if __name__ == "__main__":
+    test_output_is_parsed_once_across_handlers()
+    test_non_json_output()
+    test_ids_match_first_item_and_nested_rules()
+    test_items_reuse_serialized_text()
+    print("✅ Tool result tests passed")
@@ -0,0 +1,275 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.vector_store as vector_store
+from core.vector_store import LocalVectorStore
+from core.memory import MemoryStore
+
+
+def _vectors(n, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_local_query_filters_and_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp)
+        coll = store.get_or_create_collection("chat_history")
+        vecs = _vectors(300)
+        coll.add(
+            ids=[f"m{i}" for i in range(300)],
+            embeddings=vecs.tolist(),
+            documents=[f"doc {i}" for i in range(300)],
+            metadatas=[{"session_id": "s1" if i % 2 else "s2", "timestamp": float(i)} for i in range(300)],
+        )
+
+        res = coll.query(query_embeddings=[vecs[7].tolist()], n_results=3)
+        assert res["ids"][0][0] == "m7"
+        assert abs(res["distances"][0][0]) < 1e-5
+
+        res = coll.query(
+            query_embeddings=[vecs[7].tolist()], n_results=5,
+            where={"$and": [{"session_id": "s2"}, {"timestamp": {"$gte": 100.0}}]},
+        )
+        assert all(m["session_id"] == "s2" and m["timestamp"] >= 100 for m in res["metadatas"][0])
+
+        coll.delete(ids=["m7"])
+        assert coll.count() == 299
+        res = coll.query(query_embeddings=[vecs[7].tolist()], n_results=300)
+        assert "m7" not in res["ids"][0] and len(res["ids"][0]) == 299
+
+        # Reopen from disk: records, deletes and vectors survive
+        reopened = LocalVectorStore(tmp).get_collection("chat_history")
+        assert reopened.count() == 299
+        res = reopened.query(query_embeddings=[vecs[8].tolist()], n_results=1)
+        assert res["ids"][0] == ["m8"]
+        assert reopened.get(ids=["m7"])["ids"] == []
+
+
+def test_local_compressed_collection_reranks_exactly():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp, compression={"quantization": "int8", "truncate_dim": 16})
+        coll = store.get_or_create_collection("chat_history")
+        vecs = _vectors(500, dim=64, seed=1)
+        coll.add(ids=[f"m{i}" for i in range(500)], embeddings=vecs.tolist())
+
+        info = coll.storage_info()
+        assert info["search_dim"] == 16 and info["scan_bytes_per_vector"] == 16 + 4
+
+        # Candidates come from the int8 codes; returned distances are exact
+        res = coll.query(query_embeddings=[vecs[42].tolist()], n_results=3)
+        assert res["ids"][0][0] == "m42"
+        assert abs(res["distances"][0][0]) < 1e-5
+
+        # Settings are recorded per collection: reopening without compression keeps them
+        reopened = LocalVectorStore(tmp).get_collection("chat_history")
+        assert reopened.compression["quantization"] == "int8"
+        assert reopened.query(query_embeddings=[vecs[42].tolist()], n_results=1)["ids"][0] == ["m42"]
+
+
+def test_local_collections_registry():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(tmp)
+        store.get_or_create_collection("session_abc_orders_1")
+        store.get_or_create_collection("chat_history")
+        assert [c.name for c in store.list_collections()] == ["chat_history", "session_abc_orders_1"]
+        store.delete_collection("session_abc_orders_1")
+        assert [c.name for c in store.list_collections()] == ["chat_history"]
+
+
+def test_listing_names_does_not_load_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = LocalVectorStore(tmp)
+        for name in ("session_abc_orders_1", "session_abc_orders_2", "session_xyz_orders_1"):
+            writer.get_or_create_collection(name).add(ids=["a"], embeddings=[[1.0, 0.0]], documents=['{"unit": "A101"}'])
+
+        store = LocalVectorStore(tmp)
+        assert store.list_collection_names() == ["session_abc_orders_1", "session_abc_orders_2", "session_xyz_orders_1"]
+        assert store._collections == {}
+
+        # Session search opens only that session's collections; clearing opens none
+        memory = MemoryStore(storage_path=tmp, embed_fn=lambda text: [1.0, 0.0], backend="local")
+        opened = set(memory.client._collections)
+        assert len(memory.search_session_embeddings("xyz", "A101")) == 1
+        assert set(memory.client._collections) - opened == {"session_xyz_orders_1"}
+        assert memory.clear_session_embeddings("abc") == 2
+        assert set(memory.client._collections) - opened == {"session_xyz_orders_1"}
+        assert "session_abc_orders_1" not in memory.client.list_collection_names()
+
+
+def test_local_collection_names_are_validated():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "store")
+        store = LocalVectorStore(root)
+        outside = os.path.join(tmp, "outside")
+        os.makedirs(outside)
+        for name in ("session_../../outside_x", "session_a/b_1", "../outside", "ab", "x" * 513, "_hidden", "a..b", "bad name"):
+            for op in (store.get_or_create_collection, store.delete_collection, store.get_collection, store.create_collection):
+                try:
+                    op(name)
+                    assert False, f"{op.__name__}({name!r}) should have raised"
+                except ValueError:
+                    pass
+        assert os.path.isdir(outside) and os.listdir(root) == []
+
+        # A symlinked collection directory may not point outside the store
+        os.symlink(outside, os.path.join(root, "linked"))
+        try:
+            store.delete_collection("linked")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        assert os.path.isdir(outside)
+        assert [c.name for c in store.list_collections()] == []
+
+        store.get_or_create_collection("session_7f3a-b2_orders_1700000000.5")
+        assert [c.name for c in store.list_collections()] == ["session_7f3a-b2_orders_1700000000.5"]
+
+
+class _FailingOs:
+    """Stands in for the os module in core.vector_store; `fail` raises after its first `allow` calls."""
+
+    def __init__(self, fail: str, allow: int = 0):
+        self.fail = fail
+        self.allow = allow
+
+    def __getattr__(self, name):
+        if name != self.fail:
+            return getattr(os, name)
+
+        def _call(*args, **kwargs):
+            if self.allow <= 0:
+                raise OSError(f"simulated {name} failure")
+            self.allow -= 1
+            return getattr(os, name)(*args, **kwargs)
+        return _call
+
+
+def _compaction_fixture(tmp):
+    coll = LocalVectorStore(tmp).get_or_create_collection("chat_history")
+    vecs = _vectors(300)
+    coll.add(ids=[f"m{i}" for i in range(300)], embeddings=vecs.tolist(), documents=[f"d{i}" for i in range(300)])
+    coll.delete(ids=[f"m{i}" for i in range(0, 300, 3)])
+    return coll, vecs
+
+
+def _assert_survivors(tmp, vecs):
+    reopened = LocalVectorStore(tmp).get_collection("chat_history")
+    assert reopened.count() == 200
+    assert reopened.get(ids=["m1"])["documents"] == ["d1"] and reopened.get(ids=["m0"])["ids"] == []
+    assert reopened.query(query_embeddings=[vecs[299].tolist()], n_results=1)["ids"][0] == ["m299"]
+    assert not [n for n in os.listdir(reopened.path) if n.endswith(".compact") or n == "compact.json"]
+    return reopened
+
+
+def test_compaction_failure_keeps_the_collection():
+    with tempfile.TemporaryDirectory() as tmp:
+        coll, vecs = _compaction_fixture(tmp)
+        vector_store.os = _FailingOs("fsync")
+        try:
+            coll.compact()
+            assert False, "expected OSError"
+        except OSError:
+            pass
+        finally:
+            vector_store.os = os
+        # The old files are intact; the staged ones are dropped on load
+        assert coll.count() == 200
+        _assert_survivors(tmp, vecs)
+
+
+def test_compaction_interrupted_after_staging_rolls_forward():
+    with tempfile.TemporaryDirectory() as tmp:
+        coll, vecs = _compaction_fixture(tmp)
+        vector_store.os = _FailingOs("replace", allow=2)  # The marker and the first staged file go in
+        try:
+            coll.compact()
+            assert False, "expected OSError"
+        except OSError:
+            pass
+        finally:
+            vector_store.os = os
+        assert os.path.exists(os.path.join(coll.path, "compact.json"))
+        reopened = _assert_survivors(tmp, vecs)
+        assert reopened._rows == 200
+
+
+class _GatedHnswlib:
+    """Stands in for the hnswlib module; add_items blocks until `gate` is set."""
+
+    def __init__(self, real):
+        self.real = real
+        self.gate = threading.Event()
+        self.building = threading.Event()
+        gated = self
+
+        class Index:
+            def __init__(self, space, dim):
+                self._index = real.Index(space=space, dim=dim)
+
+            def add_items(self, *args, **kwargs):
+                gated.building.set()
+                assert gated.gate.wait(10)
+                return self._index.add_items(*args, **kwargs)
+
+            def __getattr__(self, name):
+                return getattr(self._index, name)
+
+        self.Index = Index
+
+
+def test_hnsw_builds_in_background():
+    if vector_store.hnswlib is None:
+        return
+    real, min_items = vector_store.hnswlib, vector_store.HNSW_MIN_ITEMS
+    gated = _GatedHnswlib(real)
+    vector_store.hnswlib, vector_store.HNSW_MIN_ITEMS = gated, 100
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            coll = LocalVectorStore(tmp).get_or_create_collection("big")
+            vecs = _vectors(300)
+            coll.add(ids=[f"d{i}" for i in range(300)], embeddings=vecs, documents=[f"doc {i}" for i in range(300)])
+            assert gated.building.wait(5)
+
+            # The build is stuck in add_items: queries, adds and deletes still go through (flat search)
+            started = time.perf_counter()
+            assert coll.query(query_embeddings=[vecs[5]], n_results=1)["ids"] == [["d5"]]
+            coll.add(ids=["late"], embeddings=[vecs[7] * -1], documents=["late"])
+            coll.delete(ids=["d9"])
+            assert time.perf_counter() - started < 1
+            assert coll._hnsw is None
+
+            gated.gate.set()
+            assert coll.wait_for_index(10)
+            assert coll.query(query_embeddings=[vecs[5]], n_results=1)["ids"] == [["d5"]]
+            # Rows added and deleted during the build were caught up
+            assert coll.query(query_embeddings=[vecs[7] * -1], n_results=1)["ids"] == [["late"]]
+            assert "d9" not in coll.query(query_embeddings=[vecs[9]], n_results=5)["ids"][0]
+            assert os.path.exists(os.path.join(tmp, "big", "hnsw.bin"))
+
+            # Reopened: the saved index is loaded in the background the same way
+            reopened = LocalVectorStore(tmp).get_or_create_collection("big")
+            assert reopened.wait_for_index(10)
+            assert reopened.query(query_embeddings=[vecs[7] * -1], n_results=1)["ids"] == [["late"]]
+    finally:
+        gated.gate.set()
+        vector_store.hnswlib, vector_store.HNSW_MIN_ITEMS = real, min_items
+
+
+if __name__ == "__main__":
+    test_local_query_filters_and_persists()
+    test_local_compressed_collection_reranks_exactly()
+    test_local_collections_registry()
+    test_listing_names_does_not_load_collections()
+    test_local_collection_names_are_validated()
+    test_compaction_failure_keeps_the_collection()
+    test_compaction_interrupted_after_staging_rolls_forward()
+    test_hnsw_builds_in_background()
+    print("✅ Local vector store tests passed")